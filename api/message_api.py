@@ -4,6 +4,7 @@
 """
 from typing import Dict, Optional
 from core.http_client import HttpClient
+from core.async_http_client import AsyncHttpClient
 from core.config import config
 from core.logger import get_logger
 
@@ -31,22 +32,25 @@ class MessageApi:
         else:
             self.client = client
     
-    def get_message_list(self, page: int = 1, page_size: int = 10) -> Dict:
+    def get_message_list(self, page: int = 1, page_size: int = 10, receiver_id: Optional[int] = None) -> Dict:
         """
         获取消息列表
         
         Args:
             page: 页码，从1开始
             page_size: 每页数量
+            receiver_id: 只获取该接收者的消息（可选）
             
         Returns:
             消息列表字典
         """
-        logger.info(f"获取消息列表: page={page}, page_size={page_size}")
+        logger.info(f"获取消息列表: page={page}, page_size={page_size}, receiver_id={receiver_id}")
         params = {
             "page": page,
             "page_size": page_size
         }
+        if receiver_id is not None:
+            params["receiver_id"] = receiver_id
         response = self.client.get("/api/message/list", params=params)
         response.raise_for_status()
         return response.json()
@@ -75,3 +79,52 @@ class MessageApi:
         response.raise_for_status()
         return response.json()
 
+
+
+class AsyncMessageApi:
+    """
+    异步消息API类
+    
+    与MessageApi接口一致，基于AsyncHttpClient，所有方法均为协程
+    """
+    
+    def __init__(self, client: Optional[AsyncHttpClient] = None):
+        """
+        初始化异步消息API
+        
+        Args:
+            client: 异步HTTP客户端实例，如果不提供则创建新实例
+        """
+        if client is None:
+            base_url = config.get_api_base_url()
+            timeout = config.get_api_timeout()
+            self.client = AsyncHttpClient(base_url=base_url, timeout=timeout)
+        else:
+            self.client = client
+    
+    async def get_message_list(self, page: int = 1, page_size: int = 10, receiver_id: Optional[int] = None) -> Dict:
+        """获取消息列表"""
+        logger.info(f"获取消息列表: page={page}, page_size={page_size}, receiver_id={receiver_id}")
+        params = {
+            "page": page,
+            "page_size": page_size
+        }
+        if receiver_id is not None:
+            params["receiver_id"] = receiver_id
+        response = await self.client.get("/api/message/list", params=params)
+        response.raise_for_status()
+        return response.json()
+    
+    async def send_message(self, receiver_id: int, content: str, title: Optional[str] = None) -> Dict:
+        """发送消息"""
+        logger.info(f"发送消息: receiver_id={receiver_id}, title={title}")
+        data = {
+            "receiver_id": receiver_id,
+            "content": content
+        }
+        if title:
+            data["title"] = title
+        
+        response = await self.client.post("/api/message/send", json_data=data)
+        response.raise_for_status()
+        return response.json()
@@ -4,6 +4,7 @@
 """
 from typing import Dict, Optional
 from core.http_client import HttpClient
+from core.async_http_client import AsyncHttpClient
 from core.config import config
 from core.logger import get_logger
 
@@ -101,3 +102,60 @@ class UserApi:
         response.raise_for_status()
         return response.json()
 
+
+
+class AsyncUserApi:
+    """
+    异步用户API类
+    
+    与UserApi接口一致，基于AsyncHttpClient，所有方法均为协程
+    """
+    
+    def __init__(self, client: Optional[AsyncHttpClient] = None):
+        """
+        初始化异步用户API
+        
+        Args:
+            client: 异步HTTP客户端实例，如果不提供则创建新实例
+        """
+        if client is None:
+            base_url = config.get_api_base_url()
+            timeout = config.get_api_timeout()
+            self.client = AsyncHttpClient(base_url=base_url, timeout=timeout)
+        else:
+            self.client = client
+    
+    async def get_user_info(self, user_id: int) -> Dict:
+        """获取用户信息"""
+        logger.info(f"获取用户信息: user_id={user_id}")
+        response = await self.client.get("/api/user/info", params={"user_id": user_id})
+        response.raise_for_status()
+        return response.json()
+    
+    async def add_user(self, username: str, email: str, age: Optional[int] = None) -> Dict:
+        """添加用户"""
+        logger.info(f"添加用户: username={username}, email={email}")
+        data = {
+            "username": username,
+            "email": email
+        }
+        if age is not None:
+            data["age"] = age
+        
+        response = await self.client.post("/api/user/add", json_data=data)
+        response.raise_for_status()
+        return response.json()
+    
+    async def update_user(self, user_id: int, **kwargs) -> Dict:
+        """更新用户信息"""
+        logger.info(f"更新用户: user_id={user_id}, data={kwargs}")
+        response = await self.client.put(f"/api/user/{user_id}", json_data=kwargs)
+        response.raise_for_status()
+        return response.json()
+    
+    async def delete_user(self, user_id: int) -> Dict:
+        """删除用户"""
+        logger.info(f"删除用户: user_id={user_id}")
+        response = await self.client.delete(f"/api/user/{user_id}")
+        response.raise_for_status()
+        return response.json()
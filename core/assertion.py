@@ -2,19 +2,138 @@
 断言工具模块
 提供各种断言方法，用于验证接口响应
 """
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Optional, Union
+from core.json_path import compile_path, find_many
 from core.logger import get_logger
+from core.response import parse_json
+from core.schema import get_validator, json_key
 
 logger = get_logger(__name__)
 
 
+def _check_all(path: str, values: List[Any], predicate, description: Optional[str]):
+    """
+    检查所有值是否满足条件
+    
+    Returns:
+        (错误信息或None, 条件描述)
+    """
+    if isinstance(predicate, (type, tuple)):
+        check = lambda v: isinstance(v, predicate)
+        description = description or f"类型为 {predicate}"
+    elif callable(predicate):
+        check = predicate
+        description = description or getattr(predicate, '__name__', repr(predicate))
+    else:
+        expected_key = json_key(predicate)
+        check = lambda v: json_key(v) == expected_key
+        description = description or f"等于 {predicate!r}"
+    
+    # 判断条件抛出的异常按该值不满足处理，继续检查其余值
+    failures = []
+    for i, v in enumerate(values):
+        try:
+            if not check(v):
+                failures.append(f"[{i}]={v!r}")
+        except Exception as e:
+            failures.append(f"[{i}]={v!r} ({type(e).__name__}: {e})")
+    if not failures:
+        return None, description
+    samples = ', '.join(failures[:10])
+    return (
+        f"条件断言失败: {path} 共 {len(values)} 个值, {len(failures)} 个不满足「{description}」: {samples}"
+        + (" ..." if len(failures) > 10 else ""),
+        description
+    )
+
+
+def _check_count(path: str, count: int, expected_count: Optional[int],
+                 min_count: Optional[int], max_count: Optional[int]) -> Optional[str]:
+    """检查匹配数量，返回错误信息或None"""
+    if expected_count is not None and count != expected_count:
+        return f"数量断言失败: {path} 期望 {expected_count}, 实际 {count}"
+    if min_count is not None and count < min_count:
+        return f"数量断言失败: {path} 期望至少 {min_count}, 实际 {count}"
+    if max_count is not None and count > max_count:
+        return f"数量断言失败: {path} 期望至多 {max_count}, 实际 {count}"
+    return None
+
+
+def _check_unique(path: str, values: List[Any]) -> Optional[str]:
+    """检查值是否互不重复（按JSON语义比较: 1 与 True 不同，1 与 1.0 相同），返回错误信息或None"""
+    seen = set()
+    duplicates = []
+    for value in values:
+        marker = json_key(value)
+        if marker in seen:
+            duplicates.append(value)
+        seen.add(marker)
+    if duplicates:
+        return f"唯一性断言失败: {path} 存在重复值 {duplicates[:10]}"
+    return None
+
+
 class Assertion:
     """
     断言工具类
     
     提供各种断言方法，用于验证接口响应是否符合预期
+    同一个响应的JSON只解析一次，多个断言共享解析结果
     """
     
+    @staticmethod
+    def _get_json(response) -> Any:
+        """
+        获取响应的JSON数据（使用缓存，避免重复解析）
+        
+        Raises:
+            AssertionError: 如果响应不是有效的JSON
+        """
+        try:
+            return parse_json(response)
+        except ValueError:
+            raise AssertionError(f"响应不是有效的JSON格式: {response.text[:200]}")
+    
+    @staticmethod
+    def _extract(json_data: Any, key: str) -> Any:
+        """
+        按JSON路径取值
+        
+        单值路径（如 'data.user.name'）返回该值；
+        多值路径（含通配符、切片或过滤器）返回所有匹配值组成的列表
+        
+        Raises:
+            AssertionError: 如果字段不存在（多值路径没有任何匹配）
+        """
+        path = compile_path(key)
+        values = path.find(json_data)
+        if not values:
+            raise AssertionError(f"字段不存在: {key}")
+        return values[0] if path.singular else values
+    
+    @staticmethod
+    def batch(response) -> 'AssertionBatch':
+        """
+        创建批量断言（软断言）
+        
+        在 with 块中登记多个断言，退出时在一次遍历中统一检查，
+        只输出一条汇总日志，并在失败时一次性列出所有不通过项
+        
+        Args:
+            response: Response对象
+            
+        Returns:
+            AssertionBatch对象
+            
+        示例:
+            with Assertion.batch(response) as check:
+                check.assert_status_code(200)
+                check.assert_json_contains("code", 200)
+                check.assert_json_contains("data.username", "test_user")
+                check.assert_all("data.messages[*].message_id", int)
+        """
+        return AssertionBatch(response)
+    
     @staticmethod
     def assert_status_code(response, expected_code: int):
         """
@@ -39,34 +158,22 @@ class Assertion:
         
         Args:
             response: Response对象
-            key: 字段名（支持点号分隔的嵌套字段，如 'data.user.name'）
+            key: JSON路径（如 'data.user.name'、'data.messages[0].title'，
+                 含通配符/过滤器时取值为所有匹配值组成的列表，详见 core.json_path）
             expected_value: 期望的值（可选，如果提供则验证值是否匹配）
             
         Raises:
             AssertionError: 如果字段不存在或值不匹配
         """
-        try:
-            json_data = response.json()
-        except:
-            raise AssertionError(f"响应不是有效的JSON格式: {response.text[:200]}")
-        
-        # 支持嵌套字段访问
-        keys = key.split('.')
-        value = json_data
+        json_data = Assertion._get_json(response)
+        value = Assertion._extract(json_data, key)
         
-        try:
-            for k in keys:
-                value = value[k]
-            
-            if expected_value is not None:
-                assert value == expected_value, \
-                    f"字段值断言失败: {key} 期望 {expected_value}, 实际 {value}"
-                logger.info(f"✓ 字段值断言通过: {key} = {value}")
-            else:
-                logger.info(f"✓ 字段存在断言通过: {key}")
-                
-        except (KeyError, TypeError):
-            raise AssertionError(f"字段不存在: {key}")
+        if expected_value is not None:
+            assert value == expected_value, \
+                f"字段值断言失败: {key} 期望 {expected_value}, 实际 {value}"
+            logger.info(f"✓ 字段值断言通过: {key} = {value}")
+        else:
+            logger.info(f"✓ 字段存在断言通过: {key}")
     
     @staticmethod
     def assert_json_equal(response, expected_data: Dict):
@@ -75,32 +182,112 @@ class Assertion:
         
         Args:
             response: Response对象
-            expected_data: 期望的JSON数据
+            expected_data: 期望的JSON数据（键为JSON路径）
             
         Raises:
             AssertionError: 如果响应不匹配
         """
-        try:
-            actual_data = response.json()
-        except:
-            raise AssertionError(f"响应不是有效的JSON格式: {response.text[:200]}")
+        actual_data = Assertion._get_json(response)
         
         # 只比较期望数据中的字段
         for key, expected_value in expected_data.items():
-            keys = key.split('.')
-            actual_value = actual_data
-            
-            try:
-                for k in keys:
-                    actual_value = actual_value[k]
-            except (KeyError, TypeError):
-                raise AssertionError(f"字段不存在: {key}")
-            
+            actual_value = Assertion._extract(actual_data, key)
             assert actual_value == expected_value, \
                 f"字段 {key} 不匹配: 期望 {expected_value}, 实际 {actual_value}"
         
         logger.info("✓ JSON完全匹配断言通过")
     
+    @staticmethod
+    def assert_all(response, path: str, predicate: Union[Callable[[Any], bool], type, Any],
+                   description: Optional[str] = None):
+        """
+        断言路径匹配到的每个值都满足条件（一次遍历检查整个列表）
+        
+        Args:
+            response: Response对象
+            path: JSON路径（如 'data.messages[*].receiver_id'）
+            predicate: 判断条件，可以是:
+                       - 可调用对象：返回True表示通过，如 lambda v: v > 0
+                       - 类型或类型元组：isinstance检查，如 int、(int, float)
+                       - 其他值：按JSON语义相等比较（True 不等于 1，1 等于 1.0）
+            description: 条件描述（用于日志和错误信息）
+            
+        Raises:
+            AssertionError: 如果没有匹配的值，或存在不满足条件的值（判断条件抛出异常的值视为不满足）
+            
+        示例:
+            Assertion.assert_all(response, "data.messages[*].message_id", int)
+            Assertion.assert_all(response, "data.messages[*].title", lambda t: len(t) > 0, "标题非空")
+        """
+        values = compile_path(path).find(Assertion._get_json(response))
+        if not values:
+            raise AssertionError(f"字段不存在: {path}")
+        
+        error, description = _check_all(path, values, predicate, description)
+        if error:
+            raise AssertionError(error)
+        logger.info(f"✓ 条件断言通过: {path} 共 {len(values)} 个值均满足「{description}」")
+    
+    @staticmethod
+    def assert_count(response, path: str, expected_count: Optional[int] = None,
+                     min_count: Optional[int] = None, max_count: Optional[int] = None):
+        """
+        断言路径匹配到的值数量
+        
+        Args:
+            response: Response对象
+            path: JSON路径（如 'data.messages[*]'、'data.messages[?(@.receiver_id == 1002)]'）
+            expected_count: 期望的数量（精确匹配）
+            min_count: 最小数量
+            max_count: 最大数量
+            
+        Raises:
+            AssertionError: 如果数量不符合预期
+        """
+        count = len(compile_path(path).find(Assertion._get_json(response)))
+        error = _check_count(path, count, expected_count, min_count, max_count)
+        if error:
+            raise AssertionError(error)
+        logger.info(f"✓ 数量断言通过: {path} 共 {count} 个")
+    
+    @staticmethod
+    def assert_unique(response, path: str):
+        """
+        断言路径匹配到的值互不重复（如列表中的ID）
+        
+        Args:
+            response: Response对象
+            path: JSON路径（如 'data.messages[*].message_id'）
+            
+        Raises:
+            AssertionError: 如果存在重复值
+        """
+        values = compile_path(path).find(Assertion._get_json(response))
+        error = _check_unique(path, values)
+        if error:
+            raise AssertionError(error)
+        logger.info(f"✓ 唯一性断言通过: {path} 共 {len(values)} 个值")
+    
+    @staticmethod
+    def assert_schema(response, schema_name: str):
+        """
+        断言响应符合JSON Schema
+        
+        Schema从 config/schemas/<schema_name>.yaml 加载，每个Schema在进程内只编译一次
+        
+        Args:
+            response: Response对象
+            schema_name: Schema名称（如 'message_list'）
+            
+        Raises:
+            AssertionError: 如果响应结构不符合Schema
+        """
+        errors = get_validator(schema_name).validate(Assertion._get_json(response))
+        if errors:
+            details = '\n'.join(f"  - {error}" for error in errors)
+            raise AssertionError(f"Schema断言失败: {schema_name}\n{details}")
+        logger.info(f"✓ Schema断言通过: {schema_name}")
+    
     @staticmethod
     def assert_response_time(response, max_time: float):
         """
@@ -132,3 +319,156 @@ class Assertion:
         assert response.ok, f"请求失败: 状态码 {response.status_code}"
         logger.info("✓ 请求成功断言通过")
 
+
+class AssertionBatch:
+    """
+    批量断言类
+    
+    通过 Assertion.batch(response) 创建。登记的断言不会立即执行，
+    在退出 with 块（或调用 verify()）时统一检查：
+    - 所有JSON路径通过 find_many 一次遍历求值，公共前缀只访问一次
+    - 只输出一条汇总日志
+    - 存在失败项时抛出一个 AssertionError，列出全部不通过项
+    """
+    
+    # 不需要解析响应JSON的断言
+    _NON_JSON_CHECKS = ('status_code', 'success', 'response_time')
+    
+    def __init__(self, response):
+        self.response = response
+        self._checks: List[tuple] = []
+    
+    def __enter__(self) -> 'AssertionBatch':
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        # with 块内出现异常时直接抛出原异常，不再检查
+        if exc_type is None:
+            self.verify()
+        return False
+    
+    def assert_status_code(self, expected_code: int) -> 'AssertionBatch':
+        """登记状态码断言"""
+        self._checks.append(('status_code', expected_code))
+        return self
+    
+    def assert_success(self) -> 'AssertionBatch':
+        """登记请求成功（状态码2xx）断言"""
+        self._checks.append(('success',))
+        return self
+    
+    def assert_response_time(self, max_time: float) -> 'AssertionBatch':
+        """登记响应时间断言（秒）"""
+        self._checks.append(('response_time', max_time))
+        return self
+    
+    def assert_json_contains(self, key: str, expected_value: Any = None) -> 'AssertionBatch':
+        """登记字段存在/字段值断言，参数同 Assertion.assert_json_contains"""
+        self._checks.append(('json_contains', key, expected_value))
+        return self
+    
+    def assert_json_equal(self, expected_data: Dict) -> 'AssertionBatch':
+        """登记多个字段值断言，参数同 Assertion.assert_json_equal"""
+        for key, expected_value in expected_data.items():
+            self._checks.append(('json_equal', key, expected_value))
+        return self
+    
+    def assert_all(self, path: str, predicate, description: Optional[str] = None) -> 'AssertionBatch':
+        """登记条件断言，参数同 Assertion.assert_all"""
+        self._checks.append(('all', path, predicate, description))
+        return self
+    
+    def assert_count(self, path: str, expected_count: Optional[int] = None,
+                     min_count: Optional[int] = None, max_count: Optional[int] = None) -> 'AssertionBatch':
+        """登记数量断言，参数同 Assertion.assert_count"""
+        self._checks.append(('count', path, expected_count, min_count, max_count))
+        return self
+    
+    def assert_unique(self, path: str) -> 'AssertionBatch':
+        """登记唯一性断言，参数同 Assertion.assert_unique"""
+        self._checks.append(('unique', path))
+        return self
+    
+    def assert_schema(self, schema_name: str) -> 'AssertionBatch':
+        """登记Schema断言，参数同 Assertion.assert_schema"""
+        self._checks.append(('schema', schema_name))
+        return self
+    
+    def _resolve_paths(self, checks: List[tuple]) -> Dict[str, List[Any]]:
+        """一次遍历求出所有登记的JSON路径"""
+        json_checks = [check for check in checks if check[0] not in self._NON_JSON_CHECKS]
+        if not json_checks:
+            return {}
+        json_data = Assertion._get_json(self.response)
+        return find_many(json_data, [check[1] for check in json_checks if check[0] != 'schema'])
+    
+    def _run_check(self, check: tuple, values: Dict[str, List[Any]]) -> Optional[str]:
+        """执行单个断言，返回错误信息或None"""
+        kind = check[0]
+        response = self.response
+        
+        if kind == 'status_code':
+            if response.status_code != check[1]:
+                return f"状态码断言失败: 期望 {check[1]}, 实际 {response.status_code}"
+        elif kind == 'success':
+            if not response.ok:
+                return f"请求失败: 状态码 {response.status_code}"
+        elif kind == 'response_time':
+            actual_time = response.elapsed.total_seconds()
+            if actual_time > check[1]:
+                return f"响应时间过长: {actual_time:.2f}s > {check[1]}s"
+        elif kind in ('json_contains', 'json_equal'):
+            key, expected_value = check[1], check[2]
+            matches = values[key]
+            if not matches:
+                return f"字段不存在: {key}"
+            actual = matches[0] if compile_path(key).singular else matches
+            if kind == 'json_contains' and expected_value is None:
+                return None
+            if actual != expected_value:
+                return f"字段 {key} 不匹配: 期望 {expected_value}, 实际 {actual}"
+        elif kind == 'all':
+            path = check[1]
+            if not values[path]:
+                return f"字段不存在: {path}"
+            return _check_all(path, values[path], check[2], check[3])[0]
+        elif kind == 'count':
+            path = check[1]
+            return _check_count(path, len(values[path]), *check[2:])
+        elif kind == 'unique':
+            return _check_unique(check[1], values[check[1]])
+        elif kind == 'schema':
+            errors = get_validator(check[1]).validate(Assertion._get_json(response))
+            if errors:
+                return f"Schema断言失败: {check[1]}: " + '; '.join(errors)
+        return None
+    
+    def verify(self):
+        """
+        执行所有登记的断言
+        
+        Raises:
+            AssertionError: 如果存在不通过的断言（列出全部失败项）
+        """
+        total = len(self._checks)
+        checks, self._checks = self._checks, []
+        try:
+            values = self._resolve_paths(checks)
+            json_error = None
+        except AssertionError as e:
+            # 响应不是JSON时，所有字段类断言都记为失败
+            values, json_error = {}, str(e)
+        
+        errors = []
+        for check in checks:
+            if json_error and check[0] not in self._NON_JSON_CHECKS:
+                errors.append(f"{check[1]}: {json_error}")
+                continue
+            error = self._run_check(check, values)
+            if error:
+                errors.append(error)
+        if errors:
+            details = '\n'.join(f"  {i}. {error}" for i, error in enumerate(errors, 1))
+            logger.error(f"✗ 批量断言失败: {len(errors)}/{total} 项不通过")
+            raise AssertionError(f"批量断言失败: {len(errors)}/{total} 项不通过\n{details}")
+        logger.info(f"✓ 批量断言通过: 共 {total} 项")
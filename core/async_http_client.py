@@ -0,0 +1,359 @@
+"""
+异步HTTP客户端封装
+基于aiohttp提供与HttpClient一致的异步请求接口，适用于大量I/O密集型并发请求
+"""
+import asyncio
+import json
+import time
+from datetime import timedelta
+from typing import Dict, Any, Optional
+
+import aiohttp
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from core.cassette import entry_content, make_key
+from core.deadline import DeadlineExceeded, limit_timeout, sleep_allowed
+from core.http_client import BaseHttpClient
+from core.logger import get_logger
+from core.resilience import CircuitOpenError, RetryPolicy
+from core.response import parse_json
+from core.timing import RequestTiming, timing_trace_config
+
+logger = get_logger(__name__)
+
+
+class AsyncResponse:
+    """
+    异步响应对象
+
+    响应体在请求时已完整读取，提供与requests.Response一致的常用属性和方法，
+    因此可直接用于Assertion中的各种断言
+    """
+
+    def __init__(self, status_code: int, reason: str, url: str, headers: Dict,
+                 content: bytes, encoding: Optional[str], elapsed: timedelta):
+        self.status_code = status_code
+        self.reason = reason
+        self.url = url
+        self.headers = CaseInsensitiveDict(headers)
+        self.content = content
+        self.encoding = encoding or 'utf-8'
+        self.elapsed = elapsed
+        # 阶段耗时（core.timing.RequestTiming），回放录像或命中缓存时为None
+        self.timing: Optional[RequestTiming] = None
+
+    @property
+    def text(self) -> str:
+        """响应文本"""
+        return self.content.decode(self.encoding, errors='replace')
+
+    @property
+    def ok(self) -> bool:
+        """状态码是否小于400"""
+        return self.status_code < 400
+
+    def json(self, **kwargs) -> Any:
+        """解析JSON响应体（无参数调用时只解析一次）"""
+        if kwargs:
+            return json.loads(self.content, **kwargs)
+        return parse_json(self)
+
+    def raise_for_status(self):
+        """状态码为4xx/5xx时抛出 requests.HTTPError，与同步客户端保持一致"""
+        if 400 <= self.status_code < 500:
+            kind = 'Client Error'
+        elif 500 <= self.status_code < 600:
+            kind = 'Server Error'
+        else:
+            return
+        raise requests.exceptions.HTTPError(
+            f"{self.status_code} {kind}: {self.reason} for url: {self.url}",
+            response=self
+        )
+
+
+class AsyncHttpClient(BaseHttpClient):
+    """
+    异步HTTP客户端类
+
+    封装aiohttp，提供与HttpClient相同的 get/post/put/delete 接口与日志输出。
+    超时和连接失败分别抛出 requests.exceptions.Timeout / ConnectionError，
+    用例中的异常处理无需区分同步或异步客户端。超时、截止时间、重试、熔断、录制/回放与响应缓存行为与HttpClient相同。
+
+    示例:
+        async with AsyncHttpClient(base_url) as client:
+            response = await client.get("/api/user/info", params={"user_id": 1001})
+    """
+
+    def __init__(
+        self,
+        base_url: str = "",
+        timeout: float = 30,
+        pool_config: Optional[Dict[str, Any]] = None,
+        max_body_length: Optional[int] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[Dict[str, Any]] = None,
+        connect_timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+        cassette: Optional[Dict[str, Any]] = None,
+        cache: Optional[Dict[str, Any]] = None
+    ):
+        """
+        初始化异步HTTP客户端
+
+        Args:
+            base_url: 基础URL，所有请求会拼接这个URL
+            timeout: 读取超时时间（秒），即等待服务端返回数据的最长时间
+            pool_config: 连接池配置（pool_maxsize对应每个主机的最大并发连接数，
+                         keepalive_timeout对应空闲连接保活时间），不提供则读取配置文件
+            max_body_length: DEBUG日志中请求体/响应体的最大长度，不提供则读取 log.max_body_length
+            retry_policy: 重试策略，不提供则读取 api.retry
+            circuit_breaker: 熔断器配置，不提供则读取 api.circuit_breaker
+            connect_timeout: 建立连接超时时间（秒），不提供则读取 api.connect_timeout
+            deadline: 单个请求（含重试）的总时长上限（秒），不提供则读取 api.deadline
+            cassette: 录制/回放配置，不提供则读取 api.cassette
+            cache: GET响应缓存配置，不提供则读取 api.cache（与同步客户端共享缓存及失效，缓存键区分客户端类型）
+        """
+        from core.config import config
+
+        self.base_url = base_url.rstrip('/')
+        self._init_timeouts(timeout, connect_timeout, deadline)
+        self.max_body_length = max_body_length or config.get_log_max_body_length()
+
+        if pool_config is None:
+            pool_config = config.get_api_pool_config()
+        self.pool_config = pool_config
+        self._init_resilience(retry_policy, circuit_breaker)
+        self._init_cassette(cassette)
+        self._init_cache(cache)
+
+        # session需要在事件循环中创建，首次请求时再初始化
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """获取（必要时创建）aiohttp会话"""
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=0,  # 不限制总连接数，由每个主机的上限控制并发
+                limit_per_host=self.pool_config.get('pool_maxsize') or 0,
+                keepalive_timeout=self.pool_config.get('keepalive_timeout') or 15
+            )
+            self.session = aiohttp.ClientSession(connector=connector, trace_configs=[timing_trace_config()])
+        return self.session
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict] = None,
+        data: Optional[Dict] = None,
+        json_data: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+        **kwargs
+    ) -> AsyncResponse:
+        """
+        发送异步HTTP请求
+
+        Args:
+            method: 请求方法（GET、POST、PUT、DELETE等）
+            path: 接口路径
+            params: URL参数（用于GET请求）
+            data: 表单数据（Content-Type: application/x-www-form-urlencoded）
+            json_data: JSON数据（Content-Type: application/json）
+            headers: 请求头
+            **kwargs: 其他aiohttp参数（传入 timeout（aiohttp.ClientTimeout）时覆盖客户端的超时配置）
+
+        Returns:
+            AsyncResponse对象
+        """
+        url = self._build_url(path)
+
+        # 准备请求参数
+        request_kwargs = dict(kwargs)
+        if params:
+            request_kwargs['params'] = params
+        if data:
+            request_kwargs['data'] = data
+        if json_data:
+            request_kwargs['json'] = json_data
+        if headers:
+            request_kwargs['headers'] = headers
+
+        cache_key, cached = self._cache_lookup(method, url, request_kwargs)
+        if cached is not None:
+            logger.info(f"[缓存命中] {method} {url}")
+            return cached
+
+        # 记录请求日志
+        self._log_request(method, url, **request_kwargs)
+
+        session = self._get_session()
+        custom_timeout = request_kwargs.pop('timeout', None)
+        deadlines = self._start_deadlines()
+
+        breaker = self._get_breaker(url)
+        request_id = self._new_request_id()
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            timing = RequestTiming()
+            admitted = False
+            try:
+                try:
+                    timeout = custom_timeout or self._client_timeout(deadlines, url)
+                    if breaker is not None and not breaker.allow():
+                        raise breaker.reject()
+                    admitted = True
+                    response = await self._send(session, method, url, timeout, start, request_kwargs, timing)
+                    timing.finish()
+                    response.timing = timing if timing.measured else None
+                except Exception as e:
+                    if breaker is not None and not isinstance(e, (CircuitOpenError, DeadlineExceeded)):
+                        breaker.record_failure()
+                    # 指标中记录aiohttp的原始异常
+                    self._publish_metrics(method, url, start, error=e.__cause__ or e, request_id=request_id,
+                                          attempt=attempt, request_kwargs=request_kwargs, timing=timing)
+                    if self.retry_policy.should_retry_exception(method, e, attempt):
+                        delay = self._retry_delay(attempt)
+                        if sleep_allowed(delay, deadlines):
+                            self._log_retry(method, url, f"请求异常 {type(e).__name__}", attempt, delay)
+                            await asyncio.sleep(delay)
+                            attempt += 1
+                            continue
+                    self._log_error(url, e)
+                    raise
+
+                self._publish_metrics(method, url, start, response=response, request_id=request_id,
+                                      attempt=attempt, request_kwargs=request_kwargs, timing=timing)
+                if breaker is not None:
+                    breaker.record_response(response.status_code)
+                if self.retry_policy.should_retry_status(method, response.status_code, attempt):
+                    delay = self._retry_delay(attempt, response.headers.get('Retry-After'))
+                    if sleep_allowed(delay, deadlines):
+                        self._log_retry(method, url, f"响应状态码 {response.status_code}", attempt, delay)
+                        await asyncio.sleep(delay)
+                        attempt += 1
+                        continue
+                break
+            finally:
+                # 半开状态的探测请求未记录结果就结束时（如截止时间到期、任务被取消），允许下一个请求探测
+                if breaker is not None and admitted:
+                    breaker.release()
+
+        # 记录响应日志
+        self._log_response(response)
+
+        # 如果状态码不是2xx，记录警告
+        if not response.ok:
+            logger.warning(f"请求失败: {response.status_code} - {response.text[:200]}")
+
+        self._cache_update(method, url, cache_key, response)
+        return response
+
+    def _client_timeout(self, deadlines, url: str) -> aiohttp.ClientTimeout:
+        """
+        生成本次请求的aiohttp超时配置：连接/读取超时按剩余时间收紧，有截止时间时总时长不超过剩余时间
+
+        Raises:
+            DeadlineExceeded: 如果截止时间已到期
+        """
+        connect, read = limit_timeout(self.connect_timeout, self.timeout, deadlines, url)
+        total = min(deadline.remaining() for deadline in deadlines) if deadlines else None
+        return aiohttp.ClientTimeout(total=total, sock_connect=connect, sock_read=read)
+
+    async def _send(self, session: aiohttp.ClientSession, method: str, url: str, timeout: aiohttp.ClientTimeout,
+                    start: float, request_kwargs: Dict, timing: RequestTiming) -> AsyncResponse:
+        """发送一次请求（录制模式下写入录像，回放模式下由录像返回）"""
+        cassette = self.cassette
+        if cassette is None:
+            return await self._fetch(session, method, url, timeout, start, request_kwargs, timing)
+
+        key = make_key(method, url, request_kwargs.get('params'), request_kwargs.get('data'), request_kwargs.get('json'))
+        if cassette.replaying:
+            entry = cassette.play(key)
+            headers = entry.get('headers') or {}
+            return AsyncResponse(
+                status_code=entry['status_code'],
+                reason=entry.get('reason', ''),
+                url=entry['url'],
+                headers=headers,
+                content=entry_content(entry),
+                encoding=get_encoding_from_headers(CaseInsensitiveDict(headers)),
+                elapsed=timedelta(seconds=entry.get('elapsed', 0))
+            )
+        try:
+            response = await self._fetch(session, method, url, timeout, start, request_kwargs, timing)
+        except requests.exceptions.RequestException as e:
+            cassette.record_error(key, e)
+            raise
+        cassette.record_response(key, response)
+        return response
+
+    async def _fetch(self, session: aiohttp.ClientSession, method: str, url: str, timeout: aiohttp.ClientTimeout,
+                     start: float, request_kwargs: Dict, timing: RequestTiming) -> AsyncResponse:
+        """
+        发送一次请求并读取完整响应体（阶段耗时由 TraceConfig 记录到 timing）
+
+        超时和连接失败转换为 requests.exceptions.Timeout / ConnectionError，与同步客户端保持一致
+        """
+        try:
+            async with session.request(method, url, timeout=timeout, trace_request_ctx=timing,
+                                       **request_kwargs) as resp:
+                content = await resp.read()
+                return AsyncResponse(
+                    status_code=resp.status,
+                    reason=resp.reason or '',
+                    url=str(resp.url),
+                    headers=dict(resp.headers),
+                    content=content,
+                    encoding=resp.get_encoding() if content else None,
+                    elapsed=timedelta(seconds=time.perf_counter() - start)
+                )
+        except asyncio.TimeoutError as e:
+            raise requests.exceptions.Timeout(str(e) or f"请求超时: {url}") from e
+        except aiohttp.ClientConnectionError as e:
+            raise requests.exceptions.ConnectionError(str(e)) from e
+
+    async def get(self, path: str, params: Optional[Dict] = None, headers: Optional[Dict] = None, **kwargs) -> AsyncResponse:
+        """发送异步GET请求"""
+        return await self.request('GET', path, params=params, headers=headers, **kwargs)
+
+    async def post(
+        self,
+        path: str,
+        data: Optional[Dict] = None,
+        json_data: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+        **kwargs
+    ) -> AsyncResponse:
+        """发送异步POST请求"""
+        return await self.request('POST', path, data=data, json_data=json_data, headers=headers, **kwargs)
+
+    async def put(
+        self,
+        path: str,
+        data: Optional[Dict] = None,
+        json_data: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+        **kwargs
+    ) -> AsyncResponse:
+        """发送异步PUT请求"""
+        return await self.request('PUT', path, data=data, json_data=json_data, headers=headers, **kwargs)
+
+    async def delete(self, path: str, headers: Optional[Dict] = None, **kwargs) -> AsyncResponse:
+        """发送异步DELETE请求"""
+        return await self.request('DELETE', path, headers=headers, **kwargs)
+
+    async def close(self):
+        """关闭session"""
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
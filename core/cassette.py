@@ -0,0 +1,326 @@
+"""
+请求录制与回放
+录制模式（record）: 每次实际发送的请求及其响应/异常追加写入 JSONL 录像文件
+回放模式（replay）: 启动时将录像加载为内存索引（方法 + URL + 规范化请求体），请求直接由录像返回，不需要Mock服务或后端
+
+录像文件每行一条记录:
+    {"method": "GET", "url": "http://127.0.0.1:5000/api/user/info?user_id=1001", "body": "",
+     "status_code": 200, "reason": "OK", "headers": {...}, "content": "...", "elapsed": 0.003}
+请求失败时记录异常（如超时），回放时抛出同类异常:
+    {"method": "GET", "url": "...", "body": "", "error": "requests.exceptions.ReadTimeout", "message": "..."}
+
+记录带有录制时所在的用例（scope，由 conftest 通过 cassette_scope 设置），回放时优先匹配同一用例中的记录，
+用例被跳过或执行顺序变化时不影响其他用例；同一用例中相同请求出现多次时按录制顺序依次返回，用完后重复返回最后一条。
+录制模式只追加不覆盖，重新录制前需删除旧文件
+"""
+import base64
+import importlib
+import json
+import os
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+# run.py --record / --replay 通过环境变量传递给 pytest 及并行工作进程（优先于 api.cassette 配置）
+CASSETTE_MODE_ENV = 'LIQUID_CASSETTE_MODE'
+CASSETTE_PATH_ENV = 'LIQUID_CASSETTE_PATH'
+
+RECORD = 'record'
+REPLAY = 'replay'
+
+# 未配置录像路径时，在报告目录（report.dir）下使用的文件名
+DEFAULT_FILE_NAME = 'cassette.jsonl'
+
+# 录制时不保存的响应头（响应体保存的是解码后的内容，长度重新计算）
+_SKIPPED_HEADERS = frozenset(('content-encoding', 'transfer-encoding', 'content-length', 'connection', 'keep-alive'))
+
+Key = Tuple[str, str, str]
+
+
+class CassetteMissError(requests.exceptions.RequestException):
+    """回放模式下录像中没有匹配的请求"""
+
+
+_scope: ContextVar[str] = ContextVar('liquid_cassette_scope', default='')
+
+
+@contextmanager
+def cassette_scope(name: str) -> Iterator[None]:
+    """
+    在上下文内设置录像作用域（通常为用例 nodeid），期间录制的记录带上该作用域，回放时优先在作用域内匹配
+    """
+    token = _scope.set(name)
+    try:
+        yield
+    finally:
+        _scope.reset(token)
+
+
+def _normalize_body(body: Any) -> str:
+    """
+    规范化请求体：JSON 按键排序、表单按字段排序，字段顺序或空白不同的相同请求可以匹配
+    """
+    if not body:
+        return ''
+    if isinstance(body, bytes):
+        body = body.decode('utf-8', errors='replace')
+    try:
+        return json.dumps(json.loads(body), ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    except ValueError:
+        pass
+    try:
+        return urlencode(sorted(parse_qsl(body, keep_blank_values=True, strict_parsing=True)))
+    except ValueError:
+        return body
+
+
+def make_key(method: str, url: str, params: Optional[Dict] = None,
+             data: Optional[Dict] = None, json_data: Optional[Any] = None) -> Key:
+    """
+    生成请求的匹配键（方法, 规范化URL, 规范化请求体）
+
+    URL和请求体按 requests 的方式编码，同步和异步客户端的相同请求得到相同的键
+    """
+    prepared = requests.Request(method.upper(), url, params=params, data=data, json=json_data).prepare()
+    parts = urlsplit(prepared.url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return prepared.method, urlunsplit((parts.scheme, parts.netloc, parts.path, query, '')), _normalize_body(prepared.body)
+
+
+def _error_name(error: BaseException) -> str:
+    return f"{type(error).__module__}.{type(error).__qualname__}"
+
+
+def _load_error(name: str, message: str) -> requests.exceptions.RequestException:
+    """根据录制的异常名称重建异常（无法导入时按连接失败处理）"""
+    module_name, _, class_name = name.rpartition('.')
+    try:
+        cls = getattr(importlib.import_module(module_name), class_name)
+    except (ImportError, AttributeError, ValueError):
+        cls = None
+    if not (isinstance(cls, type) and issubclass(cls, requests.exceptions.RequestException)):
+        cls = requests.exceptions.ConnectionError
+    return cls(message)
+
+
+class Cassette:
+    """
+    录像文件
+
+    同一路径的录像由所有客户端共享（见 get_cassette），录制和回放都是线程安全的
+    """
+
+    def __init__(self, path: str, mode: str):
+        """
+        Args:
+            path: 录像文件路径（JSONL）
+            mode: record（录制）或 replay（回放）
+
+        Raises:
+            ValueError: 如果 mode 无效
+            FileNotFoundError: 如果回放模式下录像文件不存在
+        """
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"不支持的录像模式: {mode}（可选: {RECORD}、{REPLAY}）")
+        self.path = path
+        self.mode = mode
+        self._lock = threading.Lock()
+        # (作用域, 匹配键) -> 按录制顺序排列的记录；作用域为 None 时包含该匹配键的全部记录
+        self._entries: Dict[Tuple[Optional[str], Key], List[Dict[str, Any]]] = defaultdict(list)
+        self._positions: Dict[Tuple[Optional[str], Key], int] = defaultdict(int)
+        self._fd: Optional[int] = None
+        if mode == REPLAY:
+            self._load()
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == RECORD
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == REPLAY
+
+    def _load(self):
+        """加载录像并建立索引"""
+        count = 0
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for lineno, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                    key = (entry['method'], entry['url'], entry.get('body', ''))
+                except (ValueError, KeyError, TypeError):
+                    logger.warning(f"录像第 {lineno} 行格式错误，已跳过: {self.path}")
+                    continue
+                self._entries[(entry.get('scope', ''), key)].append(entry)
+                self._entries[(None, key)].append(entry)
+                count += 1
+        requests_count = sum(1 for scope, _ in self._entries if scope is None)
+        logger.info(f"已加载录像 {self.path}: {count} 条记录, {requests_count} 个不同请求")
+
+    def _append(self, entry: Dict[str, Any]):
+        """追加一条记录（每条记录一次 write，并行进程录制到同一文件时不会交错）"""
+        line = (json.dumps(entry, ensure_ascii=False) + '\n').encode('utf-8')
+        with self._lock:
+            if self._fd is None:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            os.write(self._fd, line)
+
+    @staticmethod
+    def _new_entry(key: Key) -> Dict[str, Any]:
+        entry = {'method': key[0], 'url': key[1], 'body': key[2]}
+        scope = _scope.get()
+        if scope:
+            entry['scope'] = scope
+        return entry
+
+    def record_response(self, key: Key, response) -> None:
+        """
+        录制响应
+
+        Args:
+            key: 请求匹配键（make_key）
+            response: requests.Response 或 AsyncResponse（响应体已读取）
+        """
+        entry = self._new_entry(key)
+        entry.update({
+            'status_code': response.status_code,
+            'reason': response.reason,
+            'headers': {k: v for k, v in response.headers.items() if k.lower() not in _SKIPPED_HEADERS},
+            'elapsed': response.elapsed.total_seconds(),
+        })
+        try:
+            entry['content'] = response.content.decode('utf-8')
+        except UnicodeDecodeError:
+            entry['content_base64'] = base64.b64encode(response.content).decode('ascii')
+        self._append(entry)
+
+    def record_error(self, key: Key, error: BaseException) -> None:
+        """录制请求异常（超时、连接失败等）"""
+        entry = self._new_entry(key)
+        entry.update({'error': _error_name(error), 'message': str(error)})
+        self._append(entry)
+
+    def play(self, key: Key) -> Dict[str, Any]:
+        """
+        回放请求
+
+        Returns:
+            录制的响应记录
+
+        Raises:
+            CassetteMissError: 如果录像中没有匹配的请求
+            requests.exceptions.RequestException: 录制时请求失败，抛出同类异常
+        """
+        index = (_scope.get(), key)
+        entries = self._entries.get(index)
+        if not entries:
+            # 当前用例没有录制该请求时，使用其他用例中的记录
+            index = (None, key)
+            entries = self._entries.get(index)
+        if not entries:
+            raise CassetteMissError(f"录像中没有匹配的请求: {key[0]} {key[1]} {key[2][:200]}".rstrip())
+        with self._lock:
+            position = self._positions[index]
+            self._positions[index] = min(position + 1, len(entries) - 1)
+        entry = entries[position]
+        if 'error' in entry:
+            raise _load_error(entry['error'], entry.get('message', ''))
+        return entry
+
+    def close(self):
+        """关闭录像文件"""
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+
+def entry_content(entry: Dict[str, Any]) -> bytes:
+    """录制的响应体"""
+    if 'content_base64' in entry:
+        return base64.b64decode(entry['content_base64'])
+    return entry.get('content', '').encode('utf-8')
+
+
+def build_response(entry: Dict[str, Any]) -> requests.Response:
+    """根据录制的响应记录构造 requests.Response"""
+    response = requests.Response()
+    response.status_code = entry['status_code']
+    response.reason = entry.get('reason', '')
+    response.url = entry['url']
+    response.headers = CaseInsensitiveDict(entry.get('headers') or {})
+    response.encoding = get_encoding_from_headers(response.headers)
+    response.elapsed = timedelta(seconds=entry.get('elapsed', 0))
+    response._content = entry_content(entry)
+    response._content_consumed = True
+    response.request = requests.Request(entry['method'], entry['url']).prepare()
+    return response
+
+
+_cassettes: Dict[Tuple[str, str], Cassette] = {}
+_cassettes_lock = threading.Lock()
+
+
+def _resolve_path(path: Optional[str]) -> str:
+    """
+    录像文件的绝对路径
+
+    未配置时为报告目录下的 cassette.jsonl；相对路径与报告目录一样相对于项目根目录，
+    不随当前工作目录变化（并行工作进程与主进程使用同一个文件）
+    """
+    from core.config import BASE_DIR, config
+    if not path:
+        return os.path.join(config.get_report_dir(), DEFAULT_FILE_NAME)
+    return os.path.abspath(os.path.join(BASE_DIR, path))
+
+
+def get_cassette(settings: Optional[Dict[str, Any]] = None) -> Optional[Cassette]:
+    """
+    获取录像（相同路径、相同模式的客户端共享同一个录像）
+
+    Args:
+        settings: 录像配置（mode、path），不提供则读取 api.cassette，
+                  此时环境变量 LIQUID_CASSETTE_MODE / LIQUID_CASSETTE_PATH 优先于配置
+
+    Returns:
+        Cassette，未开启录制/回放时返回None
+    """
+    if settings is None:
+        from core.config import config
+        settings = dict(config.get_api_cassette_config())
+        settings['mode'] = os.getenv(CASSETTE_MODE_ENV) or settings.get('mode')
+        settings['path'] = os.getenv(CASSETTE_PATH_ENV) or settings.get('path')
+    mode = settings.get('mode')
+    if not mode or str(mode).lower() in ('off', 'none'):
+        return None
+    key = (_resolve_path(settings.get('path')), str(mode).lower())
+    with _cassettes_lock:
+        cassette = _cassettes.get(key)
+        if cassette is None:
+            cassette = _cassettes[key] = Cassette(key[0], key[1])
+        return cassette
+
+
+def close_cassettes():
+    """关闭所有录像文件"""
+    with _cassettes_lock:
+        for cassette in _cassettes.values():
+            cassette.close()
+        _cassettes.clear()
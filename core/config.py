@@ -4,7 +4,7 @@
 """
 import os
 import yaml
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from pathlib import Path
 
 # 获取项目根目录
@@ -73,13 +73,111 @@ class Config:
         return self.get('api.base_url', 'http://127.0.0.1:5000')
     
     def get_api_timeout(self) -> int:
-        """获取API请求超时时间"""
+        """获取API请求超时时间（等待响应数据的读取超时）"""
         return self.get('api.timeout', 30)
     
+    def get_api_connect_timeout(self) -> Optional[float]:
+        """获取建立连接超时时间，未配置时返回None（与读取超时相同）"""
+        return self.get('api.connect_timeout')
+    
+    def get_api_deadline(self) -> Optional[float]:
+        """获取单个请求（含重试）的总时长上限，未配置时返回None（不限制）"""
+        return self.get('api.deadline')
+    
+    def get_test_time_budget(self) -> Optional[float]:
+        """获取每个用例内所有请求的总时长上限，未配置时返回None（不限制）"""
+        return self.get('api.test_time_budget')
+    
+    def get_api_pool_config(self) -> Dict[str, Any]:
+        """
+        获取HTTP连接池配置
+
+        Returns:
+            连接池配置字典（pool_connections、pool_maxsize、pool_block、keepalive_timeout）
+        """
+        return {
+            'pool_connections': self.get('api.pool_connections', 10),
+            'pool_maxsize': self.get('api.pool_maxsize', 50),
+            'pool_block': self.get('api.pool_block', False),
+            'keepalive_timeout': self.get('api.keepalive_timeout'),
+        }
+    
+    def get_api_retry_config(self) -> Dict[str, Any]:
+        """
+        获取请求重试配置
+
+        Returns:
+            重试配置字典（max_retries、backoff_base、backoff_max、statuses、exceptions、methods），
+            未配置的项使用 RetryPolicy 的默认值
+        """
+        return self.get('api.retry', {}) or {}
+    
+    def get_api_circuit_breaker_config(self) -> Dict[str, Any]:
+        """
+        获取熔断器配置
+
+        Returns:
+            熔断器配置字典（enabled、failure_threshold、recovery_timeout、failure_statuses）
+        """
+        return self.get('api.circuit_breaker', {}) or {}
+    
+    def get_api_cassette_config(self) -> Dict[str, Any]:
+        """
+        获取请求录制/回放配置
+
+        Returns:
+            录像配置字典（mode: record / replay / off，path: 录像文件路径）
+        """
+        return self.get('api.cassette', {}) or {}
+    
+    def get_api_cache_config(self) -> Dict[str, Any]:
+        """
+        获取GET响应缓存配置
+
+        Returns:
+            缓存配置字典（enabled、max_entries、ttl），未配置时不启用缓存
+        """
+        return self.get('api.cache', {}) or {}
+    
     def get_log_level(self) -> str:
         """获取日志级别"""
         return self.get('log.level', 'INFO')
     
+    def get_log_max_body_length(self) -> int:
+        """获取DEBUG日志中请求体/响应体的最大记录长度"""
+        return self.get('log.max_body_length', 2000)
+
+    def get_log_queue_enabled(self) -> bool:
+        """是否由后台线程写日志（调用线程只将日志放入队列）"""
+        return bool(self.get('log.queue', True))
+
+    def get_log_file_buffer_size(self) -> int:
+        """获取日志文件写缓冲大小（字节），0 表示每条日志立即写入"""
+        return int(self.get('log.file_buffer_size', 65536))
+
+    def get_log_flush_interval(self) -> float:
+        """获取缓冲中的日志最长多久写入一次磁盘（秒）"""
+        return float(self.get('log.flush_interval', 1.0))
+
+    def get_log_json_events_enabled(self) -> bool:
+        """是否将请求事件以JSON行写入 logs/events_YYYYMMDD.jsonl"""
+        return bool(self.get('log.json_events', False))
+
+    def get_log_rotation_config(self) -> Dict[str, Any]:
+        """
+        获取日志切分与保留配置
+
+        Returns:
+            配置字典（max_bytes: 单个日志文件上限，compress: 是否压缩切分出的日志，
+            retention_days: 旧日志保留天数，max_backups: 最多保留的旧日志数；0 表示不限）
+        """
+        return {
+            'max_bytes': int(self.get('log.max_bytes', 100 * 1024 * 1024)),
+            'compress': bool(self.get('log.compress', True)),
+            'retention_days': float(self.get('log.retention_days', 14)),
+            'max_backups': int(self.get('log.max_backups', 50)),
+        }
+    
     def get_report_dir(self) -> str:
         """获取报告目录"""
         report_dir = self.get('report.dir', 'report')
@@ -88,6 +186,28 @@ class Config:
             report_dir = str(BASE_DIR / report_dir)
         return report_dir
 
+    def get_report_perf_config(self) -> Dict[str, Any]:
+        """
+        获取接口性能汇总配置
+
+        Returns:
+            配置字典（enabled: 是否生成 perf_summary.json，regression_threshold: p95 增幅超过该比例时标记退化，
+            min_samples: 两次运行的样本数都不少于该值时才对比，min_delta_ms: p95 增加不超过该值（毫秒）时不视为退化，
+            routes: 路由模板列表，baselines: 性能基线文件路径，未配置时为None（使用 config/perf_baselines.yaml））
+        """
+        settings = self.get('report.perf', {}) or {}
+        baselines = settings.get('baselines')
+        if baselines and not os.path.isabs(baselines):
+            baselines = str(BASE_DIR / baselines)
+        return {
+            'enabled': bool(settings.get('enabled', True)),
+            'regression_threshold': float(settings.get('regression_threshold', 0.2)),
+            'min_samples': int(settings.get('min_samples', 10)),
+            'min_delta_ms': float(settings.get('min_delta_ms', 5)),
+            'routes': list(settings.get('routes') or []),
+            'baselines': baselines,
+        }
+
 
 # 创建全局配置实例
 config = Config()
@@ -0,0 +1,110 @@
+"""
+请求截止时间与用例时间预算
+Deadline: 截止时间点，剩余时间用于收紧每次请求的连接/读取超时，到期后不再发送请求
+time_budget(): 用例级时间预算，同一用例内的所有请求共同消耗（基于 contextvars，线程/协程之间互不影响）
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional, Tuple
+
+import requests
+
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """截止时间已到（单个请求的总时长上限或用例时间预算用尽），不会重试"""
+
+
+class Deadline:
+    """截止时间"""
+
+    __slots__ = ('name', 'seconds', 'expires_at')
+
+    def __init__(self, seconds: float, name: str = '请求截止时间'):
+        """
+        Args:
+            seconds: 从现在起的可用秒数
+            name: 名称（用于异常信息）
+        """
+        self.name = name
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        """剩余秒数（不小于0）"""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def check(self, url: str = ''):
+        """
+        检查是否已到期
+
+        Raises:
+            DeadlineExceeded: 如果已到期
+        """
+        if self.expired():
+            raise DeadlineExceeded(f"{self.name}已用尽（{self.seconds:g}s）: {url}")
+
+
+_budget: ContextVar[Optional[Deadline]] = ContextVar('liquid_time_budget', default=None)
+
+
+@contextmanager
+def time_budget(seconds: Optional[float]) -> Iterator[Optional[Deadline]]:
+    """
+    在上下文内设置时间预算，期间所有HttpClient/AsyncHttpClient请求（含重试等待）共同消耗
+
+    Args:
+        seconds: 预算秒数，None或0表示不限制
+    """
+    if not seconds:
+        yield None
+        return
+    budget = Deadline(seconds, name='用例时间预算')
+    token = _budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _budget.reset(token)
+
+
+def current_budget() -> Optional[Deadline]:
+    """当前上下文的时间预算（未设置时返回None）"""
+    return _budget.get()
+
+
+def active_deadlines(request_deadline: Optional[Deadline]) -> Tuple[Deadline, ...]:
+    """本次请求需要遵守的截止时间（单个请求的截止时间 + 用例时间预算）"""
+    return tuple(d for d in (request_deadline, current_budget()) if d is not None)
+
+
+def limit_timeout(connect: float, read: float, deadlines: Tuple[Deadline, ...],
+                  url: str = '') -> Tuple[float, float]:
+    """
+    按截止时间收紧连接/读取超时
+
+    Args:
+        connect: 连接超时（秒）
+        read: 读取超时（秒）
+        deadlines: 需要遵守的截止时间
+        url: 请求URL（用于异常信息）
+
+    Returns:
+        (连接超时, 读取超时)
+
+    Raises:
+        DeadlineExceeded: 如果任一截止时间已到期
+    """
+    for deadline in deadlines:
+        deadline.check(url)
+        remaining = deadline.remaining()
+        connect = min(connect, remaining)
+        read = min(read, remaining)
+    return connect, read
+
+
+def sleep_allowed(delay: float, deadlines: Tuple[Deadline, ...]) -> bool:
+    """等待 delay 秒后是否仍在截止时间内（用于判断是否还值得重试）"""
+    return all(deadline.remaining() > delay for deadline in deadlines)
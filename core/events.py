@@ -0,0 +1,201 @@
+"""
+结构化请求事件
+开启 log.json_events 后，每次请求（含每次重试）作为一条事件写入 logs/events_YYYYMMDD.jsonl，每行一个紧凑JSON:
+    {"ts":1792150000.123456,"method":"GET","url":"http://127.0.0.1:5000/api/user/info","status_code":200,
+     "elapsed":0.0031,"error":null,"request_id":"3f2a9c0d1e4b5a67","attempt":0,
+     "test_id":"testcase/test_user.py::TestUserApi::test_get_user_info","request_bytes":0,"response_bytes":112}
+字段与 core.metrics 的请求指标相同。用例线程只把指标放入日志队列，序列化和写入由后台写日志线程完成（见 core.logger）
+
+python run.py events 流式读取事件文件（支持 .gz）按接口汇总最慢接口和错误聚类，内存占用只与接口数量有关；
+接口名称与 perf_summary.json 相同（方法 + 路由模板，见 core.perf.route_template）
+"""
+import gzip
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+from core import metrics
+from core.histogram import LatencyHistogram
+from core.logger import EVENT_PREFIX, EVENT_SUFFIX, LOG_DIR, get_event_logger, get_logger
+from core.metrics import error_label
+from core.perf import compile_routes, route_template
+
+logger = get_logger(__name__)
+_event_logger = get_event_logger()
+
+# 每个错误聚类最多记录的用例数
+MAX_CLUSTER_TESTS = 3
+
+
+def record_event(record: Dict[str, Any]):
+    """请求指标监听器: 将指标作为结构化事件写入事件日志"""
+    _event_logger.info('request', extra={'event': dict(record)})
+
+
+def enable_event_log() -> bool:
+    """
+    开启 log.json_events 时注册事件日志监听器
+
+    Returns:
+        是否已开启
+    """
+    from core.config import config
+    if not config.get_log_json_events_enabled():
+        return False
+    metrics.add_listener(record_event)
+    return True
+
+
+def disable_event_log():
+    """移除事件日志监听器"""
+    metrics.remove_listener(record_event)
+
+
+def default_event_files() -> List[Path]:
+    """日志目录下的全部事件文件（含已切分、压缩的文件），按文件名排序"""
+    return sorted(
+        path for path in LOG_DIR.glob(f'{EVENT_PREFIX}_*')
+        if path.name.endswith((EVENT_SUFFIX, EVENT_SUFFIX + '.gz'))
+    )
+
+
+class EventStats:
+    """事件流式汇总（按接口累计延迟直方图和错误聚类，不保存单条事件）"""
+
+    def __init__(self, routes: Iterable[str] = ()):
+        """
+        Args:
+            routes: 路由模板（同 report.perf.routes，见 core.perf.compile_routes）
+        """
+        self.routes = compile_routes(routes)
+        self.events = 0
+        self.malformed = 0
+        # 接口（方法 + 路由模板） -> 延迟直方图 / 错误数
+        self.latency: Dict[str, LatencyHistogram] = {}
+        self.errors: Dict[str, int] = {}
+        # (接口, 错误) -> {count, tests}
+        self.clusters: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+    def add(self, event: Dict[str, Any]):
+        """累计一条事件"""
+        endpoint = f"{event['method'].upper()} {route_template(urlsplit(event['url']).path, self.routes)}"
+        self.events += 1
+        histogram = self.latency.get(endpoint)
+        if histogram is None:
+            histogram = self.latency[endpoint] = LatencyHistogram()
+            self.errors[endpoint] = 0
+        histogram.record(event['elapsed'])
+
+        error = error_label(event)
+        if error is None:
+            return
+        self.errors[endpoint] += 1
+        cluster = self.clusters.get((endpoint, error))
+        if cluster is None:
+            cluster = self.clusters[(endpoint, error)] = {'count': 0, 'tests': []}
+        cluster['count'] += 1
+        test_id = event.get('test_id')
+        if test_id and test_id not in cluster['tests'] and len(cluster['tests']) < MAX_CLUSTER_TESTS:
+            cluster['tests'].append(test_id)
+
+    def slowest(self, top: int) -> List[Dict[str, Any]]:
+        """按 p95 从高到低排列的接口统计（毫秒）"""
+        rows = []
+        for endpoint, histogram in self.latency.items():
+            row = {'endpoint': endpoint, **histogram.summary((50, 95, 99))}
+            row['errors'] = self.errors[endpoint]
+            row['error_rate'] = round(row['errors'] / histogram.count, 4)
+            rows.append(row)
+        rows.sort(key=lambda row: row['p95'], reverse=True)
+        return rows[:top]
+
+    def error_clusters(self, top: int) -> List[Dict[str, Any]]:
+        """按出现次数从多到少排列的错误聚类（接口 + 异常类型或状态码）"""
+        rows = [
+            {'endpoint': endpoint, 'error': error, **cluster}
+            for (endpoint, error), cluster in self.clusters.items()
+        ]
+        rows.sort(key=lambda row: row['count'], reverse=True)
+        return rows[:top]
+
+    def to_dict(self, top: int = 10) -> Dict[str, Any]:
+        return {
+            'events': self.events,
+            'malformed': self.malformed,
+            'endpoints': len(self.latency),
+            'slowest': self.slowest(top),
+            'errors': self.error_clusters(top),
+        }
+
+
+def iter_events(paths: Iterable[Path], stats: Optional[EventStats] = None) -> Iterator[Dict[str, Any]]:
+    """
+    逐行读取事件文件（.gz 文件直接解压读取）
+
+    无法解析的行（如进程中途退出写了一半的行）跳过，计入 stats.malformed
+    """
+    for path in paths:
+        opener = gzip.open if str(path).endswith('.gz') else open
+        with opener(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                    if isinstance(event, dict) and 'method' in event and 'url' in event and 'elapsed' in event:
+                        yield event
+                        continue
+                except ValueError:
+                    pass
+                if stats is not None and line.strip():
+                    stats.malformed += 1
+
+
+def summarize_events(paths: Sequence[Path], routes: Iterable[str] = ()) -> EventStats:
+    """流式汇总事件文件（routes 为路由模板，同 EventStats）"""
+    stats = EventStats(routes)
+    for event in iter_events(paths, stats):
+        stats.add(event)
+    return stats
+
+
+def log_event_summary(stats: EventStats, top: int = 10):
+    """输出事件汇总"""
+    summary = stats.to_dict(top)
+    logger.info(f"事件 {summary['events']} 条, 接口 {summary['endpoints']} 个, 无法解析 {summary['malformed']} 行")
+    if summary['slowest']:
+        logger.info(f"p95 最高的 {len(summary['slowest'])} 个接口（毫秒）:")
+    for row in summary['slowest']:
+        logger.info(
+            f"  {row['endpoint']}: 请求 {row['count']}, 错误率 {row['error_rate']:.2%}, "
+            f"mean {row['mean']}, p50 {row['p50']}, p95 {row['p95']}, p99 {row['p99']}, max {row['max']}"
+        )
+    if summary['errors']:
+        logger.info(f"出现最多的 {len(summary['errors'])} 类错误:")
+    for row in summary['errors']:
+        tests = f"（用例: {', '.join(row['tests'])}）" if row['tests'] else ''
+        logger.info(f"  {row['count']} 次 {row['error']}  {row['endpoint']}{tests}")
+
+
+def run_event_summary(paths: Optional[Sequence[str]] = None, top: int = 10, as_json: bool = False) -> int:
+    """
+    汇总事件文件（python run.py events）
+
+    Args:
+        paths: 事件文件，不提供则汇总日志目录下的全部事件文件
+        top: 最慢接口 / 错误聚类各输出多少条
+        as_json: 以JSON输出到标准输出
+
+    Returns:
+        退出码（没有事件文件时为1）
+    """
+    files = [Path(path) for path in paths] if paths else default_event_files()
+    if not files:
+        logger.error(f"没有事件文件（开启 log.json_events 后执行用例会写入 {LOG_DIR}/{EVENT_PREFIX}_YYYYMMDD{EVENT_SUFFIX}）")
+        return 1
+    from core.config import config
+    stats = summarize_events(files, config.get_report_perf_config()['routes'])
+    if as_json:
+        print(json.dumps(stats.to_dict(top), ensure_ascii=False, indent=2))
+    else:
+        log_event_summary(stats, top)
+    return 0
@@ -0,0 +1,8 @@
+"""
+Mock故障注入约定
+测试用例与 Mock 服务（mock/faults.py）共用的故障注入协议常量，用例侧不依赖 mock 包
+"""
+
+# 选择故障作用域的请求头: /admin/faults 请求带该请求头时只查询/替换/清除该作用域的规则，
+# 带同一请求头的业务请求只使用该作用域的规则（见 mock/faults.py）
+FAULT_SCOPE_HEADER = 'X-Fault-Scope'
@@ -0,0 +1,169 @@
+"""
+延迟直方图模块
+按对数分桶记录延迟，内存占用与样本数无关，多个直方图（多线程、多进程、多次执行）可直接合并后再计算分位数
+"""
+import math
+from typing import Dict, Iterable, Optional
+
+# 默认相对误差：分位数估计值与真实值的偏差不超过 1%
+DEFAULT_PRECISION = 0.01
+
+# 小于该值（秒）的样本统一记入零桶
+MIN_VALUE = 1e-6
+
+
+class LatencyHistogram:
+    """
+    对数分桶的延迟直方图
+
+    第 i 个桶覆盖 (gamma^(i-1), gamma^i]，gamma = (1 + precision) / (1 - precision)，
+    以桶的中间值作为估计值，因此任何分位数的相对误差都不超过 precision。
+    相同精度的直方图按桶累加即可合并，合并结果与把所有样本记入同一个直方图完全相同
+    """
+
+    def __init__(self, precision: float = DEFAULT_PRECISION):
+        """
+        初始化直方图
+
+        Args:
+            precision: 相对误差（0 ~ 1 之间）
+        """
+        if not 0 < precision < 1:
+            raise ValueError(f"precision 必须在 0 ~ 1 之间: {precision}")
+        self.precision = precision
+        self._gamma = (1 + precision) / (1 - precision)
+        self._log_gamma = math.log(self._gamma)
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def _index(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _estimate(self, index: int) -> float:
+        return 2 * self._gamma ** index / (self._gamma + 1)
+
+    def record(self, value: float, count: int = 1):
+        """
+        记录样本
+
+        Args:
+            value: 延迟（秒）
+            count: 样本数量
+        """
+        if value < MIN_VALUE:
+            self.zero_count += count
+        else:
+            index = self._index(value)
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += count
+        self.total += value * count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other: 'LatencyHistogram') -> 'LatencyHistogram':
+        """
+        合并另一个直方图（原地修改并返回自身）
+
+        Raises:
+            ValueError: 如果两个直方图精度不同
+        """
+        if other.precision != self.precision:
+            raise ValueError(f"精度不同的直方图不能合并: {self.precision} != {other.precision}")
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+
+    @classmethod
+    def merged(cls, histograms: Iterable['LatencyHistogram'],
+               precision: float = DEFAULT_PRECISION) -> 'LatencyHistogram':
+        """合并多个直方图为一个新的直方图"""
+        result = cls(precision)
+        for histogram in histograms:
+            result.merge(histogram)
+        return result
+
+    @property
+    def mean(self) -> Optional[float]:
+        """平均值（秒）"""
+        return self.total / self.count if self.count else None
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """
+        计算分位数
+
+        Args:
+            percent: 百分位（0 ~ 100，如 99.9）
+
+        Returns:
+            分位数估计值（秒），没有样本时返回None
+        """
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(percent / 100 * self.count))
+        if rank <= self.zero_count:
+            return self.min
+        seen = self.zero_count
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(max(self._estimate(index), self.min), self.max)
+        return self.max
+
+    def summary(self, percents: Iterable[float] = (50, 90, 99, 99.9)) -> Dict[str, Optional[float]]:
+        """
+        汇总统计（单位: 毫秒）
+
+        Returns:
+            {count, min, mean, max, p50, p90, p99, p999}
+        """
+        def to_ms(value):
+            return round(value * 1000, 3) if value is not None else None
+
+        result = {
+            'count': self.count,
+            'min': to_ms(self.min),
+            'mean': to_ms(self.mean),
+            'max': to_ms(self.max),
+        }
+        for percent in percents:
+            result[percentile_name(percent)] = to_ms(self.percentile(percent))
+        return result
+
+    def to_dict(self) -> Dict:
+        """序列化（用于跨进程合并）"""
+        return {
+            'precision': self.precision,
+            'buckets': {str(index): count for index, count in self.buckets.items()},
+            'zero_count': self.zero_count,
+            'count': self.count,
+            'total': self.total,
+            'min': self.min,
+            'max': self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'LatencyHistogram':
+        """从 to_dict() 的结果恢复直方图"""
+        histogram = cls(data.get('precision', DEFAULT_PRECISION))
+        histogram.buckets = {int(index): count for index, count in data.get('buckets', {}).items()}
+        histogram.zero_count = data.get('zero_count', 0)
+        histogram.count = data.get('count', 0)
+        histogram.total = data.get('total', 0.0)
+        histogram.min = data.get('min')
+        histogram.max = data.get('max')
+        return histogram
+
+
+def percentile_name(percent: float) -> str:
+    """百分位名称: 50 -> 'p50'，99.9 -> 'p999'"""
+    return 'p' + f"{percent:g}".replace('.', '')
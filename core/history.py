@@ -0,0 +1,276 @@
+"""
+执行历史模块
+将每次执行的用例耗时、结果和接口响应时间统计保存到 report/history.db（SQLite），
+用于并行执行时按耗时均衡分配、最长用例优先调度，以及最近失败用例优先执行
+"""
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from core.logger import get_logger
+from core.timing import PHASES
+
+logger = get_logger(__name__)
+
+# 历史数据库文件名（位于报告目录下）
+HISTORY_DB_NAME = 'history.db'
+
+# 每个用例最多保留的历史记录条数
+MAX_RESULTS_PER_TEST = 20
+
+# 计算预估耗时时参考最近多少次执行
+DURATION_WINDOW = 5
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at REAL NOT NULL,
+    worker TEXT
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id INTEGER NOT NULL,
+    nodeid TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    duration REAL NOT NULL,
+    request_count INTEGER NOT NULL DEFAULT 0,
+    latency_avg REAL,
+    latency_max REAL
+);
+CREATE INDEX IF NOT EXISTS idx_results_nodeid ON results (nodeid, run_id);
+"""
+
+
+class HistoryStore:
+    """
+    执行历史存储
+
+    每个测试进程在会话结束时把本次结果一次性写入（单个事务），
+    多个并行工作进程依靠SQLite自身的文件锁串行写入
+    """
+
+    def __init__(self, db_path: Path):
+        """
+        初始化历史存储
+
+        Args:
+            db_path: SQLite数据库文件路径
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30)
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        """关闭数据库连接"""
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def save_run(self, results: Iterable[Dict], worker: Optional[str] = None) -> int:
+        """
+        保存一次执行的结果，并清理过期记录
+
+        Args:
+            results: 用例结果列表，每项包含 nodeid、outcome、duration、
+                     request_count、latency_avg、latency_max
+            worker: 工作进程编号（并行执行时）
+
+        Returns:
+            本次执行的 run_id
+        """
+        with self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO runs (started_at, worker) VALUES (?, ?)", (time.time(), worker)
+            )
+            run_id = cursor.lastrowid
+            self._conn.executemany(
+                "INSERT INTO results (run_id, nodeid, outcome, duration, request_count, latency_avg, latency_max) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (run_id, r['nodeid'], r['outcome'], r['duration'], r.get('request_count', 0),
+                     r.get('latency_avg'), r.get('latency_max'))
+                    for r in results
+                ]
+            )
+            # 每个用例只保留最近 MAX_RESULTS_PER_TEST 条记录
+            self._conn.execute(
+                """
+                DELETE FROM results WHERE rowid IN (
+                    SELECT rowid FROM (
+                        SELECT rowid, ROW_NUMBER() OVER (PARTITION BY nodeid ORDER BY run_id DESC) AS rn
+                        FROM results
+                    ) WHERE rn > ?
+                )
+                """,
+                (MAX_RESULTS_PER_TEST,)
+            )
+            self._conn.execute(
+                "DELETE FROM runs WHERE run_id NOT IN (SELECT DISTINCT run_id FROM results)"
+            )
+        return run_id
+
+    def get_durations(self, nodeids: Optional[Sequence[str]] = None) -> Dict[str, float]:
+        """
+        获取用例的预估耗时（最近 DURATION_WINDOW 次执行的平均耗时）
+
+        Args:
+            nodeids: 只查询指定用例（None表示全部）
+
+        Returns:
+            {nodeid: 平均耗时秒数}
+        """
+        rows = self._conn.execute(
+            """
+            SELECT nodeid, AVG(duration) FROM (
+                SELECT nodeid, duration,
+                       ROW_NUMBER() OVER (PARTITION BY nodeid ORDER BY run_id DESC) AS rn
+                FROM results
+            ) WHERE rn <= ? GROUP BY nodeid
+            """,
+            (DURATION_WINDOW,)
+        ).fetchall()
+        durations = dict(rows)
+        if nodeids is not None:
+            wanted = set(nodeids)
+            durations = {k: v for k, v in durations.items() if k in wanted}
+        return durations
+
+    def get_recent_failures(self, last_runs: int = 3) -> List[str]:
+        """
+        获取最近失败过的用例（按最近一次失败时间从近到远排列）
+
+        Args:
+            last_runs: 只看每个用例最近几次的执行结果
+
+        Returns:
+            nodeid列表
+        """
+        rows = self._conn.execute(
+            """
+            SELECT nodeid, MAX(run_id) AS last_failed FROM (
+                SELECT nodeid, outcome, run_id,
+                       ROW_NUMBER() OVER (PARTITION BY nodeid ORDER BY run_id DESC) AS rn
+                FROM results
+            ) WHERE rn <= ? AND outcome IN ('failed', 'error')
+            GROUP BY nodeid ORDER BY last_failed DESC, nodeid
+            """,
+            (last_runs,)
+        ).fetchall()
+        return [nodeid for nodeid, _ in rows]
+
+    def get_slowest(self, limit: int = 10) -> List[Dict]:
+        """
+        获取平均耗时最长的用例（用于定位慢用例）
+
+        Returns:
+            [{nodeid, duration, latency_avg}]，按耗时从长到短排列
+        """
+        rows = self._conn.execute(
+            """
+            SELECT nodeid, AVG(duration), AVG(latency_avg) FROM results
+            GROUP BY nodeid ORDER BY AVG(duration) DESC LIMIT ?
+            """,
+            (limit,)
+        ).fetchall()
+        return [{'nodeid': n, 'duration': d, 'latency_avg': l} for n, d, l in rows]
+
+
+def get_history_path(report_dir) -> Path:
+    """获取历史数据库路径"""
+    return Path(report_dir) / HISTORY_DB_NAME
+
+
+def order_tests(test_ids: Sequence[str], durations: Dict[str, float],
+                failed_first: Sequence[str] = ()) -> List[str]:
+    """
+    确定用例执行顺序
+
+    最近失败的用例排在最前（按失败时间从近到远），其余用例按预估耗时从长到短排列
+
+    Args:
+        test_ids: 用例nodeid列表
+        durations: {nodeid: 预估耗时}
+        failed_first: 需要优先执行的最近失败用例
+
+    Returns:
+        排序后的nodeid列表
+    """
+    failed_rank = {nodeid: rank for rank, nodeid in enumerate(failed_first)}
+    return sorted(
+        test_ids,
+        key=lambda nodeid: (
+            failed_rank.get(nodeid, len(failed_rank)),
+            -durations.get(nodeid, 0.0),
+            nodeid,
+        )
+    )
+
+
+class ResultCollector:
+    """
+    用例结果收集器
+
+    记录当前用例发出的请求耗时和阶段耗时（作为 core.metrics 监听器），
+    并在用例结束时汇总为一条历史记录
+    """
+
+    def __init__(self):
+        self.results: List[Dict] = []
+        self._latencies: List[float] = []
+        self._timings: List[Dict] = []
+
+    def start_test(self):
+        """用例开始，清空请求统计"""
+        self._latencies = []
+        self._timings = []
+
+    def on_request(self, record: Dict):
+        """请求指标监听器"""
+        self._latencies.append(record['elapsed'])
+        if record.get('timing'):
+            self._timings.append(record['timing'])
+
+    def request_timing(self) -> Dict[str, float]:
+        """
+        当前用例所有请求的阶段耗时合计
+
+        Returns:
+            {requests, dns_ms, connect_ms, tls_ms, send_ms, server_ms, download_ms,
+             bytes_sent, bytes_received, reused_connections}，没有实际发出的请求时为空字典
+        """
+        timings = self._timings
+        if not timings:
+            return {}
+        summary = {'requests': len(timings)}
+        for phase in PHASES:
+            summary[f'{phase}_ms'] = round(sum(timing[phase] for timing in timings) * 1000, 3)
+        summary['bytes_sent'] = sum(timing['bytes_sent'] for timing in timings)
+        summary['bytes_received'] = sum(timing['bytes_received'] for timing in timings)
+        summary['reused_connections'] = sum(1 for timing in timings if timing['reused'])
+        return summary
+
+    def finish_test(self, nodeid: str, outcome: str, duration: float):
+        """
+        用例结束，生成历史记录
+
+        Args:
+            nodeid: 用例nodeid
+            outcome: 结果（passed、failed、error、skipped）
+            duration: 用例耗时（秒，含setup/teardown）
+        """
+        latencies = self._latencies
+        self.results.append({
+            'nodeid': nodeid,
+            'outcome': outcome,
+            'duration': duration,
+            'request_count': len(latencies),
+            'latency_avg': sum(latencies) / len(latencies) if latencies else None,
+            'latency_max': max(latencies) if latencies else None,
+        })
+        self._latencies = []
+        self._timings = []
@@ -3,32 +3,136 @@ HTTP客户端封装
 提供统一的HTTP请求接口，支持GET、POST等方法
 """
 import requests
+import urllib3
 import json
-from typing import Dict, Any, Optional
+import logging
+import time
+import uuid
+from typing import Dict, Any, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+from core import metrics
+from core.cassette import Cassette, build_response, get_cassette, make_key
+from core.deadline import Deadline, DeadlineExceeded, active_deadlines, limit_timeout, sleep_allowed
 from core.logger import get_logger
+from core.pool import PooledHTTPAdapter, get_shared_adapter
+from core.response_cache import CACHEABLE_METHODS, READ_ONLY_METHODS, ResponseCache, get_response_cache
+from core.resilience import CircuitBreaker, CircuitOpenError, RetryPolicy, get_circuit_breaker
+from core.response import cache_json, parse_json
+from core.timing import RequestTiming, measure_timing
 
 logger = get_logger(__name__)
 
+# 有截止时间时分块读取响应体的块大小（字节）
+BODY_CHUNK_SIZE = 16 * 1024
 
-class HttpClient:
+
+class BaseHttpClient:
     """
-    HTTP客户端类
+    HTTP客户端基类
     
-    封装requests库，提供简洁的HTTP请求接口
-    支持自动记录请求和响应日志
+    提供URL拼接、超时/重试/熔断配置与请求/响应日志等同步、异步客户端共用的功能
+    请求体/响应体只在DEBUG级别开启时才序列化，且超过 max_body_length 时截断
     """
     
-    def __init__(self, base_url: str = "", timeout: int = 30):
+    max_body_length: int = 2000
+    
+    def _init_timeouts(self, timeout: float, connect_timeout: Optional[float], deadline: Optional[float]):
         """
-        初始化HTTP客户端
-        
-        Args:
-            base_url: 基础URL，所有请求会拼接这个URL
-            timeout: 请求超时时间（秒）
+        初始化超时配置（未提供时读取配置文件中的 api.connect_timeout / api.deadline，连接超时未配置时与读取超时相同）
         """
-        self.base_url = base_url.rstrip('/')
+        from core.config import config
+        
         self.timeout = timeout
-        self.session = requests.Session()  # 使用session保持连接和Cookie
+        self.connect_timeout = connect_timeout or config.get_api_connect_timeout() or timeout
+        self.deadline = deadline if deadline is not None else config.get_api_deadline()
+    
+    def _start_deadlines(self) -> Tuple[Deadline, ...]:
+        """开始一次请求：返回本次请求（含重试）需要遵守的截止时间"""
+        return active_deadlines(Deadline(self.deadline) if self.deadline else None)
+    
+    def _init_resilience(self, retry_policy: Optional[RetryPolicy], circuit_breaker: Optional[Dict[str, Any]]):
+        """
+        初始化重试策略和熔断器配置（未提供时读取配置文件中的 api.retry / api.circuit_breaker）
+        """
+        from core.config import config
+        
+        self.retry_policy = retry_policy or RetryPolicy.from_config(config.get_api_retry_config())
+        self.circuit_breaker_config = (
+            circuit_breaker if circuit_breaker is not None else config.get_api_circuit_breaker_config()
+        )
+    
+    def _init_cassette(self, cassette: Optional[Dict[str, Any]]):
+        """初始化录制/回放（未提供时读取 api.cassette，run.py --record / --replay 优先）"""
+        self.cassette: Optional[Cassette] = get_cassette(cassette)
+    
+    def _init_cache(self, cache: Optional[Dict[str, Any]]):
+        """初始化GET响应缓存（未提供时读取 api.cache）"""
+        from core.config import config
+        
+        settings = cache if cache is not None else config.get_api_cache_config()
+        self.response_cache: Optional[ResponseCache] = get_response_cache(**settings)
+    
+    def _cache_lookup(self, method: str, url: str, request_kwargs: Dict) -> Tuple[Optional[tuple], Any]:
+        """
+        发送请求前查询缓存，修改请求先使同一资源前缀下的缓存失效
+        
+        同步、异步客户端共享缓存（修改请求对两者都生效），但缓存键包含客户端类型，
+        避免一种客户端拿到另一种客户端的响应对象（requests.Response / AsyncResponse）。
+        命中缓存时没有发出网络请求，不发布请求指标（命中次数记录在缓存统计中）
+        
+        Returns:
+            (缓存键, 缓存的响应)，不可缓存时缓存键为None，未命中时响应为None
+        """
+        cache = self.response_cache
+        if cache is None:
+            return None, None
+        method = method.upper()
+        if method in CACHEABLE_METHODS and 'stream' not in request_kwargs:
+            headers = request_kwargs.get('headers') or {}
+            key = (type(self),) + make_key(method, url, request_kwargs.get('params'), request_kwargs.get('data'),
+                                           request_kwargs.get('json'))
+            key += (tuple(sorted((str(k).lower(), str(v)) for k, v in headers.items())),)
+            return key, cache.get(key)
+        if method not in READ_ONLY_METHODS:
+            cache.invalidate(url)
+        return None, None
+    
+    def _cache_update(self, method: str, url: str, key: Optional[tuple], response):
+        """请求完成后缓存响应；修改请求再次使缓存失效（避免期间并发的GET写入旧数据）"""
+        cache = self.response_cache
+        if cache is None:
+            return
+        if key is not None:
+            cache.put(key, url, response)
+        elif method.upper() not in READ_ONLY_METHODS:
+            cache.invalidate(url)
+    
+    def _get_breaker(self, url: str) -> Optional[CircuitBreaker]:
+        """获取请求主机对应的熔断器（未启用时返回None）"""
+        return get_circuit_breaker(urlsplit(url).netloc, **self.circuit_breaker_config)
+    
+    def _retry_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """重试前的等待时间（回放模式下不等待）"""
+        if self.cassette is not None and self.cassette.replaying:
+            return 0.0
+        return self.retry_policy.backoff(attempt, retry_after)
+    
+    def _log_retry(self, method: str, url: str, reason: str, attempt: int, delay: float):
+        """记录重试日志"""
+        logger.warning(
+            f"{reason}，{delay:.2f}s 后第 {attempt + 1}/{self.retry_policy.max_retries} 次重试: {method} {url}"
+        )
+    
+    def _log_error(self, url: str, error: Exception):
+        """记录请求异常日志"""
+        if isinstance(error, (CircuitOpenError, DeadlineExceeded)):
+            logger.error(f"请求中止: {error}")
+        elif isinstance(error, requests.exceptions.Timeout):
+            logger.error(f"请求超时: {url}")
+        elif isinstance(error, requests.exceptions.ConnectionError):
+            logger.error(f"连接失败: {url}")
+        else:
+            logger.error(f"请求异常: {str(error)}")
     
     def _build_url(self, path: str) -> str:
         """
@@ -44,25 +148,212 @@ class HttpClient:
             return path
         return f"{self.base_url}/{path.lstrip('/')}"
     
+    def _truncate(self, text: str) -> str:
+        """按 max_body_length 截断日志内容"""
+        if len(text) <= self.max_body_length:
+            return text
+        return f"{text[:self.max_body_length]}...(共 {len(text)} 字符，已截断)"
+    
+    @staticmethod
+    def _new_request_id() -> str:
+        """生成请求ID（同一次调用的多次重试共用，用于关联结构化日志中的事件）"""
+        return uuid.uuid4().hex[:16]
+    
+    @staticmethod
+    def _body_size(body) -> Optional[int]:
+        """已编码请求体的字节数（没有请求体时为0，文件、迭代器等流式请求体为None）"""
+        if body is None:
+            return 0
+        if isinstance(body, str):
+            return len(body.encode('utf-8'))
+        if isinstance(body, (bytes, bytearray)):
+            return len(body)
+        return None
+    
+    def _request_size(self, request_kwargs: Dict, response=None, error: Exception = None) -> Optional[int]:
+        """请求体字节数（按 aiohttp 的编码方式计算，只在发布指标时调用）"""
+        if 'json' in request_kwargs:
+            return len(json.dumps(request_kwargs['json']).encode('utf-8'))
+        data = request_kwargs.get('data')
+        if not data:
+            return 0
+        if isinstance(data, (dict, list, tuple)):
+            try:
+                return len(urlencode(data, doseq=True))
+            except TypeError:
+                return None
+        return self._body_size(data)
+    
+    @staticmethod
+    def _response_size(response) -> Optional[int]:
+        """响应体字节数（调用方 stream=True 且未读取响应体时取 Content-Length）"""
+        if isinstance(response, requests.Response):
+            content = response._content
+            if content is False:
+                length = response.headers.get('Content-Length')
+                return int(length) if length and length.isdigit() else None
+        else:
+            content = response.content
+        return len(content) if content is not None else None
+    
+    def _publish_metrics(self, method: str, url: str, start: float, response=None, error: Exception = None,
+                         request_id: Optional[str] = None, attempt: int = 0,
+                         request_kwargs: Optional[Dict] = None, timing: Optional[RequestTiming] = None):
+        """
+        发布请求指标（供报告、历史记录、结构化日志等监听器使用，见 core.metrics）
+        
+        Args:
+            method: 请求方法
+            url: 请求URL
+            start: 请求开始时间（time.perf_counter()）
+            response: Response对象（请求异常时为None）
+            error: 请求异常
+            request_id: 请求ID
+            attempt: 第几次尝试（从0开始）
+            request_kwargs: 请求参数（有监听器时用于计算请求体字节数）
+            timing: 阶段耗时（没有实际发出请求时为None，如回放录像）
+        """
+        if not metrics.has_listeners():
+            return
+        parts = urlsplit(url)
+        metrics.publish({
+            'method': method.upper(),
+            'url': f"{parts.scheme}://{parts.netloc}{parts.path}",
+            'status_code': response.status_code if response is not None else None,
+            'elapsed': time.perf_counter() - start,
+            'error': type(error).__name__ if error is not None else None,
+            'request_id': request_id,
+            'attempt': attempt,
+            'test_id': metrics.current_test(),
+            'request_bytes': self._request_size(request_kwargs or {}, response, error),
+            'response_bytes': self._response_size(response) if response is not None else None,
+            'timing': timing.to_dict() if timing is not None and timing.measured else None,
+        })
+    
     def _log_request(self, method: str, url: str, **kwargs):
         """记录请求日志"""
         logger.info(f"[请求] {method} {url}")
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
         if 'json' in kwargs:
-            logger.debug(f"[请求体] {json.dumps(kwargs['json'], ensure_ascii=False, indent=2)}")
+            logger.debug(f"[请求体] {self._truncate(json.dumps(kwargs['json'], ensure_ascii=False, indent=2))}")
         elif 'data' in kwargs:
-            logger.debug(f"[请求体] {kwargs['data']}")
+            logger.debug(f"[请求体] {self._truncate(str(kwargs['data']))}")
         if 'params' in kwargs:
             logger.debug(f"[请求参数] {kwargs['params']}")
     
     def _log_response(self, response: requests.Response):
         """记录响应日志"""
+        logger.info(f"[响应] 状态码: {response.status_code}")
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
+        
+        # 响应体过大时直接截断原文，避免解析和格式化整个响应体
+        if len(response.content) > self.max_body_length:
+            logger.debug(f"[响应体] {self._truncate(response.text)}")
+            return
         try:
-            response_json = response.json()
-            logger.info(f"[响应] 状态码: {response.status_code}")
+            response_json = parse_json(response)
             logger.debug(f"[响应体] {json.dumps(response_json, ensure_ascii=False, indent=2)}")
-        except:
-            logger.info(f"[响应] 状态码: {response.status_code}")
-            logger.debug(f"[响应体] {response.text[:500]}")
+        except ValueError:
+            logger.debug(f"[响应体] {response.text}")
+
+
+def _wire_bytes(response: requests.Response) -> int:
+    """已从连接读取的响应体字节数（压缩响应为压缩后的大小）"""
+    tell = getattr(response.raw, 'tell', None)
+    return tell() if callable(tell) else 0
+
+
+def _iter_available(response: requests.Response):
+    """
+    逐块返回已到达的响应体数据
+    
+    iter_content 每次要凑满一个块才返回，服务端缓慢发送时无法及时检查截止时间；
+    urllib3 2.x 的 read1 有数据即返回，异常按 requests 的方式转换
+    """
+    raw = response.raw
+    if not hasattr(raw, 'read1'):
+        yield from response.iter_content(BODY_CHUNK_SIZE)
+        return
+    try:
+        while True:
+            chunk = raw.read1(BODY_CHUNK_SIZE, decode_content=True)
+            if not chunk:
+                break
+            yield chunk
+    except urllib3.exceptions.ProtocolError as e:
+        raise requests.exceptions.ChunkedEncodingError(e)
+    except urllib3.exceptions.DecodeError as e:
+        raise requests.exceptions.ContentDecodingError(e)
+    except urllib3.exceptions.ReadTimeoutError as e:
+        raise requests.exceptions.ConnectionError(e)
+    except urllib3.exceptions.SSLError as e:
+        raise requests.exceptions.SSLError(e)
+
+
+class HttpClient(BaseHttpClient):
+    """
+    HTTP客户端类
+    
+    封装requests库，提供简洁的HTTP请求接口
+    支持自动记录请求和响应日志，按重试策略自动重试，后端不可用时由熔断器快速失败
+    连接/读取超时分别设置；有截止时间（api.deadline 或用例时间预算）时，超时随剩余时间收紧，到期后中止请求
+    录制模式下请求和响应追加写入录像文件，回放模式下直接由录像返回响应，不发送网络请求
+    开启响应缓存（api.cache）时，相同的GET请求在有效期内直接返回缓存的响应
+    """
+    
+    def __init__(
+        self,
+        base_url: str = "",
+        timeout: float = 30,
+        pool_config: Optional[Dict[str, Any]] = None,
+        share_pool: bool = True,
+        max_body_length: Optional[int] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[Dict[str, Any]] = None,
+        connect_timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+        cassette: Optional[Dict[str, Any]] = None,
+        cache: Optional[Dict[str, Any]] = None
+    ):
+        """
+        初始化HTTP客户端
+        
+        Args:
+            base_url: 基础URL，所有请求会拼接这个URL
+            timeout: 读取超时时间（秒），即等待服务端返回数据的最长时间
+            pool_config: 连接池配置（pool_connections、pool_maxsize、pool_block、keepalive_timeout），
+                         不提供则读取配置文件中的 api.* 配置
+            share_pool: 是否与其他HttpClient共享连接池（共享时连接可跨用例复用）
+            max_body_length: DEBUG日志中请求体/响应体的最大长度，不提供则读取 log.max_body_length
+            retry_policy: 重试策略，不提供则读取 api.retry（RetryPolicy(max_retries=0) 表示不重试）
+            circuit_breaker: 熔断器配置（enabled、failure_threshold、recovery_timeout、failure_statuses），
+                             不提供则读取 api.circuit_breaker
+            connect_timeout: 建立连接超时时间（秒），不提供则读取 api.connect_timeout
+            deadline: 单个请求（含重试）的总时长上限（秒），不提供则读取 api.deadline
+            cassette: 录制/回放配置（mode: record / replay / off，path），不提供则读取 api.cassette
+            cache: GET响应缓存配置（enabled、max_entries、ttl），不提供则读取 api.cache
+        """
+        from core.config import config
+        
+        self.base_url = base_url.rstrip('/')
+        self._init_timeouts(timeout, connect_timeout, deadline)
+        self.session = requests.Session()  # 使用session保持连接和Cookie
+        self.max_body_length = max_body_length or config.get_log_max_body_length()
+        
+        if pool_config is None:
+            pool_config = config.get_api_pool_config()
+        
+        if share_pool:
+            adapter = get_shared_adapter(**pool_config)
+        else:
+            adapter = PooledHTTPAdapter(**pool_config)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._init_resilience(retry_policy, circuit_breaker)
+        self._init_cassette(cassette)
+        self._init_cache(cache)
     
     def request(
         self,
@@ -84,7 +375,7 @@ class HttpClient:
             data: 表单数据（用于POST请求，Content-Type: application/x-www-form-urlencoded）
             json_data: JSON数据（用于POST请求，Content-Type: application/json）
             headers: 请求头
-            **kwargs: 其他requests参数
+            **kwargs: 其他requests参数（传入 timeout 时覆盖客户端的连接/读取超时）
             
         Returns:
             Response对象
@@ -92,10 +383,9 @@ class HttpClient:
         url = self._build_url(path)
         
         # 准备请求参数
-        request_kwargs = {
-            'timeout': self.timeout,
-            **kwargs
-        }
+        request_kwargs = dict(kwargs)
+        timeout = request_kwargs.pop('timeout', (self.connect_timeout, self.timeout))
+        connect_timeout, read_timeout = timeout if isinstance(timeout, tuple) else (timeout, timeout)
         
         if params:
             request_kwargs['params'] = params
@@ -106,31 +396,134 @@ class HttpClient:
         if headers:
             request_kwargs['headers'] = headers
         
+        cache_key, cached = self._cache_lookup(method, url, request_kwargs)
+        if cached is not None:
+            logger.info(f"[缓存命中] {method} {url}")
+            return cached
+        
         # 记录请求日志
         self._log_request(method, url, **request_kwargs)
         
+        deadlines = self._start_deadlines()
+        # 有截止时间时分块读取响应体，读取过程中到期则断开连接
+        read_body = bool(deadlines) and 'stream' not in request_kwargs
+        if read_body:
+            request_kwargs['stream'] = True
+        
+        breaker = self._get_breaker(url)
+        request_id = self._new_request_id()
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            timing = None
+            admitted = False
+            try:
+                try:
+                    request_kwargs['timeout'] = limit_timeout(connect_timeout, read_timeout, deadlines, url)
+                    if breaker is not None and not breaker.allow():
+                        raise breaker.reject()
+                    admitted = True
+                    # 发送请求
+                    with measure_timing() as timing:
+                        response = cache_json(self._send(method, url, request_kwargs, deadlines, read_body))
+                    timing.finish(_wire_bytes(response))
+                    response.timing = timing if timing.measured else None
+                except Exception as e:
+                    if breaker is not None and not isinstance(e, (CircuitOpenError, DeadlineExceeded)):
+                        breaker.record_failure()
+                    self._publish_metrics(method, url, start, error=e, request_id=request_id, attempt=attempt,
+                                          request_kwargs=request_kwargs, timing=timing)
+                    if self.retry_policy.should_retry_exception(method, e, attempt):
+                        delay = self._retry_delay(attempt)
+                        if sleep_allowed(delay, deadlines):
+                            self._log_retry(method, url, f"请求异常 {type(e).__name__}", attempt, delay)
+                            time.sleep(delay)
+                            attempt += 1
+                            continue
+                    self._log_error(url, e)
+                    raise
+                
+                self._publish_metrics(method, url, start, response=response, request_id=request_id, attempt=attempt,
+                                      request_kwargs=request_kwargs, timing=timing)
+                if breaker is not None:
+                    breaker.record_response(response.status_code)
+                if self.retry_policy.should_retry_status(method, response.status_code, attempt):
+                    delay = self._retry_delay(attempt, response.headers.get('Retry-After'))
+                    if sleep_allowed(delay, deadlines):
+                        self._log_retry(method, url, f"响应状态码 {response.status_code}", attempt, delay)
+                        response.close()
+                        time.sleep(delay)
+                        attempt += 1
+                        continue
+                break
+            finally:
+                # 半开状态的探测请求未记录结果就结束时（如截止时间到期、任务被取消），允许下一个请求探测
+                if breaker is not None and admitted:
+                    breaker.release()
+        
+        # 记录响应日志
+        self._log_response(response)
+        
+        # 如果状态码不是2xx，记录警告
+        if not response.ok:
+            logger.warning(f"请求失败: {response.status_code} - {response.text[:200]}")
+        
+        self._cache_update(method, url, cache_key, response)
+        return response
+    
+    def _request_size(self, request_kwargs: Dict, response=None, error: Exception = None) -> Optional[int]:
+        """请求体字节数（取实际发送的 PreparedRequest.body，请求未发出时按请求参数计算）"""
+        prepared = response.request if response is not None else getattr(error, 'request', None)
+        if isinstance(prepared, requests.PreparedRequest):
+            return self._body_size(prepared.body)
+        return super()._request_size(request_kwargs, response, error)
+    
+    def _send(self, method: str, url: str, request_kwargs: Dict, deadlines: Tuple[Deadline, ...],
+              read_body: bool) -> requests.Response:
+        """发送一次请求（录制模式下写入录像，回放模式下由录像返回）"""
+        cassette = self.cassette
+        if cassette is None:
+            return self._fetch(method, url, request_kwargs, deadlines, read_body)
+        
+        key = make_key(method, url, request_kwargs.get('params'), request_kwargs.get('data'), request_kwargs.get('json'))
+        if cassette.replaying:
+            return build_response(cassette.play(key))
         try:
-            # 发送请求
-            response = self.session.request(method, url, **request_kwargs)
-            
-            # 记录响应日志
-            self._log_response(response)
-            
-            # 如果状态码不是2xx，记录警告
-            if not response.ok:
-                logger.warning(f"请求失败: {response.status_code} - {response.text[:200]}")
-            
-            return response
-            
-        except requests.exceptions.Timeout:
-            logger.error(f"请求超时: {url}")
-            raise
-        except requests.exceptions.ConnectionError:
-            logger.error(f"连接失败: {url}")
+            response = self._fetch(method, url, request_kwargs, deadlines, read_body)
+        except requests.exceptions.RequestException as e:
+            cassette.record_error(key, e)
             raise
-        except Exception as e:
-            logger.error(f"请求异常: {str(e)}")
+        cassette.record_response(key, response)
+        return response
+    
+    def _fetch(self, method: str, url: str, request_kwargs: Dict, deadlines: Tuple[Deadline, ...],
+               read_body: bool) -> requests.Response:
+        """通过连接池发送请求"""
+        response = self.session.request(method, url, **request_kwargs)
+        if read_body:
+            self._read_body(response, deadlines, url)
+        return response
+    
+    @staticmethod
+    def _read_body(response: requests.Response, deadlines: Tuple[Deadline, ...], url: str):
+        """
+        分块读取响应体，截止时间到期时断开连接
+        
+        读取超时只限制每次等待数据的时间，服务端持续缓慢发送时需要按块检查总时长
+        
+        Raises:
+            DeadlineExceeded: 如果读取过程中截止时间到期
+        """
+        chunks = []
+        try:
+            for chunk in _iter_available(response):
+                chunks.append(chunk)
+                for deadline in deadlines:
+                    deadline.check(url)
+        except DeadlineExceeded:
+            response.close()
             raise
+        response._content = b''.join(chunks)
     
     def get(self, path: str, params: Optional[Dict] = None, headers: Optional[Dict] = None, **kwargs) -> requests.Response:
         """
@@ -186,6 +579,6 @@ class HttpClient:
         return self.request('DELETE', path, headers=headers, **kwargs)
     
     def close(self):
-        """关闭session"""
+        """关闭session（共享连接池不会被关闭）"""
         self.session.close()
 
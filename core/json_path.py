@@ -0,0 +1,320 @@
+"""
+JSON路径模块
+将JSON路径表达式编译为可复用的查找函数，同一个表达式在进程内只解析一次
+
+支持的语法:
+    data.user.name                       嵌套字段（可选 $ 前缀，如 $.data.user）
+    data.messages[0] / data.messages[-1] 列表下标
+    data.messages[*].message_id          通配符（列表全部元素 / 字典全部值，也可写作 data.*）
+    data.messages[1:5] / [::2]           切片
+    data["key.with.dot"]                 带特殊字符的字段名
+    data.messages[?(@.receiver_id == 1002)]   过滤器（==、!=、>、>=、<、<=，== / != 按JSON语义比较）
+    data.messages[?(@.title)]                 过滤器（字段存在且不为空）
+"""
+import json
+import operator
+import re
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from core.schema import json_key
+
+_MISSING = object()
+
+# 编译缓存的路径表达式数量上限（动态拼接的表达式不会让缓存无限增长）
+MAX_CACHED_PATHS = 1024
+
+# == / != 按JSON语义比较（True 不等于 1，1 等于 1.0），与 enum/const 一致
+_OPERATORS = {
+    '==': lambda actual, expected: json_key(actual) == json_key(expected),
+    '!=': lambda actual, expected: json_key(actual) != json_key(expected),
+    '>=': operator.ge,
+    '<=': operator.le,
+    '>': operator.gt,
+    '<': operator.lt,
+}
+
+_NAME_RE = re.compile(r'[^.\[\]\s]+')
+_FILTER_RE = re.compile(r'^@((?:\.[^.\s=!<>]+)*)\s*(?:(==|!=|>=|<=|>|<)\s*(.+?))?\s*$')
+_SLICE_RE = re.compile(r'^(-?\d*):(-?\d*)(?::(-?\d*))?$')
+
+
+class JsonPathError(ValueError):
+    """JSON路径表达式语法错误"""
+
+
+def _get_child(node: Any, key: Any) -> Any:
+    """取单个子节点，不存在时返回 _MISSING"""
+    try:
+        return node[key]
+    except (KeyError, IndexError, TypeError):
+        return _MISSING
+
+
+def _resolve(node: Any, keys: Tuple[str, ...]) -> Any:
+    """按字段名逐级取值（过滤器内部使用）"""
+    for key in keys:
+        if not isinstance(node, dict):
+            return _MISSING
+        node = node.get(key, _MISSING)
+        if node is _MISSING:
+            return _MISSING
+    return node
+
+
+# ---------------------------------------------------------------------------
+# 路径步骤：每个步骤接收当前节点列表，返回下一层节点列表
+# ---------------------------------------------------------------------------
+
+def _step_key(key: str) -> Callable[[List], List]:
+    def step(nodes):
+        return [node[key] for node in nodes if isinstance(node, dict) and key in node]
+    return step
+
+
+def _step_index(index: int) -> Callable[[List], List]:
+    def step(nodes):
+        result = []
+        for node in nodes:
+            if isinstance(node, list):
+                value = _get_child(node, index)
+                if value is not _MISSING:
+                    result.append(value)
+        return result
+    return step
+
+
+def _step_wildcard(nodes: List) -> List:
+    result = []
+    for node in nodes:
+        if isinstance(node, list):
+            result.extend(node)
+        elif isinstance(node, dict):
+            result.extend(node.values())
+    return result
+
+
+def _step_slice(start: Optional[int], stop: Optional[int], stride: Optional[int]) -> Callable[[List], List]:
+    def step(nodes):
+        result = []
+        for node in nodes:
+            if isinstance(node, list):
+                result.extend(node[start:stop:stride])
+        return result
+    return step
+
+
+def _step_filter(keys: Tuple[str, ...], op: Optional[Callable], value: Any) -> Callable[[List], List]:
+    def match(item):
+        actual = _resolve(item, keys)
+        if actual is _MISSING:
+            return False
+        if op is None:
+            return bool(actual)
+        try:
+            return op(actual, value)
+        except TypeError:
+            return False
+
+    def step(nodes):
+        result = []
+        for node in nodes:
+            items = node if isinstance(node, list) else (node.values() if isinstance(node, dict) else ())
+            result.extend(item for item in items if match(item))
+        return result
+    return step
+
+
+# ---------------------------------------------------------------------------
+# 解析
+# ---------------------------------------------------------------------------
+
+def _parse_literal(text: str) -> Any:
+    """解析过滤器中的字面量（数字、字符串、true/false/null）"""
+    text = text.strip()
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in ('"', "'"):
+        return text[1:-1]
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text  # 未加引号的字符串
+
+
+def _parse_bracket(content: str, expr: str):
+    """解析 [...] 中的内容，返回 (步骤函数, 是否为单值步骤)"""
+    content = content.strip()
+    if content == '*':
+        return _step_wildcard, False
+    if content.startswith('?(') and content.endswith(')'):
+        match = _FILTER_RE.match(content[2:-1].strip())
+        if not match:
+            raise JsonPathError(f"无效的过滤器: [{content}]（路径: {expr}）")
+        field_path, op, literal = match.groups()
+        keys = tuple(k for k in field_path.split('.') if k)
+        op_func = _OPERATORS[op] if op else None
+        value = _parse_literal(literal) if op else None
+        return _step_filter(keys, op_func, value), False
+    if len(content) >= 2 and content[0] == content[-1] and content[0] in ('"', "'"):
+        return _step_key(content[1:-1]), True
+    if re.fullmatch(r'-?\d+', content):
+        return _step_index(int(content)), True
+    match = _SLICE_RE.match(content)
+    if match:
+        start, stop, stride = (int(x) if x else None for x in match.groups())
+        if stride == 0:
+            raise JsonPathError(f"切片步长不能为0（路径: {expr}）")
+        return _step_slice(start, stop, stride), False
+    raise JsonPathError(f"无效的下标表达式: [{content}]（路径: {expr}）")
+
+
+class JsonPath:
+    """
+    编译后的JSON路径
+
+    通过 compile_path() 获取实例（带缓存），不要直接构造
+    """
+
+    def __init__(self, expr: str):
+        self.expr = expr
+        self.steps: List[Callable[[List], List]] = []
+        # 每个步骤的规范化标识，用于 find_many 中共享公共前缀的查找结果
+        self.segments: List[Tuple] = []
+        # 仅由字段名/下标组成的路径为单值路径，其余（通配符、切片、过滤器）返回多个结果
+        self.singular = True
+        self._parse(expr)
+
+    def _add(self, segment: Tuple, step: Callable, singular: bool):
+        self.segments.append(segment)
+        self.steps.append(step)
+        self.singular = self.singular and singular
+
+    def _parse(self, expr: str):
+        text = expr.strip()
+        if text.startswith('$'):
+            text = text[1:]
+        pos, length = 0, len(text)
+
+        while pos < length:
+            char = text[pos]
+            if char == '.':
+                pos += 1
+                if pos < length and text[pos] == '*':
+                    self._add(('*',), _step_wildcard, False)
+                    pos += 1
+                    continue
+                match = _NAME_RE.match(text, pos)
+                if not match:
+                    raise JsonPathError(f"'.' 后缺少字段名（路径: {expr}）")
+                self._add(('.', match.group()), _step_key(match.group()), True)
+                pos = match.end()
+            elif char == '[':
+                end = self._find_bracket_end(text, pos, expr)
+                content = text[pos + 1:end].strip()
+                self._add(('[', content), *_parse_bracket(content, expr))
+                pos = end + 1
+            elif pos == 0:
+                if char == '*':
+                    self._add(('*',), _step_wildcard, False)
+                    pos += 1
+                    continue
+                match = _NAME_RE.match(text, pos)
+                if not match:
+                    raise JsonPathError(f"无效的路径: {expr}")
+                self._add(('.', match.group()), _step_key(match.group()), True)
+                pos = match.end()
+            else:
+                raise JsonPathError(f"位置 {pos} 处存在无效字符 '{char}'（路径: {expr}）")
+
+    @staticmethod
+    def _find_bracket_end(text: str, start: int, expr: str) -> int:
+        """查找与 start 处 '[' 匹配的 ']'（忽略引号内的字符）"""
+        quote = None
+        depth = 0
+        for i in range(start, len(text)):
+            char = text[i]
+            if quote:
+                if char == quote:
+                    quote = None
+            elif char in ('"', "'"):
+                quote = char
+            elif char == '[':
+                depth += 1
+            elif char == ']':
+                depth -= 1
+                if depth == 0:
+                    return i
+        raise JsonPathError(f"缺少 ']'（路径: {expr}）")
+
+    def find(self, data: Any) -> List[Any]:
+        """
+        查找所有匹配的值
+
+        Args:
+            data: 解析后的JSON数据
+
+        Returns:
+            匹配值列表（没有匹配时为空列表）
+        """
+        nodes = [data]
+        for step in self.steps:
+            nodes = step(nodes)
+            if not nodes:
+                break
+        return nodes
+
+    def first(self, data: Any, default: Any = None) -> Any:
+        """返回第一个匹配的值，没有匹配时返回 default"""
+        nodes = self.find(data)
+        return nodes[0] if nodes else default
+
+    def __repr__(self):
+        return f"JsonPath({self.expr!r})"
+
+
+@lru_cache(maxsize=MAX_CACHED_PATHS)
+def compile_path(expr: str) -> JsonPath:
+    """
+    编译JSON路径表达式（同一表达式在进程内只解析一次）
+
+    Args:
+        expr: 路径表达式，如 'data.messages[*].message_id'
+
+    Returns:
+        JsonPath对象
+
+    Raises:
+        JsonPathError: 如果表达式语法错误
+    """
+    return JsonPath(expr)
+
+
+def find_many(data: Any, exprs) -> Dict[str, List[Any]]:
+    """
+    一次遍历查找多个路径
+
+    各路径的公共前缀（如 'data.user.name' 与 'data.user.email' 的 'data.user'）只求值一次
+
+    Args:
+        data: 解析后的JSON数据
+        exprs: 路径表达式列表
+
+    Returns:
+        {路径表达式: 匹配值列表}
+    """
+    memo: Dict[Tuple, List[Any]] = {}
+    results: Dict[str, List[Any]] = {}
+    for expr in exprs:
+        if expr in results:
+            continue
+        path = compile_path(expr)
+        nodes = [data]
+        prefix: Tuple = ()
+        for segment, step in zip(path.segments, path.steps):
+            prefix += (segment,)
+            cached = memo.get(prefix)
+            if cached is None:
+                cached = step(nodes) if nodes else []
+                memo[prefix] = cached
+            nodes = cached
+        results[expr] = nodes
+    return results
@@ -0,0 +1,453 @@
+"""
+压测模块
+复用 UserApi / MessageApi 按目标RPS或并发数持续发送请求，统计吞吐量、错误率和延迟分位数，
+并按YAML中配置的阈值判定是否通过
+
+场景文件格式（默认 config/load.yaml）:
+    load:
+      duration: 30          # 持续时间（秒）
+      concurrency: 10       # 并发线程数
+      rps: 0                # 目标每秒请求数，0表示不限速（各线程连续发送）
+    scenarios:
+      - name: user_info
+        api: user.get_user_info     # <API对象>.<方法名>，API对象: user、message
+        weight: 3                   # 权重（按比例分配请求）
+        params: {user_id: 1001}     # 方法参数，字符串中的 {n} 替换为请求序号
+        thresholds: {p99: 200}      # 场景级阈值（可选）
+    thresholds:
+      max_error_rate: 0.01          # 最大错误率
+      min_throughput: 50            # 最低吞吐量（请求/秒）
+      p50: 50                       # 各分位数延迟上限（毫秒）
+      p99: 300
+"""
+import itertools
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import yaml
+
+from core.histogram import LatencyHistogram
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 项目根目录
+BASE_DIR = Path(__file__).parent.parent
+
+# 默认场景文件
+DEFAULT_LOAD_FILE = BASE_DIR / 'config' / 'load.yaml'
+
+# 压测期间调高到 WARNING 的日志记录器（避免每个请求一条INFO日志影响压测结果）
+QUIET_LOGGERS = ('api', 'core.http_client')
+
+# 支持的阈值: 错误率、吞吐量，以及 LatencyHistogram.summary() 中的延迟统计（毫秒）
+_LATENCY_THRESHOLDS = ('p50', 'p90', 'p99', 'p999', 'mean', 'max')
+
+
+class Scenario:
+    """压测场景：一次API方法调用"""
+
+    def __init__(self, name: str, func: Callable, params: Optional[Dict[str, Any]] = None,
+                 weight: int = 1, thresholds: Optional[Dict[str, float]] = None):
+        """
+        初始化压测场景
+
+        Args:
+            name: 场景名称
+            func: 被调用的API方法
+            params: 方法参数，字符串参数中的 {n} 替换为请求序号（用于生成唯一数据）
+            weight: 权重
+            thresholds: 场景级阈值
+        """
+        if weight < 1:
+            raise ValueError(f"场景 {name} 的权重必须为正整数: {weight}")
+        self.name = name
+        self.func = func
+        self.params = params or {}
+        self.weight = weight
+        self.thresholds = thresholds or {}
+        self._templated = {key for key, value in self.params.items() if isinstance(value, str) and '{n}' in value}
+
+    def run(self, n: int):
+        """执行一次调用，n 为全局请求序号"""
+        if self._templated:
+            params = {
+                key: value.replace('{n}', str(n)) if key in self._templated else value
+                for key, value in self.params.items()
+            }
+        else:
+            params = self.params
+        return self.func(**params)
+
+
+class LoadResult:
+    """压测结果（各线程的直方图合并后的汇总）"""
+
+    def __init__(self, elapsed: float, histogram: LatencyHistogram,
+                 scenarios: Dict[str, LatencyHistogram], errors: Dict[str, Dict[str, int]]):
+        """
+        Args:
+            elapsed: 实际持续时间（秒）
+            histogram: 全部请求的延迟直方图
+            scenarios: {场景名称: 延迟直方图}
+            errors: {场景名称: {异常类型: 次数}}
+        """
+        self.elapsed = elapsed
+        self.histogram = histogram
+        self.scenarios = scenarios
+        self.errors = errors
+
+    @staticmethod
+    def _stats(histogram: LatencyHistogram, errors: Dict[str, int], elapsed: float) -> Dict[str, Any]:
+        error_count = sum(errors.values())
+        stats = {
+            'requests': histogram.count,
+            'errors': error_count,
+            'error_rate': round(error_count / histogram.count, 6) if histogram.count else 0.0,
+            'throughput': round(histogram.count / elapsed, 3) if elapsed else 0.0,
+            'latency_ms': histogram.summary(),
+        }
+        if errors:
+            stats['error_types'] = dict(errors)
+        return stats
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典（写入 report/load_result.json）"""
+        total_errors: Dict[str, int] = {}
+        for errors in self.errors.values():
+            for name, count in errors.items():
+                total_errors[name] = total_errors.get(name, 0) + count
+        return {
+            'elapsed': round(self.elapsed, 3),
+            'total': self._stats(self.histogram, total_errors, self.elapsed),
+            'scenarios': {
+                name: self._stats(histogram, self.errors.get(name, {}), self.elapsed)
+                for name, histogram in self.scenarios.items()
+            },
+        }
+
+
+class LoadRunner:
+    """
+    压测执行器
+
+    每个线程使用独立的直方图记录延迟，结束后合并，记录过程无需加锁。
+    指定RPS时按固定间隔分配发送时间点（开环），延迟从计划发送时间开始计算，
+    服务端变慢导致请求积压时，排队时间同样计入延迟，不会因发送变慢而掩盖延迟升高
+    """
+
+    def __init__(self, scenarios: Sequence[Scenario], duration: float,
+                 concurrency: int = 10, rps: Optional[float] = None):
+        """
+        初始化压测执行器
+
+        Args:
+            scenarios: 压测场景列表
+            duration: 持续时间（秒）
+            concurrency: 并发线程数
+            rps: 目标每秒请求数，None或0表示不限速
+        """
+        if not scenarios:
+            raise ValueError("至少需要一个压测场景")
+        if duration <= 0 or concurrency < 1:
+            raise ValueError(f"duration 必须大于0、concurrency 必须不小于1: duration={duration}, concurrency={concurrency}")
+        self.scenarios = list(scenarios)
+        self.duration = duration
+        self.concurrency = concurrency
+        self.rps = rps or None
+        # 按权重平滑交错排列的调度表，请求序号 n 执行 schedule[n % len(schedule)]
+        self._schedule = _weighted_schedule(self.scenarios)
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def _next_request(self):
+        with self._lock:
+            return next(self._counter)
+
+    def _worker(self, start: float, end: float, precision: float, results: List):
+        histogram = LatencyHistogram(precision)
+        scenario_histograms = {scenario.name: LatencyHistogram(precision) for scenario in self.scenarios}
+        errors: Dict[str, Dict[str, int]] = {}
+        interval = 1.0 / self.rps if self.rps else None
+
+        while True:
+            n = self._next_request()
+            if interval:
+                scheduled = start + n * interval
+                if scheduled >= end:
+                    break
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            else:
+                scheduled = time.perf_counter()
+                if scheduled >= end:
+                    break
+
+            scenario = self._schedule[n % len(self._schedule)]
+            try:
+                scenario.run(n)
+            except Exception as e:
+                scenario_errors = errors.setdefault(scenario.name, {})
+                scenario_errors[type(e).__name__] = scenario_errors.get(type(e).__name__, 0) + 1
+            latency = time.perf_counter() - scheduled
+            histogram.record(latency)
+            scenario_histograms[scenario.name].record(latency)
+
+        results.append((histogram, scenario_histograms, errors))
+
+    def run(self, precision: float = 0.01) -> LoadResult:
+        """
+        执行压测
+
+        Args:
+            precision: 延迟直方图的相对误差
+
+        Returns:
+            LoadResult
+        """
+        results: List = []
+        start = time.perf_counter()
+        end = start + self.duration
+        threads = [
+            threading.Thread(target=self._worker, args=(start, end, precision, results),
+                             name=f'load-worker-{i}', daemon=True)
+            for i in range(self.concurrency)
+        ]
+        with quiet_loggers(QUIET_LOGGERS):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        elapsed = time.perf_counter() - start
+
+        histogram = LatencyHistogram.merged((r[0] for r in results), precision)
+        scenarios = {
+            scenario.name: LatencyHistogram.merged((r[1][scenario.name] for r in results), precision)
+            for scenario in self.scenarios
+        }
+        errors: Dict[str, Dict[str, int]] = {}
+        for _, _, worker_errors in results:
+            for name, counts in worker_errors.items():
+                merged = errors.setdefault(name, {})
+                for error_type, count in counts.items():
+                    merged[error_type] = merged.get(error_type, 0) + count
+        return LoadResult(elapsed, histogram, scenarios, errors)
+
+
+def _weighted_schedule(scenarios: Sequence[Scenario]) -> List[Scenario]:
+    """
+    平滑加权轮询：权重 3:1 的 A、B 生成 [A, A, B, A] 而不是 [A, A, A, B]，
+    短时间压测中各场景的请求比例也接近权重
+    """
+    current = [0] * len(scenarios)
+    total = sum(scenario.weight for scenario in scenarios)
+    schedule = []
+    for _ in range(total):
+        for i, scenario in enumerate(scenarios):
+            current[i] += scenario.weight
+        best = max(range(len(scenarios)), key=lambda i: current[i])
+        current[best] -= total
+        schedule.append(scenarios[best])
+    return schedule
+
+
+@contextmanager
+def quiet_loggers(prefixes: Sequence[str], level: int = logging.WARNING):
+    """临时调高指定前缀的日志记录器级别"""
+    saved = {}
+    for name in list(logging.root.manager.loggerDict):
+        if any(name == prefix or name.startswith(prefix + '.') for prefix in prefixes):
+            target = logging.getLogger(name)
+            saved[name] = target.level
+            target.setLevel(max(target.level, level))
+    try:
+        yield
+    finally:
+        for name, saved_level in saved.items():
+            logging.getLogger(name).setLevel(saved_level)
+
+
+def load_config(load_file: Optional[Path] = None) -> Dict[str, Any]:
+    """
+    读取场景文件
+
+    Raises:
+        FileNotFoundError: 如果文件不存在
+    """
+    load_file = Path(load_file or DEFAULT_LOAD_FILE)
+    if not load_file.exists():
+        raise FileNotFoundError(f"压测场景文件不存在: {load_file}")
+    with open(load_file, 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f) or {}
+
+
+def build_scenarios(definitions: Sequence[Dict[str, Any]], apis: Dict[str, Any],
+                    names: Optional[Sequence[str]] = None) -> List[Scenario]:
+    """
+    根据场景定义创建压测场景
+
+    Args:
+        definitions: 场景文件中的 scenarios 列表
+        apis: {API对象名: API实例}，如 {'user': UserApi(), 'message': MessageApi()}
+        names: 只使用指定名称的场景（None表示全部）
+
+    Raises:
+        ValueError: 如果场景定义无效
+    """
+    scenarios = []
+    for definition in definitions:
+        name = definition.get('name') or definition.get('api')
+        if names and name not in names:
+            continue
+        target = definition.get('api', '')
+        api_name, _, method_name = target.partition('.')
+        api = apis.get(api_name)
+        func = getattr(api, method_name, None) if method_name and not method_name.startswith('_') else None
+        if api is None or not callable(func):
+            raise ValueError(f"场景 {name} 的 api 无效: {target}（格式 <{'|'.join(apis)}>.<方法名>）")
+        scenarios.append(Scenario(
+            name=name,
+            func=func,
+            params=definition.get('params'),
+            weight=int(definition.get('weight', 1)),
+            thresholds=definition.get('thresholds'),
+        ))
+    if names:
+        missing = set(names) - {scenario.name for scenario in scenarios}
+        if missing:
+            raise ValueError(f"场景不存在: {', '.join(sorted(missing))}")
+    return scenarios
+
+
+def _check(stats: Dict[str, Any], thresholds: Dict[str, float], label: str) -> List[str]:
+    violations = []
+    for key, limit in thresholds.items():
+        if key == 'max_error_rate':
+            if stats['error_rate'] > limit:
+                violations.append(f"{label} 错误率 {stats['error_rate']:.2%} 超过阈值 {limit:.2%}")
+        elif key == 'min_throughput':
+            if stats['throughput'] < limit:
+                violations.append(f"{label} 吞吐量 {stats['throughput']:.1f}/s 低于阈值 {limit}/s")
+        elif key in _LATENCY_THRESHOLDS:
+            actual = stats['latency_ms'].get(key)
+            if actual is not None and actual > limit:
+                violations.append(f"{label} {key} 延迟 {actual:.1f}ms 超过阈值 {limit}ms")
+        else:
+            violations.append(f"{label} 未知的阈值配置: {key}")
+    return violations
+
+
+def check_thresholds(summary: Dict[str, Any], thresholds: Optional[Dict[str, float]],
+                     scenarios: Sequence[Scenario] = ()) -> List[str]:
+    """
+    检查压测结果是否满足阈值
+
+    Args:
+        summary: LoadResult.to_dict() 的结果
+        thresholds: 整体阈值
+        scenarios: 压测场景（检查场景级阈值）
+
+    Returns:
+        不满足的阈值描述列表（为空表示通过）
+    """
+    violations = _check(summary['total'], thresholds or {}, '整体')
+    for scenario in scenarios:
+        if scenario.thresholds:
+            violations.extend(_check(summary['scenarios'][scenario.name], scenario.thresholds, f"场景 {scenario.name}"))
+    return violations
+
+
+def log_summary(summary: Dict[str, Any]):
+    """输出压测结果"""
+    def line(label, stats):
+        latency = stats['latency_ms']
+        percentiles = ', '.join(f"{key} {latency[key]}" for key in ('p50', 'p90', 'p99', 'p999'))
+        return (
+            f"{label}: 请求 {stats['requests']}, 吞吐量 {stats['throughput']:.1f}/s, "
+            f"错误率 {stats['error_rate']:.2%}, 延迟(ms) {percentiles}, max {latency['max']}"
+        )
+
+    logger.info(f"压测完成，持续 {summary['elapsed']:.1f}s")
+    logger.info(line('整体', summary['total']))
+    for name, stats in summary['scenarios'].items():
+        logger.info(line(f"  {name}", stats))
+        if stats.get('error_types'):
+            logger.info(f"    错误: {stats['error_types']}")
+
+
+def run_load(
+    report_dir: Path,
+    load_file: Optional[Path] = None,
+    duration: Optional[float] = None,
+    concurrency: Optional[int] = None,
+    rps: Optional[float] = None,
+    scenario_names: Optional[Sequence[str]] = None,
+) -> int:
+    """
+    按场景文件执行压测，结果写入 report/load_result.json
+
+    命令行参数（不为None时）覆盖场景文件 load 下的同名配置
+
+    Returns:
+        退出码（0: 通过，1: 未满足阈值）
+    """
+    from api.message_api import MessageApi
+    from api.user_api import UserApi
+    from core.config import config
+    from core.http_client import HttpClient
+    from core.resilience import RetryPolicy
+
+    settings = load_config(load_file)
+    options = settings.get('load') or {}
+    duration = duration if duration is not None else options.get('duration', 30)
+    concurrency = concurrency if concurrency is not None else options.get('concurrency', 10)
+    rps = rps if rps is not None else options.get('rps', 0)
+
+    # 连接池不小于并发数，避免超出的连接用完即丢弃
+    pool_config = config.get_api_pool_config()
+    pool_config['pool_maxsize'] = max(pool_config['pool_maxsize'], concurrency)
+    # 压测不重试、不熔断、不录制、不缓存，错误率和延迟反映服务端的真实表现
+    client = HttpClient(
+        config.get_api_base_url(), timeout=config.get_api_timeout(), pool_config=pool_config,
+        retry_policy=RetryPolicy(max_retries=0), circuit_breaker={'enabled': False},
+        cassette={'mode': 'off'}, cache={'enabled': False}
+    )
+    apis = {'user': UserApi(client), 'message': MessageApi(client)}
+
+    try:
+        scenarios = build_scenarios(settings.get('scenarios') or [], apis, scenario_names)
+        runner = LoadRunner(scenarios, duration=duration, concurrency=concurrency, rps=rps)
+        logger.info(
+            f"开始压测: 场景 {', '.join(s.name for s in scenarios)}, 持续 {duration}s, "
+            f"并发 {concurrency}, " + (f"目标 {rps} 请求/秒" if rps else "不限速")
+        )
+        result = runner.run()
+    finally:
+        client.close()
+
+    summary = result.to_dict()
+    summary['config'] = {'duration': duration, 'concurrency': concurrency, 'rps': rps}
+    log_summary(summary)
+
+    violations = check_thresholds(summary, settings.get('thresholds'), scenarios)
+    summary['passed'] = not violations
+    summary['violations'] = violations
+
+    report_dir.mkdir(parents=True, exist_ok=True)
+    result_file = report_dir / 'load_result.json'
+    with open(result_file, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    logger.info(f"压测结果已写入: {result_file}")
+
+    if violations:
+        for violation in violations:
+            logger.error(f"阈值未通过: {violation}")
+        return 1
+    logger.info("压测阈值检查通过")
+    return 0
@@ -1,11 +1,31 @@
 """
 日志管理模块
 提供统一的日志记录功能
+
+所有日志记录器共用一组处理器（控制台 + 日志文件）。默认（log.queue: true）各记录器只挂一个 QueueHandler，
+调用线程只把日志放入队列，格式化和写入由后台 QueueListener 线程完成；日志文件带写缓冲，
+缓冲区满、距上次写入超过 log.flush_interval 秒或遇到 WARNING 及以上级别的日志时才写入磁盘
+
+日志文件按天命名（logs/test_YYYYMMDD.log），跨过零点或超过 log.max_bytes 时切分为
+test_YYYYMMDD.N.log，由后台线程压缩为 .gz，并按 log.retention_days / log.max_backups 删除旧日志
+
+开启 log.json_events 时，通过 get_event_logger() 记录的结构化事件（见 core.events）以每行一个紧凑JSON
+写入 logs/events_YYYYMMDD.jsonl，与文本日志共用后台写日志线程和切分规则，不出现在控制台和文本日志中
 """
+import atexit
+import gzip
+import json
 import logging
 import os
+import queue
+import re
+import shutil
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 from datetime import datetime
+from typing import List, Optional
 
 # 获取项目根目录
 BASE_DIR = Path(__file__).parent.parent
@@ -14,60 +34,447 @@ BASE_DIR = Path(__file__).parent.parent
 LOG_DIR = BASE_DIR / 'logs'
 LOG_DIR.mkdir(exist_ok=True)
 
-# 日志文件路径
-LOG_FILE = LOG_DIR / f"test_{datetime.now().strftime('%Y%m%d')}.log"
+# 日志文件名前缀（test_YYYYMMDD.log）
+LOG_PREFIX = 'test'
+
+# 结构化事件日志（events_YYYYMMDD.jsonl）
+EVENT_LOGGER = 'liquid.events'
+EVENT_PREFIX = 'events'
+EVENT_SUFFIX = '.jsonl'
+
+# 日志格式
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+LOG_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+class BufferedFileHandler(logging.FileHandler):
+    """
+    带写缓冲的文件处理器
+
+    日志先放入内存缓冲区，累计超过 buffer_size 字节、距上次写入超过 flush_interval 秒
+    或日志级别不低于 flush_level 时一次写入磁盘；关闭时写入剩余内容
+    """
+
+    def __init__(self, filename, buffer_size: int = 65536, flush_interval: float = 1.0,
+                 flush_level: int = logging.WARNING, encoding: Optional[str] = 'utf-8'):
+        """
+        Args:
+            filename: 日志文件路径
+            buffer_size: 写缓冲大小（字节），0 表示每条日志立即写入
+            flush_interval: 缓冲内容最长保留时间（秒）
+            flush_level: 不低于该级别的日志立即写入磁盘
+            encoding: 文件编码
+        """
+        self.buffer_size = max(0, int(buffer_size))
+        self.flush_interval = flush_interval
+        self.flush_level = flush_level
+        self._buffer: List[str] = []
+        self._buffered = 0
+        self._last_flush = time.monotonic()
+        super().__init__(filename, encoding=encoding, delay=True)
+
+    def emit(self, record: logging.LogRecord):
+        """放入缓冲区，满足条件时写入磁盘（StreamHandler.emit 每条日志都会写入并 flush）"""
+        try:
+            text = self.format(record) + self.terminator
+            self._buffer.append(text)
+            self._buffered += len(text)
+            if (self._buffered >= self.buffer_size or record.levelno >= self.flush_level
+                    or time.monotonic() - self._last_flush >= self.flush_interval):
+                self.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        """将缓冲内容写入磁盘"""
+        with self.lock:
+            if self._buffer:
+                if self.stream is None:
+                    self.stream = self._open()
+                text, self._buffer, self._buffered = ''.join(self._buffer), [], 0
+                self.stream.write(text)
+            super().flush()
+            self._last_flush = time.monotonic()
+
+    def close(self):
+        with self.lock:
+            try:
+                self.flush()
+            finally:
+                super().close()
+
+
+class RotatingLogHandler(BufferedFileHandler):
+    """
+    按天和大小切分的日志文件处理器
+
+    当前日志写入 {prefix}_YYYYMMDD{suffix}；日期变化或文件超过 max_bytes 时，当前文件改名为
+    {prefix}_YYYYMMDD.N{suffix}，由后台线程压缩为 .gz 并清理超出保留期限/数量的旧日志。
+    并行执行的多个进程写同一个文件时，其他进程在下一次写入时发现文件已被切分，改为写入新文件
+    """
+
+    def __init__(self, directory, prefix: str = LOG_PREFIX, suffix: str = '.log', max_bytes: int = 0,
+                 compress: bool = True, retention_days: float = 0, max_backups: int = 0, **kwargs):
+        """
+        Args:
+            directory: 日志目录
+            prefix: 日志文件名前缀
+            suffix: 日志文件扩展名
+            max_bytes: 单个日志文件大小上限（字节），0 表示不按大小切分
+            compress: 是否压缩切分出的日志
+            retention_days: 旧日志保留天数，0 表示不限
+            max_backups: 最多保留的旧日志文件数，0 表示不限
+            **kwargs: BufferedFileHandler 的其他参数
+        """
+        self.directory = Path(directory)
+        self.prefix = prefix
+        self.suffix = suffix
+        self.max_bytes = max(0, int(max_bytes))
+        self.compress = compress
+        self.retention_days = retention_days
+        self.max_backups = max(0, int(max_backups))
+        self._date = self._today()
+        self._workers: List[threading.Thread] = []
+        super().__init__(self.path_for(self._date), **kwargs)
+        # 压缩和清理之前运行留下的日志
+        self._start_archive(None)
+
+    @staticmethod
+    def _today() -> str:
+        return datetime.now().strftime('%Y%m%d')
+
+    def path_for(self, date: str) -> Path:
+        """指定日期的当前日志文件"""
+        return self.directory / f"{self.prefix}_{date}{self.suffix}"
+
+    def flush(self):
+        """写入缓冲内容，必要时先切换到新文件或在写入后切分"""
+        with self.lock:
+            date = self._today()
+            if date != self._date:
+                self._rollover(date)
+            elif self.stream is not None and self._replaced():
+                self._reopen()
+            super().flush()
+            if self.max_bytes and self.stream is not None and os.fstat(self.stream.fileno()).st_size >= self.max_bytes:
+                self._rollover(date)
+
+    def _replaced(self) -> bool:
+        """当前文件是否已被其他进程切分（改名）"""
+        try:
+            return os.stat(self.baseFilename).st_ino != os.fstat(self.stream.fileno()).st_ino
+        except FileNotFoundError:
+            return True
+
+    def _reopen(self):
+        self.stream.close()
+        self.stream = None
+
+    def _next_segment(self, date: str) -> Path:
+        """切分出的日志文件名（{prefix}_YYYYMMDD.N{suffix}，N 为当天下一个序号）"""
+        pattern = re.compile(rf"{re.escape(self.prefix)}_{date}\.(\d+){re.escape(self.suffix)}(\.gz)?$")
+        numbers = [int(m.group(1)) for m in map(pattern.match, os.listdir(self.directory)) if m]
+        return self.directory / f"{self.prefix}_{date}.{max(numbers, default=0) + 1}{self.suffix}"
+
+    def _rollover(self, date: str):
+        """切分当前文件并切换到 date 对应的日志文件"""
+        if self.stream is not None:
+            self._reopen()
+        segment = self._next_segment(self._date)
+        try:
+            os.rename(self.baseFilename, segment)
+        except FileNotFoundError:
+            # 其他进程已切分（或当前文件还没有写入内容）
+            segment = None
+        self._date = date
+        self.baseFilename = os.fspath(self.path_for(date))
+        self._start_archive(segment)
+
+    def _start_archive(self, segment: Optional[Path]):
+        self._workers = [worker for worker in self._workers if worker.is_alive()]
+        worker = threading.Thread(target=self._archive, args=(segment,), name='log-archive')
+        worker.start()
+        self._workers.append(worker)
+
+    def _archive(self, segment: Optional[Path]):
+        """后台压缩切分出的日志并清理旧日志"""
+        with _archive_lock:
+            try:
+                if self.compress:
+                    if segment is not None:
+                        compress_file(segment)
+                    for path in self._stale_files():
+                        compress_file(path)
+                self.prune()
+            except OSError as e:
+                logging.getLogger(__name__).warning(f"日志归档失败: {e}")
+
+    def _stale_files(self) -> List[Path]:
+        """
+        之前运行留下的未压缩日志：其他日期的日志文件，以及压缩前中断的切分文件
+        （一分钟内仍有写入的文件可能属于正在运行的其他进程，暂不处理）
+        """
+        pattern = re.compile(rf"{re.escape(self.prefix)}_(\d{{8}})(\.\d+)?{re.escape(self.suffix)}$")
+        cutoff = time.time() - 60
+        stale = []
+        for path in self.directory.iterdir():
+            match = pattern.match(path.name)
+            if (match and (match.group(2) or match.group(1) != self._date)
+                    and path.stat().st_mtime < cutoff):
+                stale.append(path)
+        return stale
+
+    def prune(self) -> List[Path]:
+        """
+        删除超出保留期限或数量的旧日志（不含当前日志文件）
+
+        Returns:
+            删除的文件
+        """
+        pattern = re.compile(rf"{re.escape(self.prefix)}_\d{{8}}(\.\d+)?{re.escape(self.suffix)}(\.gz)?$")
+        current = Path(self.baseFilename).name
+        backups = sorted(
+            (path for path in self.directory.iterdir() if pattern.match(path.name) and path.name != current),
+            key=lambda path: path.stat().st_mtime, reverse=True
+        )
+        expired = []
+        if self.max_backups:
+            expired.extend(backups[self.max_backups:])
+            backups = backups[:self.max_backups]
+        if self.retention_days:
+            cutoff = time.time() - self.retention_days * 86400
+            expired.extend(path for path in backups if path.stat().st_mtime < cutoff)
+        for path in expired:
+            path.unlink(missing_ok=True)
+        return expired
+
+    def close(self):
+        """写入缓冲内容，并等待后台归档完成"""
+        super().close()
+        for worker in self._workers:
+            worker.join()
+        self._workers = []
+
+
+_archive_lock = threading.Lock()
+
+
+def compress_file(path: Path) -> Optional[Path]:
+    """
+    将日志压缩为 path.gz 并删除原文件（先写临时文件，中途退出不会留下不完整的 .gz）
+
+    Returns:
+        压缩后的文件，原文件已被其他进程处理时返回None
+    """
+    target = Path(f"{path}.gz")
+    temp = Path(f"{path}.gz.{os.getpid()}.tmp")
+    try:
+        with open(path, 'rb') as src, gzip.open(temp, 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+        shutil.copystat(path, temp)
+        os.replace(temp, target)
+        os.remove(path)
+    except FileNotFoundError:
+        # 并行执行时其他进程已压缩
+        temp.unlink(missing_ok=True)
+        return None
+    return target
+
+
+class JsonFormatter(logging.Formatter):
+    """结构化事件格式: 每条事件一行紧凑JSON（不缩进），ts 为记录时间戳"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps({'ts': round(record.created, 6), **record.event},
+                          ensure_ascii=False, separators=(',', ':'), default=str)
+
+
+def _is_event(record: logging.LogRecord) -> bool:
+    return hasattr(record, 'event')
+
+
+def _is_text(record: logging.LogRecord) -> bool:
+    return not hasattr(record, 'event')
+
+
+class FlushingQueueListener(QueueListener):
+    """
+    日志队列监听器
+
+    队列空闲超过 flush_interval 秒时刷新各处理器，写缓冲中的日志不会因为没有新日志而一直滞留
+    """
+
+    def __init__(self, log_queue, *handlers, flush_interval: float = 1.0):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.flush_interval = flush_interval
+
+    def dequeue(self, block: bool):
+        if not block:
+            return self.queue.get_nowait()
+        try:
+            return self.queue.get(timeout=self.flush_interval)
+        except queue.Empty:
+            for handler in self.handlers:
+                handler.flush()
+            return self.queue.get()
+
+
+_handlers: Optional[List[logging.Handler]] = None
+_file_handler: Optional[RotatingLogHandler] = None
+_listener: Optional[FlushingQueueListener] = None
+_handlers_lock = threading.Lock()
+
+
+def _log_settings() -> dict:
+    """读取 log 配置（配置不可用时使用默认值）"""
+    try:
+        from core.config import config
+        return {
+            'queue': config.get_log_queue_enabled(),
+            'file_buffer_size': config.get_log_file_buffer_size(),
+            'flush_interval': config.get_log_flush_interval(),
+            'json_events': config.get_log_json_events_enabled(),
+            **config.get_log_rotation_config(),
+        }
+    except Exception:
+        return {'queue': True, 'file_buffer_size': 65536, 'flush_interval': 1.0, 'json_events': False}
+
+
+def _create_handlers(settings: dict) -> List[logging.Handler]:
+    """创建控制台处理器、文件处理器以及（开启 log.json_events 时）结构化事件处理器"""
+    formatter = logging.Formatter(LOG_FORMAT, datefmt=LOG_DATE_FORMAT)
+
+    # 控制台处理器（输出到终端）
+    console_handler = logging.StreamHandler()
+
+    # 文件处理器（输出到文件，按天和大小切分），file_buffer_size 为 0 时每条日志立即写入
+    file_settings = {
+        'max_bytes': settings.get('max_bytes', 0),
+        'compress': settings.get('compress', True),
+        'retention_days': settings.get('retention_days', 0),
+        'max_backups': settings.get('max_backups', 0),
+        'buffer_size': settings['file_buffer_size'],
+        'flush_interval': settings['flush_interval'],
+    }
+    file_handler = RotatingLogHandler(LOG_DIR, **file_settings)
+
+    handlers = [console_handler, file_handler]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+        handler.addFilter(_is_text)
+
+    if settings.get('json_events'):
+        event_handler = RotatingLogHandler(LOG_DIR, prefix=EVENT_PREFIX, suffix=EVENT_SUFFIX, **file_settings)
+        event_handler.setFormatter(JsonFormatter())
+        event_handler.addFilter(_is_event)
+        handlers.append(event_handler)
+    return handlers
+
+
+def _get_handlers() -> List[logging.Handler]:
+    """
+    获取挂到日志记录器上的处理器（首次调用时创建，所有记录器共用）
+
+    开启 log.queue 时返回写入共享队列的 QueueHandler，并启动后台写日志线程
+    """
+    global _handlers, _file_handler, _listener
+    with _handlers_lock:
+        if _handlers is None:
+            settings = _log_settings()
+            handlers = _create_handlers(settings)
+            _file_handler = handlers[1]
+            if settings['queue']:
+                log_queue = queue.SimpleQueue()
+                _listener = FlushingQueueListener(log_queue, *handlers, flush_interval=settings['flush_interval'])
+                _listener.start()
+                atexit.register(stop_logging)
+                _handlers = [QueueHandler(log_queue)]
+            else:
+                _handlers = handlers
+        return _handlers
+
+
+def get_log_file() -> Path:
+    """当前写入的日志文件"""
+    _get_handlers()
+    return Path(_file_handler.baseFilename)
+
+
+def flush_logs():
+    """等待队列中已有的日志写完，并将缓冲内容写入磁盘"""
+    with _handlers_lock:
+        listener = _listener
+        handlers = list(_handlers or [])
+    if listener is not None:
+        # 停止再重新启动监听线程：stop() 会处理完队列中已有的日志
+        listener.stop()
+        listener.start()
+        handlers = listener.handlers
+    for handler in handlers:
+        handler.flush()
+
+
+def stop_logging():
+    """
+    停止后台写日志线程并处理完队列中的日志（进程退出时自动调用，
+    之后由 logging.shutdown 写入并关闭各处理器的缓冲）
+    """
+    global _listener
+    with _handlers_lock:
+        listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
 
 
 def setup_logger(name: str = __name__, level: str = 'INFO') -> logging.Logger:
     """
     设置日志记录器
-    
+
     Args:
         name: 日志记录器名称（通常是模块名）
         level: 日志级别（DEBUG、INFO、WARNING、ERROR）
-        
+
     Returns:
         Logger对象
     """
     logger = logging.getLogger(name)
-    
+
     # 如果已经配置过，直接返回
     if logger.handlers:
         return logger
-    
-    # 设置日志级别
+
+    # 设置日志级别（处理器共用，级别由记录器过滤）
     log_level = getattr(logging, level.upper(), logging.INFO)
     logger.setLevel(log_level)
-    
-    # 日志格式
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    
-    # 控制台处理器（输出到终端）
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(log_level)
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-    
-    # 文件处理器（输出到文件）
-    file_handler = logging.FileHandler(LOG_FILE, encoding='utf-8')
-    file_handler.setLevel(log_level)
-    file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
-    
+
+    for handler in _get_handlers():
+        logger.addHandler(handler)
+
+    return logger
+
+
+def get_event_logger() -> logging.Logger:
+    """
+    获取结构化事件记录器
+
+    通过 logger.info(名称, extra={'event': 字典}) 记录事件；未开启 log.json_events 时事件被丢弃
+    """
+    logger = setup_logger(EVENT_LOGGER, 'INFO')
+    # 事件不传递给根记录器（不出现在 pytest 的日志输出中）
+    logger.propagate = False
     return logger
 
 
 def get_logger(name: str = __name__, level: str = None) -> logging.Logger:
     """
     获取日志记录器（快捷方法）
-    
+
     Args:
         name: 日志记录器名称
         level: 日志级别（可选，如果不提供则从配置读取）
-        
+
     Returns:
         Logger对象
     """
@@ -78,4 +485,3 @@ def get_logger(name: str = __name__, level: str = None) -> logging.Logger:
         except:
             level = 'INFO'  # 默认级别
     return setup_logger(name, level)
-
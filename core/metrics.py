@@ -0,0 +1,85 @@
+"""
+请求指标模块
+HttpClient / AsyncHttpClient 每完成一次请求都会发布一条指标记录，
+报告、历史记录等功能通过注册监听器获取这些数据
+"""
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 监听器签名: listener(record)，record 为请求指标字典:
+#   method: 请求方法
+#   url: 请求URL（不含查询参数）
+#   status_code: 状态码（请求异常时为None）
+#   elapsed: 耗时（秒）
+#   error: 异常类型名（请求成功时为None）
+#   request_id: 请求ID（同一次调用的多次重试相同）
+#   attempt: 第几次尝试（从0开始）
+#   test_id: 发出请求的用例 nodeid（用例外为None）
+#   request_bytes: 请求体字节数（流式请求体等无法确定大小时为None）
+#   response_bytes: 响应体字节数（请求异常或响应体未读取时为None）
+#   timing: 阶段耗时与收发字节数（见 core.timing.RequestTiming.to_dict，未实际发出请求时为None）
+Listener = Callable[[Dict[str, Any]], None]
+
+_listeners: List[Listener] = []
+_lock = threading.Lock()
+
+_current_test: ContextVar[Optional[str]] = ContextVar('liquid_current_test', default=None)
+
+
+@contextmanager
+def test_scope(test_id: str) -> Iterator[None]:
+    """在上下文内设置当前用例（由 conftest 设置为用例 nodeid），期间的请求指标带上该用例"""
+    token = _current_test.set(test_id)
+    try:
+        yield
+    finally:
+        _current_test.reset(token)
+
+
+def current_test() -> Optional[str]:
+    """当前用例的 nodeid"""
+    return _current_test.get()
+
+
+def add_listener(listener: Listener):
+    """注册请求指标监听器"""
+    with _lock:
+        if listener not in _listeners:
+            _listeners.append(listener)
+
+
+def remove_listener(listener: Listener):
+    """移除请求指标监听器"""
+    with _lock:
+        if listener in _listeners:
+            _listeners.remove(listener)
+
+
+def has_listeners() -> bool:
+    """是否注册了监听器（没有监听器时客户端不必构造指标记录）"""
+    return bool(_listeners)
+
+
+def error_label(record: Dict[str, Any]) -> Optional[str]:
+    """请求的错误类型: 异常类型名，或状态码 >= 400 时的 "HTTP {状态码}"；请求成功时为None"""
+    status_code = record.get('status_code')
+    return record.get('error') or (f"HTTP {status_code}" if status_code and status_code >= 400 else None)
+
+
+def publish(record: Dict[str, Any]):
+    """
+    发布一条请求指标记录
+
+    监听器中的异常只记录日志，不影响请求本身
+    """
+    for listener in list(_listeners):
+        try:
+            listener(record)
+        except Exception as e:
+            logger.warning(f"请求指标监听器执行失败: {e}")
@@ -0,0 +1,489 @@
+"""
+并行执行模块
+将收集到的用例按nodeid哈希分配到CI分片、分片内按历史耗时均衡分配到多个工作进程，并合并各进程的测试报告
+
+工作进程通过环境变量接收分配结果:
+    LIQUID_TEST_LIST: 用例清单文件（每行一个nodeid，按执行顺序排列），由 conftest 过滤并排序用例
+    LIQUID_WORKER_ID: 工作进程编号（从0开始）
+"""
+import heapq
+import html
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+import xml.etree.ElementTree as ET
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import yaml
+
+from core.config import config
+from core.history import HistoryStore, get_history_path, order_tests
+from core.logger import get_logger
+from core.perf import (
+    PERF_SUMMARY_NAME, PerfStats, baseline_failures, build_perf_summary, load_baselines, load_perf_summary,
+    log_perf_summary, perf_summary_html, write_perf_summary,
+)
+
+logger = get_logger(__name__)
+
+# 项目根目录
+BASE_DIR = Path(__file__).parent.parent
+
+# 没有历史耗时的用例使用的默认耗时（秒）
+DEFAULT_DURATION = 1.0
+
+TEST_LIST_ENV = 'LIQUID_TEST_LIST'
+WORKER_ID_ENV = 'LIQUID_WORKER_ID'
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """
+    解析分片参数
+
+    Args:
+        value: 形如 '2/4' 的字符串（第2个分片，共4个，从1开始计数）
+
+    Returns:
+        (分片序号（从0开始）, 分片总数)
+
+    Raises:
+        ValueError: 如果格式不正确
+    """
+    try:
+        index, total = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise ValueError(f"分片参数格式错误: {value}，应为 i/n，如 1/4")
+    if total < 1 or not 1 <= index <= total:
+        raise ValueError(f"分片参数超出范围: {value}，要求 1 <= i <= n")
+    return index - 1, total
+
+
+def collect_test_ids(pytest_args: Sequence[str]) -> List[str]:
+    """
+    收集用例nodeid（在子进程中执行 pytest --collect-only，避免污染当前进程）
+
+    Args:
+        pytest_args: 用例选择相关的pytest参数（测试路径、-m、-k等）
+
+    Returns:
+        nodeid列表（按pytest收集顺序）
+    """
+    cmd = [sys.executable, '-m', 'pytest', '--collect-only', '-q', '-p', 'no:cacheprovider', *pytest_args]
+    result = subprocess.run(cmd, cwd=BASE_DIR, capture_output=True, text=True, encoding='utf-8')
+    if result.returncode not in (0, 5):  # 5: 没有收集到用例
+        raise RuntimeError(f"用例收集失败（退出码 {result.returncode}）:\n{result.stdout[-2000:]}")
+
+    test_ids = []
+    seen = set()
+    for line in result.stdout.splitlines():
+        line = line.strip()
+        if '::' in line and not line.startswith(('=', '<')) and line not in seen:
+            seen.add(line)
+            test_ids.append(line)
+    return test_ids
+
+
+def _junit_key(nodeid: str) -> Tuple[str, str]:
+    """
+    将nodeid转换为JUnit中的 (classname, name)
+
+    testcase/test_user.py::TestUserApi::test_add[case0]
+    -> ('testcase.test_user.TestUserApi', 'test_add[case0]')
+    """
+    parts = nodeid.split('::')
+    module = parts[0][:-3] if parts[0].endswith('.py') else parts[0]
+    classname = '.'.join([module.replace('/', '.').replace('\\', '.')] + parts[1:-1])
+    return classname, parts[-1]
+
+
+def load_junit_durations(junit_file: Path) -> Dict[Tuple[str, str], float]:
+    """
+    从上一次的JUnit报告读取用例耗时
+
+    Args:
+        junit_file: JUnit XML文件路径
+
+    Returns:
+        {(classname, name): 耗时秒数}
+    """
+    durations: Dict[Tuple[str, str], float] = {}
+    if not junit_file.exists():
+        return durations
+    try:
+        root = ET.parse(junit_file).getroot()
+    except ET.ParseError as e:
+        logger.warning(f"历史JUnit报告解析失败，按默认耗时分配: {e}")
+        return durations
+    for case in root.iter('testcase'):
+        try:
+            durations[(case.get('classname', ''), case.get('name', ''))] = float(case.get('time', 0))
+        except ValueError:
+            continue
+    return durations
+
+
+def estimate_durations(test_ids: Sequence[str], junit_file: Path,
+                       history: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+    """
+    估算每个用例的耗时
+
+    优先使用历史数据库中最近几次的平均耗时，其次使用上一次JUnit报告中的耗时，
+    都没有记录的用例使用已知耗时的平均值或默认值
+
+    Args:
+        test_ids: 用例nodeid列表
+        junit_file: 上一次的JUnit XML文件
+        history: 历史数据库中的耗时 {nodeid: 平均耗时}
+
+    Returns:
+        {nodeid: 预估耗时}
+    """
+    history = history or {}
+    junit = load_junit_durations(junit_file)
+    known = {}
+    for nodeid in test_ids:
+        if nodeid in history:
+            known[nodeid] = history[nodeid]
+        elif _junit_key(nodeid) in junit:
+            known[nodeid] = junit[_junit_key(nodeid)]
+    default = sum(known.values()) / len(known) if known else DEFAULT_DURATION
+    return {nodeid: known.get(nodeid, default) for nodeid in test_ids}
+
+
+def partition(test_ids: Sequence[str], durations: Dict[str, float], buckets: int) -> List[List[str]]:
+    """
+    按耗时将用例均衡分配到多个分组（最长处理时间优先的贪心算法）
+
+    耗时来自本机的历史数据，只用于分配同一分片内的工作进程；CI分片见 shard_tests
+
+    Args:
+        test_ids: 用例nodeid列表
+        durations: {nodeid: 预估耗时}
+        buckets: 分组数量
+
+    Returns:
+        分组列表，每组内按耗时从长到短排列
+    """
+    groups: List[List[str]] = [[] for _ in range(buckets)]
+    heap = [(0.0, index) for index in range(buckets)]
+    ordered = sorted(test_ids, key=lambda nodeid: (-durations.get(nodeid, DEFAULT_DURATION), nodeid))
+    for nodeid in ordered:
+        load, index = heapq.heappop(heap)
+        groups[index].append(nodeid)
+        heapq.heappush(heap, (load + durations.get(nodeid, DEFAULT_DURATION), index))
+    return groups
+
+
+def shard_tests(test_ids: Sequence[str], index: int, total: int) -> List[str]:
+    """
+    选出属于指定CI分片的用例
+
+    按nodeid的稳定哈希（CRC32）分配，不依赖各节点本地的历史耗时，
+    收集到相同用例的节点得到互不重叠、合起来覆盖全部用例的分片
+
+    Args:
+        test_ids: 用例nodeid列表
+        index: 分片序号（从0开始）
+        total: 分片总数
+
+    Returns:
+        属于该分片的用例（保持原顺序）
+    """
+    return [nodeid for nodeid in test_ids if zlib.crc32(nodeid.encode('utf-8')) % total == index]
+
+
+def write_test_list(test_ids: Sequence[str], list_file: Path):
+    """写入用例清单文件（每行一个nodeid）"""
+    list_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(list_file, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(test_ids))
+
+
+def read_test_list(list_file: str) -> List[str]:
+    """读取用例清单文件"""
+    with open(list_file, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def merge_junit(junit_files: Sequence[Path], output_file: Path) -> Dict[str, float]:
+    """
+    合并多个JUnit报告
+
+    Args:
+        junit_files: 各工作进程的JUnit XML文件
+        output_file: 合并后的输出文件
+
+    Returns:
+        汇总统计 {tests, failures, errors, skipped, time}
+    """
+    merged = ET.Element('testsuites')
+    suite = ET.SubElement(merged, 'testsuite', name='pytest')
+    totals = {'tests': 0, 'failures': 0, 'errors': 0, 'skipped': 0, 'time': 0.0}
+
+    for junit_file in junit_files:
+        if not junit_file.exists():
+            logger.warning(f"工作进程JUnit报告不存在: {junit_file}")
+            continue
+        root = ET.parse(junit_file).getroot()
+        for source_suite in root.iter('testsuite'):
+            for key in ('tests', 'failures', 'errors', 'skipped'):
+                totals[key] += int(source_suite.get(key, 0))
+            # 各进程并行执行，总耗时取最长的进程
+            totals['time'] = max(totals['time'], float(source_suite.get('time', 0)))
+            for case in source_suite.iter('testcase'):
+                suite.append(case)
+
+    for key, value in totals.items():
+        suite.set(key, f"{value:.3f}" if key == 'time' else str(value))
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    ET.ElementTree(merged).write(output_file, encoding='utf-8', xml_declaration=True)
+    return totals
+
+
+def write_summary_html(junit_file: Path, output_file: Path, worker_reports: Sequence[Path],
+                       cache_stats: Optional[Dict[str, Any]] = None,
+                       perf_summary: Optional[Dict[str, Any]] = None):
+    """
+    根据合并后的JUnit报告生成汇总HTML报告
+
+    Args:
+        junit_file: 合并后的JUnit XML文件
+        output_file: HTML输出文件
+        worker_reports: 各工作进程的pytest-html报告（在汇总页中链接）
+        cache_stats: 合并后的响应缓存统计（未使用缓存时为None）
+        perf_summary: 合并后的接口性能汇总（没有请求时为None）
+    """
+    rows = []
+    counts = {'passed': 0, 'failed': 0, 'error': 0, 'skipped': 0}
+    for case in ET.parse(junit_file).getroot().iter('testcase'):
+        outcome, message = 'passed', ''
+        for tag, name in (('failure', 'failed'), ('error', 'error'), ('skipped', 'skipped')):
+            element = case.find(tag)
+            if element is not None:
+                outcome, message = name, element.get('message', '') or (element.text or '')
+                break
+        counts[outcome] += 1
+        rows.append(
+            f"<tr class='{outcome}'><td>{html.escape(case.get('classname', ''))}</td>"
+            f"<td>{html.escape(case.get('name', ''))}</td><td>{outcome}</td>"
+            f"<td>{float(case.get('time', 0)):.3f}</td>"
+            f"<td><pre>{html.escape(message[:1000])}</pre></td></tr>"
+        )
+
+    links = ''.join(
+        f"<li><a href='{html.escape(os.path.relpath(report, output_file.parent))}'>{html.escape(report.name)}</a></li>"
+        for report in worker_reports if report.exists()
+    )
+    summary = ', '.join(f"{name}: {count}" for name, count in counts.items())
+    cache_summary = ''
+    if cache_stats:
+        cache_summary = (
+            f"<p>响应缓存: 命中 {cache_stats['hits']}, 未命中 {cache_stats['misses']}, "
+            f"命中率 {cache_stats['hit_rate']:.1%}</p>"
+        )
+    content = f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>测试报告（并行执行汇总）</title>
+<style>
+body {{ font-family: sans-serif; margin: 20px; }}
+table {{ border-collapse: collapse; width: 100%; }}
+th, td {{ border: 1px solid #ddd; padding: 4px 8px; text-align: left; vertical-align: top; }}
+pre {{ margin: 0; white-space: pre-wrap; }}
+tr.failed, tr.error {{ background: #fdecea; }}
+tr.skipped {{ background: #fff8e1; }}
+</style></head><body>
+<h1>测试报告（并行执行汇总）</h1>
+<p>{summary}</p>
+{cache_summary}
+{perf_summary_html(perf_summary) if perf_summary else ''}
+<h2>各工作进程详细报告</h2><ul>{links}</ul>
+<h2>用例结果</h2>
+<table><tr><th>类</th><th>用例</th><th>结果</th><th>耗时(s)</th><th>信息</th></tr>
+{''.join(rows)}
+</table></body></html>
+"""
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+def merge_pool_stats(stats_files: Sequence[Path], output_file: Path):
+    """合并各工作进程的连接池统计"""
+    merged = {'opened': 0, 'reused': 0, 'discarded': 0}
+    for stats_file in stats_files:
+        if not stats_file.exists():
+            continue
+        with open(stats_file, 'r', encoding='utf-8') as f:
+            stats = json.load(f)
+        for key in merged:
+            merged[key] += stats.get(key, 0)
+    total = merged['opened'] + merged['reused']
+    merged['reuse_rate'] = round(merged['reused'] / total, 4) if total else 0.0
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(merged, f, ensure_ascii=False, indent=2)
+
+
+def merge_cache_stats(stats_files: Sequence[Path], output_file: Path) -> Optional[Dict[str, Any]]:
+    """
+    合并各工作进程的响应缓存统计
+
+    Returns:
+        合并后的统计，所有进程都未使用缓存时返回None（不写入文件）
+    """
+    merged: Dict[str, Any] = {}
+    for stats_file in stats_files:
+        if not stats_file.exists():
+            continue
+        with open(stats_file, 'r', encoding='utf-8') as f:
+            stats = json.load(f)
+        for key, value in stats.items():
+            if key != 'hit_rate':
+                merged[key] = merged.get(key, 0) + value
+    if not merged:
+        return None
+    lookups = merged.get('hits', 0) + merged.get('misses', 0)
+    merged['hit_rate'] = round(merged.get('hits', 0) / lookups, 4) if lookups else 0.0
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(merged, f, ensure_ascii=False, indent=2)
+    return merged
+
+
+def merge_perf_summary(stats_files: Sequence[Path], output_file: Path,
+                       settings: Optional[Dict[str, Any]] = None,
+                       baselines: Sequence[Dict[str, Any]] = ()) -> Optional[Dict[str, Any]]:
+    """
+    合并各工作进程的接口性能统计，与上一次运行（output_file 原有内容）对比 p95 并检查性能基线
+
+    Returns:
+        合并后的性能汇总，所有进程都没有请求时返回None（不写入文件）
+    """
+    stats = PerfStats()
+    for stats_file in stats_files:
+        summary = load_perf_summary(stats_file)
+        if summary:
+            stats.merge_summary(summary)
+    if not stats.requests:
+        return None
+    summary = build_perf_summary(stats, load_perf_summary(output_file), settings, baselines)
+    write_perf_summary(summary, output_file)
+    log_perf_summary(summary)
+    return summary
+
+
+def _combine_exit_codes(codes: Sequence[int]) -> int:
+    """合并各工作进程的退出码（5表示没有用例，不视为失败）"""
+    failures = [code for code in codes if code not in (0, 5)]
+    if failures:
+        return max(failures)
+    return 0 if 0 in codes else 5
+
+
+def run_parallel(
+    pytest_args: Sequence[str],
+    report_dir: Path,
+    allure_results_dir: Path,
+    workers: int = 1,
+    shard: Optional[Tuple[int, int]] = None,
+    failed_first: bool = False,
+) -> int:
+    """
+    并行执行用例并合并报告
+
+    Args:
+        pytest_args: 用例选择及输出相关的pytest参数（不含报告参数）
+        report_dir: 报告目录
+        allure_results_dir: Allure结果目录（各工作进程共享）
+        workers: 工作进程数
+        shard: 分片 (分片序号（从0开始）, 分片总数)，None表示不分片
+        failed_first: 各工作进程内最近失败的用例优先执行
+
+    Returns:
+        合并后的退出码（用例都通过但性能基线未通过时为1）
+    """
+    test_ids = collect_test_ids([arg for arg in pytest_args if arg not in ('-q', '-v')])
+    with HistoryStore(get_history_path(report_dir)) as store:
+        durations = estimate_durations(test_ids, report_dir / 'junit.xml', store.get_durations(test_ids))
+        failures = store.get_recent_failures() if failed_first else []
+
+    if shard is not None:
+        index, total = shard
+        test_ids = shard_tests(test_ids, index, total)
+        logger.info(f"分片 {index + 1}/{total}: 分配到 {len(test_ids)} 个用例")
+
+    if not test_ids:
+        logger.warning("没有需要执行的用例")
+        return 5
+
+    workers = max(1, min(workers, len(test_ids)))
+    groups = [order_tests(group, durations, failures) for group in partition(test_ids, durations, workers)]
+    worker_dir = report_dir / 'workers'
+    shutil.rmtree(worker_dir, ignore_errors=True)  # 清理上一次执行的工作进程文件
+    worker_dir.mkdir(parents=True, exist_ok=True)
+
+    processes = []
+    for worker_id, group in enumerate(groups):
+        list_file = worker_dir / f'tests_{worker_id}.txt'
+        write_test_list(group, list_file)
+        env = dict(os.environ, **{TEST_LIST_ENV: str(list_file), WORKER_ID_ENV: str(worker_id)})
+        cmd = [
+            sys.executable, '-m', 'pytest', *pytest_args,
+            '--html', str(worker_dir / f'report_{worker_id}.html'),
+            '--self-contained-html',
+            '--junit-xml', str(worker_dir / f'junit_{worker_id}.xml'),
+            '--alluredir', str(allure_results_dir),
+        ]
+        log_file = open(worker_dir / f'worker_{worker_id}.log', 'w', encoding='utf-8')
+        estimate = sum(durations[nodeid] for nodeid in group)
+        logger.info(f"启动工作进程 {worker_id}: {len(group)} 个用例，预估耗时 {estimate:.1f}s")
+        processes.append((
+            worker_id,
+            subprocess.Popen(cmd, cwd=BASE_DIR, env=env, stdout=log_file, stderr=subprocess.STDOUT),
+            log_file,
+        ))
+
+    start = time.perf_counter()
+    codes = []
+    for worker_id, process, log_file in processes:
+        code = process.wait()
+        log_file.close()
+        codes.append(code)
+        logger.info(f"工作进程 {worker_id} 结束，退出码 {code}（日志: {log_file.name}）")
+    logger.info(f"并行执行完成，总耗时 {time.perf_counter() - start:.1f}s")
+
+    # 合并报告
+    worker_ids = range(len(groups))
+    totals = merge_junit([worker_dir / f'junit_{i}.xml' for i in worker_ids], report_dir / 'junit.xml')
+    merge_pool_stats([worker_dir / f'pool_stats_{i}.json' for i in worker_ids], report_dir / 'pool_stats.json')
+    cache_stats = merge_cache_stats(
+        [worker_dir / f'cache_stats_{i}.json' for i in worker_ids], report_dir / 'cache_stats.json'
+    )
+    perf_settings = config.get_report_perf_config()
+    try:
+        baselines = load_baselines(perf_settings['baselines'])
+    except (OSError, ValueError, yaml.YAMLError) as e:
+        logger.error(f"性能基线读取失败，跳过检查: {e}")
+        baselines = []
+    perf_summary = merge_perf_summary(
+        [worker_dir / f'{PERF_SUMMARY_NAME}_{i}.json' for i in worker_ids],
+        report_dir / f'{PERF_SUMMARY_NAME}.json',
+        perf_settings,
+        baselines,
+    )
+    write_summary_html(
+        report_dir / 'junit.xml',
+        report_dir / 'report.html',
+        [worker_dir / f'report_{i}.html' for i in worker_ids],
+        cache_stats,
+        perf_summary,
+    )
+    logger.info(
+        f"合并结果: 共 {totals['tests']} 个用例, 失败 {totals['failures']}, "
+        f"错误 {totals['errors']}, 跳过 {totals['skipped']}"
+    )
+    exit_code = _combine_exit_codes(codes)
+    if baseline_failures(perf_summary) and exit_code == 0:
+        exit_code = 1
+    return exit_code
@@ -0,0 +1,377 @@
+"""
+接口性能汇总
+会话期间按接口（方法 + 路由模板）把每次请求（含每次重试）的耗时记入延迟直方图，会话结束时写入
+report/perf_summary.json 并在 HTML 报告中增加接口性能表格（请求数、mean、p50/p95/p99、max、错误率）
+
+写入前读取上一次运行的 perf_summary.json，两次样本数都不少于 report.perf.min_samples 且
+p95 增幅超过 report.perf.regression_threshold（并且超过 min_delta_ms 毫秒）的接口标记为性能退化。
+perf_summary.json 中保存了各接口的直方图，并行执行时各工作进程的结果可直接合并
+
+config/perf_baselines.yaml 声明各接口的性能基线（如 "样本不少于50个时 p95 不超过150ms"），
+在全部用例结束后根据本次运行的统计检查，不满足时测试以失败退出；样本不足的接口跳过检查，
+避免单次请求耗时波动导致用例失败
+"""
+import html
+import json
+import re
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Pattern, Sequence, Tuple
+from urllib.parse import urlsplit
+
+import yaml
+
+from core.histogram import LatencyHistogram
+from core.logger import get_logger
+from core.metrics import error_label
+
+logger = get_logger(__name__)
+
+# 性能汇总文件名（位于报告目录下，并行执行时各工作进程写入 workers/perf_summary_{worker_id}.json）
+PERF_SUMMARY_NAME = 'perf_summary'
+
+PERCENTS = (50, 95, 99)
+
+# 默认性能基线文件
+DEFAULT_BASELINE_FILE = Path(__file__).parent.parent / 'config' / 'perf_baselines.yaml'
+
+# 性能基线中可配置的延迟上限（毫秒）
+BASELINE_LATENCY_KEYS = ('p50', 'p95', 'p99', 'mean', 'max')
+
+# 未匹配路由模板时替换为 {id} 的路径段: 纯数字、UUID、长十六进制串（如 ObjectId）
+_ID_SEGMENT = re.compile(
+    r'^(\d+|[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}|[0-9a-fA-F]{24,})$'
+)
+
+
+def compile_routes(templates: Iterable[str]) -> List[Tuple[str, Pattern]]:
+    """
+    编译路由模板
+
+    Args:
+        templates: 路由模板，如 /api/user/{user_id}（{...} 匹配一个路径段）
+
+    Returns:
+        [(模板, 正则)]
+    """
+    routes = []
+    for template in templates:
+        parts = re.split(r'(\{[^/{}]+\})', template)
+        pattern = ''.join('[^/]+' if part.startswith('{') else re.escape(part) for part in parts)
+        routes.append((template, re.compile(f'^{pattern}/?$')))
+    return routes
+
+
+def route_template(path: str, routes: Sequence[Tuple[str, Pattern]] = ()) -> str:
+    """
+    请求路径对应的路由模板
+
+    优先匹配配置的路由模板；未匹配时把数字、UUID 等ID路径段替换为 {id}（/api/order/123 -> /api/order/{id}）
+    """
+    for template, pattern in routes:
+        if pattern.match(path):
+            return template
+    return '/'.join('{id}' if _ID_SEGMENT.match(segment) else segment for segment in path.split('/')) or '/'
+
+
+class PerfStats:
+    """
+    按接口统计的请求耗时
+
+    on_request 作为 core.metrics 监听器注册，可被多个线程同时调用
+    """
+
+    def __init__(self, routes: Iterable[str] = ()):
+        """
+        Args:
+            routes: 路由模板（见 compile_routes）
+        """
+        self.routes = compile_routes(routes)
+        # 接口（方法 + 路由模板） -> 延迟直方图 / 错误数
+        self.latency: Dict[str, LatencyHistogram] = {}
+        self.errors: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def endpoint(self, method: str, url: str) -> str:
+        """接口名称: 方法 + 路由模板"""
+        return f"{method.upper()} {route_template(urlsplit(url).path, self.routes)}"
+
+    def on_request(self, record: Dict[str, Any]):
+        """请求指标监听器"""
+        endpoint = self.endpoint(record['method'], record['url'])
+        failed = error_label(record) is not None
+        with self._lock:
+            histogram = self.latency.get(endpoint)
+            if histogram is None:
+                histogram = self.latency[endpoint] = LatencyHistogram()
+                self.errors[endpoint] = 0
+            histogram.record(record['elapsed'])
+            if failed:
+                self.errors[endpoint] += 1
+
+    def merge_summary(self, summary: Dict[str, Any]):
+        """合并 perf_summary.json 中的接口统计（并行执行时合并各工作进程的结果）"""
+        with self._lock:
+            for row in summary.get('endpoints', []):
+                histogram = LatencyHistogram.from_dict(row['histogram'])
+                endpoint = row['endpoint']
+                if endpoint in self.latency:
+                    self.latency[endpoint].merge(histogram)
+                    self.errors[endpoint] += row.get('errors', 0)
+                else:
+                    self.latency[endpoint] = histogram
+                    self.errors[endpoint] = row.get('errors', 0)
+
+    @property
+    def requests(self) -> int:
+        """请求总数"""
+        return sum(histogram.count for histogram in self.latency.values())
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """按 p95 从高到低排列的接口统计（毫秒）"""
+        with self._lock:
+            items = [(endpoint, histogram, self.errors[endpoint]) for endpoint, histogram in self.latency.items()]
+        rows = []
+        for endpoint, histogram, errors in items:
+            row = {'endpoint': endpoint, **histogram.summary(PERCENTS)}
+            row['errors'] = errors
+            row['error_rate'] = round(errors / histogram.count, 4)
+            row['histogram'] = histogram.to_dict()
+            rows.append(row)
+        rows.sort(key=lambda row: row['p95'], reverse=True)
+        return rows
+
+
+def find_regressions(rows: List[Dict[str, Any]], previous: Dict[str, Any], threshold: float,
+                     min_samples: int = 0, min_delta_ms: float = 0) -> List[Dict[str, Any]]:
+    """
+    与上一次运行对比 p95
+
+    两次运行中都存在的接口写入 previous_p95；样本数都不少于 min_samples，且 p95 增加超过
+    上一次的 threshold 倍和 min_delta_ms 毫秒时标记 regressed
+
+    Returns:
+        性能退化的接口 [{endpoint, previous_p95, p95, change}]
+    """
+    previous_rows = {row['endpoint']: row for row in previous.get('endpoints', [])}
+    regressions = []
+    for row in rows:
+        before = previous_rows.get(row['endpoint'])
+        if before is None or before.get('p95') is None:
+            continue
+        row['previous_p95'] = before['p95']
+        if row['count'] < min_samples or before.get('count', 0) < min_samples:
+            continue
+        delta = row['p95'] - before['p95']
+        if delta > max(before['p95'] * threshold, min_delta_ms):
+            row['regressed'] = True
+            regressions.append({
+                'endpoint': row['endpoint'],
+                'previous_p95': before['p95'],
+                'p95': row['p95'],
+                'change': round(delta / before['p95'], 4) if before['p95'] else None,
+            })
+    return regressions
+
+
+def load_baselines(baseline_file: Optional[Path] = None) -> List[Dict[str, Any]]:
+    """
+    读取性能基线文件
+
+    defaults 中的配置（如 min_samples）合并到每条基线，基线自身的配置优先
+
+    Args:
+        baseline_file: 基线文件路径（默认 config/perf_baselines.yaml）
+
+    Returns:
+        基线列表 [{endpoint, min_samples, p95, ...}]，文件不存在时为空列表
+
+    Raises:
+        ValueError: 如果基线定义无效
+    """
+    baseline_file = Path(baseline_file or DEFAULT_BASELINE_FILE)
+    if not baseline_file.exists():
+        return []
+    with open(baseline_file, 'r', encoding='utf-8') as f:
+        data = yaml.safe_load(f) or {}
+    defaults = data.get('defaults') or {}
+    baselines = []
+    for definition in data.get('baselines') or []:
+        method, _, path = str(definition.get('endpoint', '')).strip().partition(' ')
+        if not method or not path.strip():
+            raise ValueError(f"性能基线的 endpoint 无效: {definition.get('endpoint')}（格式 <方法> <路由模板>）")
+        baseline = {**defaults, **definition}
+        baseline['endpoint'] = f"{method.upper()} {path.strip()}"
+        baselines.append(baseline)
+    return baselines
+
+
+def _check_baseline(row: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    violations = []
+    for key, limit in baseline.items():
+        if key in ('endpoint', 'min_samples'):
+            continue
+        if key == 'max_error_rate':
+            if row['error_rate'] > limit:
+                violations.append(f"错误率 {row['error_rate']:.2%} 超过基线 {limit:.2%}")
+        elif key in BASELINE_LATENCY_KEYS:
+            actual = row.get(key)
+            if actual is not None and actual > limit:
+                violations.append(f"{key} 延迟 {actual:.1f}ms 超过基线 {limit}ms")
+        else:
+            violations.append(f"未知的基线配置: {key}")
+    return violations
+
+
+def check_baselines(rows: List[Dict[str, Any]], baselines: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    检查接口统计是否满足性能基线
+
+    Args:
+        rows: 接口统计（PerfStats.rows()）
+        baselines: 性能基线（load_baselines() 的结果）
+
+    Returns:
+        [{endpoint, count, status, violations}]，status: passed / failed / skipped（样本数少于 min_samples）
+    """
+    rows_by_endpoint = {row['endpoint']: row for row in rows}
+    results = []
+    for baseline in baselines:
+        row = rows_by_endpoint.get(baseline['endpoint'])
+        count = row['count'] if row else 0
+        result = {'endpoint': baseline['endpoint'], 'count': count, 'status': 'skipped', 'violations': []}
+        if row is not None and count >= baseline.get('min_samples', 1):
+            result['violations'] = _check_baseline(row, baseline)
+            result['status'] = 'failed' if result['violations'] else 'passed'
+        results.append(result)
+    return results
+
+
+def baseline_failures(summary: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """性能汇总中未通过的性能基线"""
+    if not summary:
+        return []
+    return [result for result in summary.get('baselines', []) if result['status'] == 'failed']
+
+
+def build_perf_summary(stats: PerfStats, previous: Optional[Dict[str, Any]] = None,
+                       settings: Optional[Dict[str, Any]] = None,
+                       baselines: Sequence[Dict[str, Any]] = ()) -> Dict[str, Any]:
+    """
+    生成性能汇总
+
+    Args:
+        stats: 本次运行的接口统计
+        previous: 上一次运行的性能汇总（不对比时为None）
+        settings: 对比配置（regression_threshold、min_samples、min_delta_ms，见 report.perf）
+        baselines: 性能基线（不检查时为空）
+
+    Returns:
+        {generated_at, requests, endpoints, previous, regressions, baselines}
+    """
+    settings = settings or {}
+    rows = stats.rows()
+    regressions = []
+    if previous:
+        regressions = find_regressions(
+            rows, previous,
+            threshold=settings.get('regression_threshold', 0.2),
+            min_samples=settings.get('min_samples', 0),
+            min_delta_ms=settings.get('min_delta_ms', 0),
+        )
+    return {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'requests': stats.requests,
+        'endpoints': rows,
+        'previous': previous.get('generated_at') if previous else None,
+        'regressions': regressions,
+        'baselines': check_baselines(rows, baselines),
+    }
+
+
+def load_perf_summary(path: Path) -> Optional[Dict[str, Any]]:
+    """读取性能汇总文件（不存在或无法解析时返回None）"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            summary = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"性能汇总读取失败: {path}: {e}")
+        return None
+    return summary if isinstance(summary, dict) else None
+
+
+def write_perf_summary(summary: Dict[str, Any], path: Path):
+    """写入性能汇总文件"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+
+
+def log_perf_summary(summary: Dict[str, Any], top: int = 5):
+    """输出性能汇总（p95 最高的接口、性能退化的接口和性能基线检查结果）"""
+    rows = summary['endpoints']
+    logger.info(f"接口性能: {len(rows)} 个接口, 请求 {summary['requests']} 次")
+    for row in rows[:top]:
+        logger.info(
+            f"  {row['endpoint']}: 请求 {row['count']}, 错误率 {row['error_rate']:.2%}, "
+            f"mean {row['mean']}ms, p95 {row['p95']}ms, p99 {row['p99']}ms, max {row['max']}ms"
+        )
+    for regression in summary['regressions']:
+        change = f" (+{regression['change']:.0%})" if regression['change'] is not None else ''
+        logger.warning(
+            f"性能退化: {regression['endpoint']} p95 {regression['previous_p95']}ms -> {regression['p95']}ms{change}"
+        )
+
+    results = summary.get('baselines', [])
+    if not results:
+        return
+    counts = {status: sum(1 for result in results if result['status'] == status)
+              for status in ('passed', 'failed', 'skipped')}
+    logger.info(f"性能基线: 通过 {counts['passed']}, 未通过 {counts['failed']}, 样本不足跳过 {counts['skipped']}")
+    for result in results:
+        if result['status'] == 'failed':
+            for violation in result['violations']:
+                logger.error(f"性能基线未通过: {result['endpoint']} {violation}（样本 {result['count']}）")
+        elif result['status'] == 'skipped':
+            logger.info(f"  样本不足，跳过: {result['endpoint']}（样本 {result['count']}）")
+
+
+def perf_summary_html(summary: Dict[str, Any]) -> str:
+    """HTML报告中的接口性能表格（毫秒）和性能基线检查结果，性能退化和未通过基线的接口标红"""
+    rows = []
+    for row in summary['endpoints']:
+        style = " style='background: #fdecea'" if row.get('regressed') else ''
+        previous = row.get('previous_p95')
+        rows.append(
+            f"<tr{style}><td>{html.escape(row['endpoint'])}</td><td>{row['count']}</td>"
+            f"<td>{row['mean']}</td><td>{row['p50']}</td><td>{row['p95']}</td><td>{row['p99']}</td>"
+            f"<td>{row['max']}</td><td>{row['error_rate']:.2%}</td>"
+            f"<td>{previous if previous is not None else '-'}</td></tr>"
+        )
+    regressions = summary['regressions']
+    note = f"<p>p95 性能退化的接口: {len(regressions)} 个</p>" if regressions else ''
+    content = (
+        f"<h2>接口性能</h2>{note}"
+        "<table><tr><th>接口</th><th>请求数</th><th>mean(ms)</th><th>p50(ms)</th><th>p95(ms)</th>"
+        "<th>p99(ms)</th><th>max(ms)</th><th>错误率</th><th>上次 p95(ms)</th></tr>"
+        f"{''.join(rows)}</table>"
+    )
+
+    results = summary.get('baselines', [])
+    if results:
+        labels = {'passed': '通过', 'failed': '未通过', 'skipped': '样本不足，跳过'}
+        failed_style = " style='background: #fdecea'"
+        baseline_rows = ''.join(
+            f"<tr{failed_style if result['status'] == 'failed' else ''}>"
+            f"<td>{html.escape(result['endpoint'])}</td><td>{result['count']}</td>"
+            f"<td>{labels[result['status']]}</td><td>{html.escape('; '.join(result['violations']))}</td></tr>"
+            for result in results
+        )
+        content += (
+            "<h2>性能基线</h2><table><tr><th>接口</th><th>样本数</th><th>结果</th><th>说明</th></tr>"
+            f"{baseline_rows}</table>"
+        )
+    return content
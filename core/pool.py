@@ -0,0 +1,200 @@
+"""
+连接池管理模块
+提供可配置的HTTP连接池、空闲连接保活控制以及连接池统计
+"""
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from core.timing import TimedHTTPConnection, TimedHTTPSConnection
+
+
+class PoolStats:
+    """
+    连接池统计
+
+    统计本次运行中连接的新建、复用与丢弃次数（线程安全）
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.opened = 0      # 新建连接次数（需要进行TCP/TLS握手）
+        self.reused = 0      # 复用已建立连接的次数
+        self.discarded = 0   # 因连接池已满或空闲超时被丢弃的连接数
+
+    def incr(self, field: str, count: int = 1):
+        """累加指定统计项"""
+        with self._lock:
+            setattr(self, field, getattr(self, field) + count)
+
+    def reset(self):
+        """清空统计"""
+        with self._lock:
+            self.opened = self.reused = self.discarded = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        """转换为字典"""
+        with self._lock:
+            total = self.opened + self.reused
+            return {
+                "opened": self.opened,
+                "reused": self.reused,
+                "discarded": self.discarded,
+                "reuse_rate": round(self.reused / total, 4) if total else 0.0,
+            }
+
+
+# 全局连接池统计（整个测试运行共享）
+pool_stats = PoolStats()
+
+
+class _StatsPoolMixin:
+    """
+    为urllib3连接池增加统计与空闲保活控制
+
+    - 取出连接时：若连接空闲超过 keepalive_timeout 则关闭并计为丢弃
+    - 取出连接时：已建立的连接计为复用，未建立的连接计为新建
+    - 归还连接时：若连接池已满则计为丢弃
+    """
+
+    keepalive_timeout: Optional[float] = None
+
+    def _get_conn(self, timeout=None):
+        conn = super()._get_conn(timeout=timeout)
+        last_used = getattr(conn, '_liquid_last_used', None)
+
+        if (
+            self.keepalive_timeout is not None
+            and last_used is not None
+            and getattr(conn, 'sock', None) is not None
+            and time.monotonic() - last_used > self.keepalive_timeout
+        ):
+            conn.close()
+            pool_stats.incr('discarded')
+
+        if getattr(conn, 'sock', None) is None:
+            pool_stats.incr('opened')
+        else:
+            pool_stats.incr('reused')
+        return conn
+
+    def _put_conn(self, conn):
+        if conn is not None:
+            conn._liquid_last_used = time.monotonic()
+            if self.pool is not None and self.pool.full():
+                pool_stats.incr('discarded')
+        super()._put_conn(conn)
+
+
+class StatsHTTPConnectionPool(_StatsPoolMixin, HTTPConnectionPool):
+    """带统计的HTTP连接池（连接记录阶段耗时，见 core.timing）"""
+
+    ConnectionCls = TimedHTTPConnection
+
+
+class StatsHTTPSConnectionPool(_StatsPoolMixin, HTTPSConnectionPool):
+    """带统计的HTTPS连接池（连接记录阶段耗时，见 core.timing）"""
+
+    ConnectionCls = TimedHTTPSConnection
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """
+    可配置的连接池适配器
+
+    在requests默认适配器的基础上支持空闲连接保活时间与连接池统计。
+    共享适配器（shared=True）会被多个HttpClient复用，单个客户端关闭时不会清空连接池。
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+        keepalive_timeout: Optional[float] = None,
+        shared: bool = False,
+    ):
+        """
+        初始化连接池适配器
+
+        Args:
+            pool_connections: 缓存的连接池数量（即主机数）
+            pool_maxsize: 每个主机连接池的最大连接数
+            pool_block: 连接池满时是否阻塞等待空闲连接
+            keepalive_timeout: 空闲连接保活时间（秒），None表示不限制
+            shared: 是否为多个客户端共享的适配器
+        """
+        self.keepalive_timeout = keepalive_timeout
+        self.shared = shared
+        super().__init__(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+        )
+
+    def init_poolmanager(self, *args, **kwargs):
+        """创建PoolManager，并替换为带统计的连接池类"""
+        super().init_poolmanager(*args, **kwargs)
+        keepalive_timeout = self.keepalive_timeout
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': type('HTTPConnectionPool', (StatsHTTPConnectionPool,),
+                         {'keepalive_timeout': keepalive_timeout}),
+            'https': type('HTTPSConnectionPool', (StatsHTTPSConnectionPool,),
+                          {'keepalive_timeout': keepalive_timeout}),
+        }
+
+    def close(self):
+        """关闭适配器（共享适配器由 close_shared_adapters 统一关闭）"""
+        if self.shared:
+            return
+        super().close()
+
+
+_shared_adapters: Dict[Tuple, PooledHTTPAdapter] = {}
+_shared_lock = threading.Lock()
+
+
+def get_shared_adapter(
+    pool_connections: int = 10,
+    pool_maxsize: int = 10,
+    pool_block: bool = False,
+    keepalive_timeout: Optional[float] = None,
+) -> PooledHTTPAdapter:
+    """
+    获取共享的连接池适配器
+
+    相同配置的HttpClient复用同一个适配器，使连接可以跨用例复用，
+    避免每个用例新建Session都重新握手
+
+    Returns:
+        PooledHTTPAdapter对象
+    """
+    key = (pool_connections, pool_maxsize, pool_block, keepalive_timeout)
+    with _shared_lock:
+        adapter = _shared_adapters.get(key)
+        if adapter is None:
+            adapter = PooledHTTPAdapter(
+                pool_connections=pool_connections,
+                pool_maxsize=pool_maxsize,
+                pool_block=pool_block,
+                keepalive_timeout=keepalive_timeout,
+                shared=True,
+            )
+            _shared_adapters[key] = adapter
+        return adapter
+
+
+def close_shared_adapters():
+    """关闭所有共享适配器，释放连接"""
+    with _shared_lock:
+        for adapter in _shared_adapters.values():
+            HTTPAdapter.close(adapter)
+        _shared_adapters.clear()
+
+
+def get_pool_stats() -> Dict[str, int]:
+    """获取本次运行的连接池统计"""
+    return pool_stats.to_dict()
@@ -0,0 +1,256 @@
+"""
+请求重试与熔断模块
+RetryPolicy: 按状态码 / 异常类型重试，指数退避 + 随机抖动，默认只重试幂等方法
+CircuitBreaker: 按主机统计连续失败，后端明显不可用时直接失败，不再逐个等待超时
+"""
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Iterable, Optional, Tuple, Type
+
+import requests
+
+from core.deadline import DeadlineExceeded
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 幂等方法（重复发送不会产生额外副作用）
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE', 'TRACE')
+
+DEFAULT_RETRY_STATUSES = (502, 503, 504)
+DEFAULT_RETRY_EXCEPTIONS = ('Timeout', 'ConnectionError', 'ChunkedEncodingError')
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """熔断器打开，请求未发送直接失败"""
+
+
+def _resolve_exceptions(names: Iterable[str]) -> Tuple[Type[BaseException], ...]:
+    """将异常名称（requests.exceptions 中的类名）转换为异常类"""
+    classes = []
+    for name in names:
+        cls = getattr(requests.exceptions, name, None)
+        if not (isinstance(cls, type) and issubclass(cls, BaseException)):
+            raise ValueError(f"未知的重试异常类型: {name}（应为 requests.exceptions 中的异常类名）")
+        classes.append(cls)
+    return tuple(classes)
+
+
+class RetryPolicy:
+    """
+    重试策略
+
+    第 n 次重试前等待 random(0, min(backoff_max, backoff_base * 2^n)) 秒（全抖动），
+    多个客户端同时失败时不会在同一时刻集中重试；响应带 Retry-After 头时以其为准（不超过 backoff_max）
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 2,
+        backoff_base: float = 0.2,
+        backoff_max: float = 5.0,
+        statuses: Iterable[int] = DEFAULT_RETRY_STATUSES,
+        exceptions: Iterable[str] = DEFAULT_RETRY_EXCEPTIONS,
+        methods: Iterable[str] = IDEMPOTENT_METHODS,
+    ):
+        """
+        初始化重试策略
+
+        Args:
+            max_retries: 最大重试次数（0表示不重试）
+            backoff_base: 退避基数（秒）
+            backoff_max: 单次等待上限（秒）
+            statuses: 需要重试的响应状态码
+            exceptions: 需要重试的异常类型（requests.exceptions 中的类名）
+            methods: 允许重试的请求方法（默认只包含幂等方法）
+        """
+        self.max_retries = max(0, int(max_retries))
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.statuses = frozenset(statuses)
+        self.exceptions = _resolve_exceptions(exceptions)
+        self.methods = frozenset(method.upper() for method in methods)
+
+    @classmethod
+    def from_config(cls, settings: Optional[Dict[str, Any]]) -> 'RetryPolicy':
+        """根据配置（api.retry）创建重试策略"""
+        return cls(**(settings or {}))
+
+    def _allowed(self, method: str, attempt: int) -> bool:
+        return attempt < self.max_retries and method.upper() in self.methods
+
+    def should_retry_status(self, method: str, status_code: int, attempt: int) -> bool:
+        """
+        响应状态码是否需要重试
+
+        Args:
+            method: 请求方法
+            status_code: 响应状态码
+            attempt: 已重试次数
+        """
+        return status_code in self.statuses and self._allowed(method, attempt)
+
+    def should_retry_exception(self, method: str, error: BaseException, attempt: int) -> bool:
+        """请求异常是否需要重试（熔断器打开或截止时间已到时不重试）"""
+        if isinstance(error, (CircuitOpenError, DeadlineExceeded)):
+            return False
+        return isinstance(error, self.exceptions) and self._allowed(method, attempt)
+
+    def backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """
+        计算第 attempt 次重试前的等待时间（秒）
+
+        Args:
+            attempt: 已重试次数（从0开始）
+            retry_after: 响应的 Retry-After 头（秒数或HTTP日期）
+        """
+        if retry_after:
+            seconds = _parse_retry_after(retry_after)
+            if seconds is not None:
+                return min(seconds, self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+
+def _parse_retry_after(value: str) -> Optional[float]:
+    """解析 Retry-After 头，无法解析时返回None"""
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    """
+    熔断器（每个主机一个，所有客户端共享）
+
+    状态:
+        closed: 正常放行，连续失败达到 failure_threshold 次后打开
+        open: 直接拒绝请求，recovery_timeout 秒后进入半开
+        half_open: 只放行一个探测请求，成功则关闭，失败则重新打开；
+                   探测请求没有结果就结束（截止时间到期、被取消）时调用 release()，放行下一个探测请求
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, host: str, failure_threshold: int = 5, recovery_timeout: float = 30.0,
+                 failure_statuses: Iterable[int] = DEFAULT_RETRY_STATUSES):
+        """
+        初始化熔断器
+
+        Args:
+            host: 主机（host:port）
+            failure_threshold: 连续失败多少次后打开
+            recovery_timeout: 打开后多少秒进入半开状态
+            failure_statuses: 视为失败的响应状态码（网关类错误表示后端不可用）
+        """
+        self.host = host
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.recovery_timeout = recovery_timeout
+        self.failure_statuses = frozenset(failure_statuses)
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """是否放行本次请求"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.recovery_timeout:
+                    return False
+                self.state = self.HALF_OPEN
+                self._probing = False
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def release(self):
+        """
+        请求结束（客户端在每次请求后调用，已调用 record_* 时无影响）
+
+        半开状态的探测请求未记录成功或失败就结束时，允许下一个请求探测，避免熔断器一直拒绝请求
+        """
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._probing = False
+
+    def retry_in(self) -> float:
+        """距离进入半开状态的剩余秒数"""
+        return max(0.0, self.recovery_timeout - (time.monotonic() - self._opened_at))
+
+    def record_success(self):
+        """记录一次成功"""
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info(f"熔断器关闭: {self.host} 已恢复")
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        """记录一次失败"""
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self.failures >= self.failure_threshold):
+                logger.warning(
+                    f"熔断器打开: {self.host} 连续失败 {self.failures} 次，"
+                    f"{self.recovery_timeout:g}s 内的请求将直接失败"
+                )
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+    def record_response(self, status_code: int):
+        """根据响应状态码记录成功或失败"""
+        if status_code in self.failure_statuses:
+            self.record_failure()
+        else:
+            self.record_success()
+
+    def reject(self) -> CircuitOpenError:
+        """生成熔断拒绝异常"""
+        return CircuitOpenError(f"熔断器已打开: {self.host}，{self.retry_in():.1f}s 后重试")
+
+
+_breakers: Dict[Tuple, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(host: str, enabled: bool = True, **settings) -> Optional[CircuitBreaker]:
+    """
+    获取主机对应的熔断器（相同主机、相同配置的客户端共享同一个熔断器）
+
+    Args:
+        host: 主机（host:port）
+        enabled: 是否启用熔断（False时返回None）
+        **settings: CircuitBreaker 的其他参数（failure_threshold、recovery_timeout、failure_statuses）
+
+    Returns:
+        CircuitBreaker，未启用时返回None
+    """
+    if not enabled:
+        return None
+    key = (host, tuple(sorted((k, tuple(v) if isinstance(v, list) else v) for k, v in settings.items())))
+    with _breakers_lock:
+        breaker = _breakers.get(key)
+        if breaker is None:
+            breaker = _breakers[key] = CircuitBreaker(host, **settings)
+        return breaker
+
+
+def reset_circuit_breakers():
+    """清除全部熔断器状态"""
+    with _breakers_lock:
+        _breakers.clear()
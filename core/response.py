@@ -0,0 +1,96 @@
+"""
+响应解析模块
+对响应体JSON进行一次解析并缓存，供HttpClient日志、Assertion断言和用例代码共享
+安装了 orjson 时自动使用其更快的解码器
+"""
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # orjson为可选依赖
+    orjson = None
+
+_MISSING = object()
+
+
+def loads(content) -> Any:
+    """
+    解析JSON文本（优先使用orjson）
+
+    orjson 不支持的内容（超出64位的整数、NaN/Infinity 等）回退到标准库 json 解析
+
+    Args:
+        content: JSON字节串或字符串
+
+    Returns:
+        解析后的Python对象
+
+    Raises:
+        ValueError: 如果不是有效的JSON
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:  # orjson.JSONDecodeError 是 ValueError 的子类
+            pass
+    return json.loads(content)
+
+
+def parse_json(response) -> Any:
+    """
+    获取响应体解析后的JSON（每个响应只解析一次）
+
+    解析结果缓存在响应对象上，之后的调用直接返回同一个对象，
+    因此不要在断言之间修改返回的数据
+
+    Args:
+        response: Response对象（requests.Response 或 AsyncResponse）
+
+    Returns:
+        解析后的Python对象
+
+    Raises:
+        ValueError: 如果响应体不是有效的JSON
+    """
+    cached = getattr(response, '_parsed_json', _MISSING)
+    if cached is not _MISSING:
+        return cached
+
+    try:
+        data = loads(response.content)
+    except ValueError:
+        if getattr(response, 'encoding', None) in (None, 'utf-8', 'UTF-8'):
+            raise
+        # 非UTF-8编码的响应按声明的编码解码后再解析
+        data = json.loads(response.text)
+
+    response._parsed_json = data
+    return data
+
+
+def cache_json(response):
+    """
+    让 response.json() 使用 parse_json 的缓存
+
+    无参数调用 response.json() 时返回缓存结果，带参数调用时仍走原始解析逻辑；
+    解析失败时交由原始方法抛出 requests.exceptions.JSONDecodeError，保持异常类型不变
+
+    Args:
+        response: requests.Response对象
+
+    Returns:
+        同一个Response对象
+    """
+    parse = response.json
+
+    def json_once(**kwargs):
+        if kwargs:
+            return parse(**kwargs)
+        try:
+            return parse_json(response)
+        except ValueError:
+            return parse()
+
+    response.json = json_once
+    return response
@@ -0,0 +1,206 @@
+"""
+GET响应缓存
+同一次运行中相同的只读请求（方法 + URL + 请求体 + 请求头）直接返回缓存的响应，减少对共享测试环境的重复请求
+
+- 容量有上限（LRU淘汰），每条缓存有过期时间（TTL）
+- 只缓存2xx响应；POST/PUT/PATCH/DELETE 等修改请求会使同一资源前缀下的缓存失效，
+  如 POST /api/message/send 使 /api/message/ 下的全部缓存失效
+- 命中/未命中等统计在运行结束时写入 report/cache_stats.json
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+from urllib.parse import urlsplit
+
+from core.logger import get_logger
+from core.response import cache_json
+
+logger = get_logger(__name__)
+
+# 可以缓存的请求方法（其余方法视为修改请求）
+CACHEABLE_METHODS = ('GET',)
+READ_ONLY_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class CacheStats:
+    """
+    缓存统计（线程安全，整个测试运行共享）
+    """
+
+    FIELDS = ('hits', 'misses', 'stores', 'evictions', 'expirations', 'invalidations')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def incr(self, field: str, count: int = 1):
+        """累加指定统计项"""
+        with self._lock:
+            setattr(self, field, getattr(self, field) + count)
+
+    def reset(self):
+        """清空统计"""
+        with self._lock:
+            for field in self.FIELDS:
+                setattr(self, field, 0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典"""
+        with self._lock:
+            stats = {field: getattr(self, field) for field in self.FIELDS}
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        return stats
+
+
+# 全局缓存统计
+cache_stats = CacheStats()
+
+
+def resource_prefix(url: str) -> Tuple[str, str]:
+    """
+    修改请求影响的资源前缀（主机, 上一级路径/）
+
+    /api/message/send -> /api/message/，/api/users/42 -> /api/users/
+    """
+    parts = urlsplit(url)
+    path = parts.path.rstrip('/')
+    return parts.netloc, path.rsplit('/', 1)[0] + '/'
+
+
+def _fresh_copy(response):
+    """复制缓存的响应（不共享解析后的JSON，用例修改返回数据不会影响缓存）"""
+    clone = copy.copy(response)
+    clone.__dict__.pop('_parsed_json', None)
+    if 'json' in clone.__dict__:
+        # requests.Response 上由 cache_json 设置的 json 方法绑定的是原对象
+        del clone.__dict__['json']
+        cache_json(clone)
+    return clone
+
+
+class ResponseCache:
+    """
+    LRU + TTL 响应缓存
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float = 30.0):
+        """
+        初始化响应缓存
+
+        Args:
+            max_entries: 最多缓存的响应数，超出时淘汰最久未使用的
+            ttl: 缓存有效期（秒）
+        """
+        self.max_entries = max(1, int(max_entries))
+        self.ttl = ttl
+        # key -> (过期时间, 资源主机, 路径, 响应)
+        self._entries: 'OrderedDict[Hashable, Tuple[float, str, str, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable):
+        """
+        查询缓存
+
+        Returns:
+            缓存响应的副本，未命中或已过期时返回None
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._entries[key]
+                cache_stats.incr('expirations')
+                entry = None
+            if entry is None:
+                cache_stats.incr('misses')
+                return None
+            self._entries.move_to_end(key)
+        cache_stats.incr('hits')
+        return _fresh_copy(entry[3])
+
+    def put(self, key: Hashable, url: str, response):
+        """缓存响应（只缓存2xx响应）"""
+        if not 200 <= response.status_code < 300:
+            return
+        parts = urlsplit(url)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, parts.netloc, parts.path, response)
+            self._entries.move_to_end(key)
+            evicted = 0
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+        cache_stats.incr('stores')
+        if evicted:
+            cache_stats.incr('evictions', evicted)
+
+    def invalidate(self, url: str) -> int:
+        """
+        使修改请求所在资源前缀下的缓存失效
+
+        Args:
+            url: 修改请求的URL
+
+        Returns:
+            失效的缓存数
+        """
+        host, prefix = resource_prefix(url)
+        with self._lock:
+            keys = [
+                key for key, (_, entry_host, path, _) in self._entries.items()
+                if entry_host == host and (path + '/').startswith(prefix)
+            ]
+            for key in keys:
+                del self._entries[key]
+        if keys:
+            cache_stats.incr('invalidations', len(keys))
+            logger.debug(f"[缓存失效] {prefix}: {len(keys)} 条")
+        return len(keys)
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+
+
+_caches: Dict[Tuple, ResponseCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_response_cache(enabled: bool = False, **settings) -> Optional[ResponseCache]:
+    """
+    获取响应缓存（相同配置的客户端共享同一个缓存）
+
+    Args:
+        enabled: 是否启用缓存（False时返回None）
+        **settings: ResponseCache 的其他参数（max_entries、ttl）
+
+    Returns:
+        ResponseCache，未启用时返回None
+    """
+    if not enabled:
+        return None
+    key = tuple(sorted(settings.items()))
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = _caches[key] = ResponseCache(**settings)
+        return cache
+
+
+def clear_response_caches():
+    """清空所有响应缓存"""
+    with _caches_lock:
+        for cache in _caches.values():
+            cache.clear()
+
+
+def get_cache_stats() -> Dict[str, Any]:
+    """获取本次运行的缓存统计"""
+    return cache_stats.to_dict()
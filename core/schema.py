@@ -0,0 +1,417 @@
+"""
+JSON Schema校验模块
+将 config/schemas/ 下的JSON Schema编译为校验函数，每个Schema在进程内只加载、编译一次
+
+Schema文件支持 .yaml / .yml / .json 格式，文件名（不含扩展名）即Schema名称。
+支持的关键字（JSON Schema Draft 7 常用子集）:
+    type、enum、const、properties、required、additionalProperties、
+    items、minItems、maxItems、uniqueItems、minimum、maximum、
+    exclusiveMinimum、exclusiveMaximum、minLength、maxLength、pattern、
+    allOf、anyOf、oneOf、not、$ref（仅支持本文件内的 #/definitions/... 与 #/$defs/...）
+以及不参与校验的注解关键字（$schema、$id、title、description 等）。
+其他关键字（如 format、patternProperties、拼写错误的关键字）在编译时抛出 SchemaError，避免被静默忽略。
+"""
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import yaml
+
+# 获取项目根目录
+BASE_DIR = Path(__file__).parent.parent
+
+# Schema目录
+SCHEMA_DIR = BASE_DIR / 'config' / 'schemas'
+
+# 单次校验最多收集的错误数，避免超大列表全部不匹配时生成海量错误信息
+MAX_ERRORS = 20
+
+# 校验函数签名: validate(value, path, errors)，将错误追加到 errors 中
+# path 为 '$' 或 (父路径, 字段名/下标) 的嵌套元组，只在出错时才格式化为字符串
+Validator = Callable[[Any, str, List[str]], None]
+
+_TYPE_CHECKS = {
+    'string': lambda v: isinstance(v, str),
+    'integer': lambda v: isinstance(v, int) and not isinstance(v, bool),
+    'number': lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    'boolean': lambda v: isinstance(v, bool),
+    'object': lambda v: isinstance(v, dict),
+    'array': lambda v: isinstance(v, list),
+    'null': lambda v: v is None,
+}
+
+
+# 编译器实现校验的关键字
+_VALIDATION_KEYWORDS = frozenset({
+    'type', 'enum', 'const', 'properties', 'required', 'additionalProperties',
+    'items', 'minItems', 'maxItems', 'uniqueItems', 'minimum', 'maximum',
+    'exclusiveMinimum', 'exclusiveMaximum', 'minLength', 'maxLength', 'pattern',
+    'allOf', 'anyOf', 'oneOf', 'not', '$ref',
+})
+
+# 不参与校验的注解关键字
+_ANNOTATION_KEYWORDS = frozenset({
+    '$schema', '$id', '$comment', 'title', 'description', 'default', 'examples',
+    'definitions', '$defs', 'readOnly', 'writeOnly',
+})
+
+
+class SchemaError(ValueError):
+    """Schema定义错误（不支持的类型或关键字、无效的$ref等）"""
+
+
+def _format_path(path) -> str:
+    """将嵌套元组形式的路径格式化为 $.data.messages[0].title"""
+    parts = []
+    while isinstance(path, tuple):
+        path, key = path
+        parts.append(f"[{key}]" if isinstance(key, int) else f".{key}")
+    return path + ''.join(reversed(parts))
+
+
+def json_key(value: Any):
+    """
+    按JSON语义比较用的键（用于 enum、const、uniqueItems 以及 Assertion.assert_unique）
+
+    布尔值只等于布尔值（True 不等于 1），数值按数值比较（1 等于 1.0），数组、对象逐项比较
+    """
+    if isinstance(value, bool):
+        return 'boolean', value
+    if isinstance(value, (int, float)):
+        return 'number', value
+    if isinstance(value, list):
+        return 'array', tuple(json_key(item) for item in value)
+    if isinstance(value, dict):
+        return 'object', frozenset((name, json_key(item)) for name, item in value.items())
+    return type(value).__name__, value
+
+
+def _type_name(value: Any) -> str:
+    """获取值对应的JSON类型名"""
+    for name in ('null', 'boolean', 'integer', 'number', 'string', 'array', 'object'):
+        if _TYPE_CHECKS[name](value):
+            return name
+    return type(value).__name__
+
+
+class _Compiler:
+    """
+    Schema编译器
+
+    将Schema递归编译为闭包组成的校验函数，校验时不再解释Schema字典
+    """
+
+    def __init__(self, root: Dict):
+        self.root = root
+        self._refs: Dict[str, Validator] = {}
+
+    def compile(self, schema: Any) -> Validator:
+        if schema is True or schema == {}:
+            return lambda value, path, errors: None
+        if schema is False:
+            return lambda value, path, errors: errors.append(f"{_format_path(path)}: 不允许出现该字段")
+        if not isinstance(schema, dict):
+            raise SchemaError(f"无效的Schema: {schema!r}")
+        unsupported = [k for k in schema if k not in _VALIDATION_KEYWORDS and k not in _ANNOTATION_KEYWORDS]
+        if unsupported:
+            raise SchemaError(f"不支持的关键字: {unsupported}")
+
+        if '$ref' in schema:
+            return self._compile_ref(schema['$ref'])
+
+        validators = []
+        for keyword, builder in (
+            ('type', self._compile_type),
+            ('enum', self._compile_enum),
+            ('const', self._compile_const),
+            ('allOf', self._compile_all_of),
+            ('anyOf', self._compile_any_of),
+            ('oneOf', self._compile_one_of),
+            ('not', self._compile_not),
+        ):
+            if keyword in schema:
+                validators.append(builder(schema[keyword]))
+
+        if any(k in schema for k in ('properties', 'required', 'additionalProperties')):
+            validators.append(self._compile_object(schema))
+        if any(k in schema for k in ('items', 'minItems', 'maxItems', 'uniqueItems')):
+            validators.append(self._compile_array(schema))
+        if any(k in schema for k in ('minimum', 'maximum', 'exclusiveMinimum', 'exclusiveMaximum')):
+            validators.append(self._compile_number(schema))
+        if any(k in schema for k in ('minLength', 'maxLength', 'pattern')):
+            validators.append(self._compile_string(schema))
+
+        if not validators:
+            return lambda value, path, errors: None
+        if len(validators) == 1:
+            return validators[0]
+
+        def validate(value, path, errors):
+            for validator in validators:
+                validator(value, path, errors)
+        return validate
+
+    def _compile_ref(self, ref: str) -> Validator:
+        if ref in self._refs:
+            return self._refs[ref]
+        if not ref.startswith('#/'):
+            raise SchemaError(f"仅支持本文件内的$ref: {ref}")
+
+        # 先登记占位函数，支持递归引用
+        compiled: List[Validator] = []
+        self._refs[ref] = lambda value, path, errors: compiled[0](value, path, errors)
+
+        target = self.root
+        for part in ref[2:].split('/'):
+            try:
+                target = target[part]
+            except (KeyError, TypeError):
+                raise SchemaError(f"$ref 指向的定义不存在: {ref}")
+        compiled.append(self.compile(target))
+        return self._refs[ref]
+
+    @staticmethod
+    def _compile_type(expected) -> Validator:
+        names = [expected] if isinstance(expected, str) else list(expected)
+        unknown = [name for name in names if name not in _TYPE_CHECKS]
+        if unknown:
+            raise SchemaError(f"不支持的类型: {unknown}")
+        checks = [_TYPE_CHECKS[name] for name in names]
+        expected_desc = '/'.join(names)
+
+        if len(checks) == 1:
+            check = checks[0]
+
+            def validate(value, path, errors):
+                if not check(value):
+                    errors.append(f"{_format_path(path)}: 期望类型 {expected_desc}, 实际 {_type_name(value)}")
+        else:
+            def validate(value, path, errors):
+                if not any(check(value) for check in checks):
+                    errors.append(f"{_format_path(path)}: 期望类型 {expected_desc}, 实际 {_type_name(value)}")
+        return validate
+
+    @staticmethod
+    def _compile_enum(options) -> Validator:
+        keys = {json_key(option) for option in options}
+
+        def validate(value, path, errors):
+            if json_key(value) not in keys:
+                errors.append(f"{_format_path(path)}: 值 {value!r} 不在可选范围 {options}")
+        return validate
+
+    @staticmethod
+    def _compile_const(expected) -> Validator:
+        expected_key = json_key(expected)
+
+        def validate(value, path, errors):
+            if json_key(value) != expected_key:
+                errors.append(f"{_format_path(path)}: 期望 {expected!r}, 实际 {value!r}")
+        return validate
+
+    def _compile_object(self, schema: Dict) -> Validator:
+        properties = {
+            name: self.compile(sub_schema)
+            for name, sub_schema in schema.get('properties', {}).items()
+        }
+        required = list(schema.get('required', []))
+        additional = schema.get('additionalProperties', True)
+        additional_validator = None if additional is True else (
+            None if additional is False else self.compile(additional)
+        )
+        forbid_additional = additional is False
+        property_items = list(properties.items())
+
+        def validate(value, path, errors):
+            if not isinstance(value, dict):
+                return
+            for name in required:
+                if name not in value:
+                    errors.append(f"{_format_path(path)}: 缺少必填字段 '{name}'")
+            for name, validator in property_items:
+                if name in value:
+                    validator(value[name], (path, name), errors)
+            if forbid_additional or additional_validator is not None:
+                for name in value:
+                    if name in properties:
+                        continue
+                    if forbid_additional:
+                        errors.append(f"{_format_path(path)}: 不允许的字段 '{name}'")
+                    else:
+                        additional_validator(value[name], (path, name), errors)
+        return validate
+
+    def _compile_array(self, schema: Dict) -> Validator:
+        item_validator = self.compile(schema['items']) if 'items' in schema else None
+        min_items = schema.get('minItems')
+        max_items = schema.get('maxItems')
+        unique = schema.get('uniqueItems', False)
+
+        def validate(value, path, errors):
+            if not isinstance(value, list):
+                return
+            if min_items is not None and len(value) < min_items:
+                errors.append(f"{_format_path(path)}: 元素数量 {len(value)} 少于 {min_items}")
+            if max_items is not None and len(value) > max_items:
+                errors.append(f"{_format_path(path)}: 元素数量 {len(value)} 多于 {max_items}")
+            if unique:
+                seen = set()
+                for item in value:
+                    marker = json_key(item)
+                    if marker in seen:
+                        errors.append(f"{_format_path(path)}: 存在重复元素 {item!r}")
+                        break
+                    seen.add(marker)
+            if item_validator is not None:
+                for index, item in enumerate(value):
+                    item_validator(item, (path, index), errors)
+                    if len(errors) >= MAX_ERRORS:
+                        return
+        return validate
+
+    @staticmethod
+    def _compile_number(schema: Dict) -> Validator:
+        bounds = []
+        if 'minimum' in schema:
+            bounds.append((lambda v, b: v >= b, schema['minimum'], '>='))
+        if 'maximum' in schema:
+            bounds.append((lambda v, b: v <= b, schema['maximum'], '<='))
+        if 'exclusiveMinimum' in schema:
+            bounds.append((lambda v, b: v > b, schema['exclusiveMinimum'], '>'))
+        if 'exclusiveMaximum' in schema:
+            bounds.append((lambda v, b: v < b, schema['exclusiveMaximum'], '<'))
+
+        def validate(value, path, errors):
+            if not _TYPE_CHECKS['number'](value):
+                return
+            for check, bound, symbol in bounds:
+                if not check(value, bound):
+                    errors.append(f"{_format_path(path)}: 值 {value} 不满足 {symbol} {bound}")
+        return validate
+
+    @staticmethod
+    def _compile_string(schema: Dict) -> Validator:
+        min_length = schema.get('minLength')
+        max_length = schema.get('maxLength')
+        pattern = re.compile(schema['pattern']) if 'pattern' in schema else None
+
+        def validate(value, path, errors):
+            if not isinstance(value, str):
+                return
+            if min_length is not None and len(value) < min_length:
+                errors.append(f"{_format_path(path)}: 长度 {len(value)} 小于 {min_length}")
+            if max_length is not None and len(value) > max_length:
+                errors.append(f"{_format_path(path)}: 长度 {len(value)} 大于 {max_length}")
+            if pattern is not None and not pattern.search(value):
+                errors.append(f"{_format_path(path)}: 值 {value!r} 不匹配正则 {pattern.pattern}")
+        return validate
+
+    def _compile_all_of(self, schemas: List) -> Validator:
+        validators = [self.compile(s) for s in schemas]
+
+        def validate(value, path, errors):
+            for validator in validators:
+                validator(value, path, errors)
+        return validate
+
+    def _compile_any_of(self, schemas: List) -> Validator:
+        validators = [self.compile(s) for s in schemas]
+
+        def validate(value, path, errors):
+            for validator in validators:
+                sub_errors: List[str] = []
+                validator(value, path, sub_errors)
+                if not sub_errors:
+                    return
+            errors.append(f"{_format_path(path)}: 不满足 anyOf 中的任何一个Schema")
+        return validate
+
+    def _compile_one_of(self, schemas: List) -> Validator:
+        validators = [self.compile(s) for s in schemas]
+
+        def validate(value, path, errors):
+            matched = 0
+            for validator in validators:
+                sub_errors: List[str] = []
+                validator(value, path, sub_errors)
+                if not sub_errors:
+                    matched += 1
+            if matched != 1:
+                errors.append(f"{_format_path(path)}: 应恰好满足 oneOf 中的一个Schema, 实际满足 {matched} 个")
+        return validate
+
+    def _compile_not(self, schema: Any) -> Validator:
+        validator = self.compile(schema)
+
+        def validate(value, path, errors):
+            sub_errors: List[str] = []
+            validator(value, path, sub_errors)
+            if not sub_errors:
+                errors.append(f"{_format_path(path)}: 不应满足 not 中的Schema")
+        return validate
+
+
+class SchemaValidator:
+    """
+    编译后的Schema校验器
+
+    通过 get_validator() 获取（带缓存），不要直接构造
+    """
+
+    def __init__(self, name: str, schema: Dict):
+        self.name = name
+        self.schema = schema
+        self._validate = _Compiler(schema).compile(schema)
+
+    def validate(self, data: Any) -> List[str]:
+        """
+        校验数据
+
+        Args:
+            data: 解析后的JSON数据
+
+        Returns:
+            错误信息列表（为空表示校验通过，最多 MAX_ERRORS 条）
+        """
+        errors: List[str] = []
+        self._validate(data, '$', errors)
+        return errors[:MAX_ERRORS]
+
+
+def load_schema(name: str) -> Dict:
+    """
+    从 config/schemas/ 加载Schema定义
+
+    Args:
+        name: Schema名称（文件名，不含扩展名）
+
+    Returns:
+        Schema字典
+
+    Raises:
+        FileNotFoundError: 如果Schema文件不存在
+    """
+    for suffix in ('.yaml', '.yml', '.json'):
+        schema_file = SCHEMA_DIR / f"{name}{suffix}"
+        if schema_file.exists():
+            with open(schema_file, 'r', encoding='utf-8') as f:
+                if suffix == '.json':
+                    return json.load(f)
+                return yaml.safe_load(f) or {}
+    raise FileNotFoundError(f"Schema文件不存在: {SCHEMA_DIR / name}.(yaml|yml|json)")
+
+
+@lru_cache(maxsize=None)
+def get_validator(name: str) -> SchemaValidator:
+    """
+    获取编译后的Schema校验器（每个Schema在进程内只加载、编译一次）
+
+    Args:
+        name: Schema名称
+
+    Returns:
+        SchemaValidator对象
+    """
+    return SchemaValidator(name, load_schema(name))
@@ -0,0 +1,277 @@
+"""
+请求阶段耗时
+response.elapsed 只统计到收到响应头为止，无法区分慢在哪个阶段。每次请求（每次尝试）记录:
+
+    dns: 域名解析
+    connect: 建立TCP连接
+    tls: TLS握手（异步客户端无法单独统计，计入 connect）
+    send: 发送请求（请求行、请求头和请求体）
+    server: 请求发送完到收到响应头（服务端处理 + 网络往返）
+    download: 收到响应头到读完响应体
+    bytes_sent / bytes_received: 收发字节数（响应头按解析结果估算，响应体按实际读取的字节数）
+    reused: 是否复用了已建立的连接（复用时 dns/connect/tls 为0）
+
+同步客户端通过 TimedHTTPConnection / TimedHTTPSConnection（连接池使用的urllib3连接类）记录，
+异步客户端通过 aiohttp 的 TraceConfig 记录。结果随请求指标发布（record['timing']，见 core.metrics），
+并可通过 response.timing 获取
+"""
+import socket
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+import aiohttp
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.exceptions import NameResolutionError, NewConnectionError
+from urllib3.util.connection import allowed_gai_family
+from urllib3.util.ssl_ import is_ipaddress
+
+PHASES = ('dns', 'connect', 'tls', 'send', 'server', 'download')
+
+
+class RequestTiming:
+    """
+    一次请求的阶段耗时（秒）与收发字节数
+
+    跟随重定向时各阶段累加
+    """
+
+    def __init__(self):
+        self.dns = 0.0
+        self.connect = 0.0
+        self.tls = 0.0
+        self.send = 0.0
+        self.server = 0.0
+        self.download = 0.0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.reused: Optional[bool] = None
+        # 连接就绪、请求发送完、收到响应头的时间（time.perf_counter()）
+        self._ready_at: Optional[float] = None
+        self._sent_at: Optional[float] = None
+        self._headers_at: Optional[float] = None
+
+    @property
+    def measured(self) -> bool:
+        """是否实际发出了请求（回放录像时为False）"""
+        return self._ready_at is not None
+
+    def ready(self):
+        """连接就绪（新建连接完成或取得复用的连接）"""
+        self._ready_at = time.perf_counter()
+
+    def sent(self):
+        """请求（或其中一部分）发送完，以最后一次调用的时间为准"""
+        self._sent_at = time.perf_counter()
+
+    def headers_received(self, header_bytes: int = 0):
+        """收到响应头"""
+        now = time.perf_counter()
+        if self._sent_at is not None:
+            if self._ready_at is not None:
+                self.send += self._sent_at - self._ready_at
+            self.server += now - self._sent_at
+            self._sent_at = None
+        self._headers_at = now
+        self.bytes_received += header_bytes
+        if self.reused is None:
+            self.reused = True
+
+    def finish(self, body_bytes: int = 0):
+        """读完响应体"""
+        if self._headers_at is not None:
+            self.download += time.perf_counter() - self._headers_at
+            self._headers_at = None
+        self.bytes_received += body_bytes
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典（耗时单位: 秒）"""
+        result = {phase: round(getattr(self, phase), 6) for phase in PHASES}
+        result.update({
+            'bytes_sent': self.bytes_sent,
+            'bytes_received': self.bytes_received,
+            'reused': bool(self.reused),
+        })
+        return result
+
+
+_current: ContextVar[Optional[RequestTiming]] = ContextVar('liquid_request_timing', default=None)
+
+
+@contextmanager
+def measure_timing() -> Iterator[RequestTiming]:
+    """在上下文内记录当前线程/协程发出的请求的阶段耗时"""
+    timing = RequestTiming()
+    token = _current.set(timing)
+    try:
+        yield timing
+    finally:
+        _current.reset(token)
+
+
+def header_size(first_line: str, headers: Iterable[Tuple[Any, Any]]) -> int:
+    """估算报文头字节数（首行 + 每个头 "name: value\\r\\n" + 空行）"""
+    return len(first_line) + 2 + sum(len(name) + len(value) + 4 for name, value in headers) + 2
+
+
+class _TimedConnectionMixin:
+    """为urllib3连接记录阶段耗时（没有 measure_timing 上下文时与原连接类完全相同）"""
+
+    def _new_conn(self):
+        timing = _current.get()
+        if timing is None:
+            return super()._new_conn()
+        host = self._dns_host
+        start = time.perf_counter()
+        if is_ipaddress(host):
+            addresses = [host]
+        else:
+            try:
+                infos = socket.getaddrinfo(host, self.port, allowed_gai_family(), socket.SOCK_STREAM)
+            except socket.gaierror as e:
+                raise NameResolutionError(self.host, self, e) from e
+            addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        resolved = time.perf_counter()
+        timing.dns += resolved - start
+
+        # 依次尝试解析出的地址（如 localhost 的 ::1 连接失败时再尝试 127.0.0.1）
+        error = None
+        try:
+            for address in addresses:
+                self._dns_host = address
+                try:
+                    sock = super()._new_conn()
+                    break
+                except NewConnectionError as e:
+                    error = e
+            else:
+                raise error
+        finally:
+            self._dns_host = host
+        timing.connect += time.perf_counter() - resolved
+        return sock
+
+    def connect(self):
+        timing = _current.get()
+        if timing is None:
+            return super().connect()
+        timing.reused = False
+        start = time.perf_counter()
+        dns_connect = timing.dns + timing.connect
+        super().connect()
+        if isinstance(self, HTTPSConnection):
+            timing.tls += time.perf_counter() - start - (timing.dns + timing.connect - dns_connect)
+        timing.ready()
+
+    def send(self, data):
+        timing = _current.get()
+        if timing is not None and isinstance(data, (bytes, bytearray, memoryview)):
+            timing.bytes_sent += len(data)
+        return super().send(data)
+
+    def request(self, method, url, *args, **kwargs):
+        timing = _current.get()
+        if timing is not None and self.sock is not None:
+            timing.ready()
+        super().request(method, url, *args, **kwargs)
+        if timing is not None:
+            timing.sent()
+
+    def getresponse(self):
+        response = super().getresponse()
+        timing = _current.get()
+        if timing is not None:
+            timing.headers_received(header_size(
+                f"HTTP/1.1 {response.status} {response.reason or ''}", response.headers.items()
+            ))
+        return response
+
+
+class TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    """记录阶段耗时的HTTP连接"""
+
+
+class TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    """记录阶段耗时的HTTPS连接"""
+
+
+def _trace_timing(trace_config_ctx) -> Optional[RequestTiming]:
+    timing = trace_config_ctx.trace_request_ctx
+    return timing if isinstance(timing, RequestTiming) else None
+
+
+async def _on_dns_start(session, ctx, params):
+    ctx.dns_start = time.perf_counter()
+
+
+async def _on_dns_end(session, ctx, params):
+    timing = _trace_timing(ctx)
+    if timing is not None:
+        ctx.dns = time.perf_counter() - ctx.dns_start
+        timing.dns += ctx.dns
+
+
+async def _on_connection_create_start(session, ctx, params):
+    ctx.connect_start = time.perf_counter()
+    ctx.dns = 0.0
+
+
+async def _on_connection_create_end(session, ctx, params):
+    timing = _trace_timing(ctx)
+    if timing is not None:
+        timing.reused = False
+        timing.connect += time.perf_counter() - ctx.connect_start - ctx.dns
+        timing.ready()
+
+
+async def _on_connection_reuse(session, ctx, params):
+    timing = _trace_timing(ctx)
+    if timing is not None:
+        timing.ready()
+
+
+async def _on_headers_sent(session, ctx, params):
+    timing = _trace_timing(ctx)
+    if timing is not None:
+        timing.bytes_sent += header_size(f"{params.method} {params.url.raw_path_qs} HTTP/1.1", params.headers.items())
+        timing.sent()
+
+
+async def _on_chunk_sent(session, ctx, params):
+    timing = _trace_timing(ctx)
+    if timing is not None:
+        timing.bytes_sent += len(params.chunk)
+        timing.sent()
+
+
+async def _on_request_end(session, ctx, params):
+    timing = _trace_timing(ctx)
+    if timing is not None:
+        response = params.response
+        timing.headers_received(header_size(f"HTTP/1.1 {response.status} {response.reason or ''}", response.raw_headers))
+
+
+async def _on_chunk_received(session, ctx, params):
+    timing = _trace_timing(ctx)
+    if timing is not None:
+        timing.bytes_received += len(params.chunk)
+
+
+def timing_trace_config() -> aiohttp.TraceConfig:
+    """
+    记录阶段耗时的aiohttp TraceConfig
+
+    请求时通过 trace_request_ctx 传入 RequestTiming
+    """
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_dns_resolvehost_start.append(_on_dns_start)
+    trace_config.on_dns_resolvehost_end.append(_on_dns_end)
+    trace_config.on_connection_create_start.append(_on_connection_create_start)
+    trace_config.on_connection_create_end.append(_on_connection_create_end)
+    trace_config.on_connection_reuseconn.append(_on_connection_reuse)
+    trace_config.on_request_headers_sent.append(_on_headers_sent)
+    trace_config.on_request_chunk_sent.append(_on_chunk_sent)
+    trace_config.on_request_end.append(_on_request_end)
+    trace_config.on_response_chunk_received.append(_on_chunk_received)
+    return trace_config
@@ -0,0 +1,199 @@
+"""
+异步Mock服务
+基于 asyncio（aiohttp.web）实现与 mock_server.py 相同的接口，单进程即可维持大量并发长连接，
+用于压测时避免Mock服务成为瓶颈（接口逻辑见 mock/handlers.py）
+
+启动方式:
+    python mock/async_mock_server.py
+"""
+import argparse
+import asyncio
+import json
+import socket
+import struct
+import sys
+from pathlib import Path
+
+from aiohttp import web
+
+# 直接执行 python mock/async_mock_server.py 时，保证可以导入项目内的模块
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.faults import FAULT_SCOPE_HEADER
+from mock import handlers
+from mock.faults import FaultInjector, error_body, throttle_chunks
+from mock.handlers import DEFAULT_HOST, DEFAULT_PORT, load_server_config
+from mock.store import MockStore
+
+# 监听队列长度（大量客户端同时建立连接时避免被拒绝）
+BACKLOG = 4096
+
+_store_key = web.AppKey('store', MockStore)
+_faults_key = web.AppKey('faults', FaultInjector)
+
+
+def _respond(result) -> web.Response:
+    body, status = result
+    return web.Response(
+        body=json.dumps(body, ensure_ascii=False).encode('utf-8'),
+        status=status,
+        content_type='application/json',
+    )
+
+
+async def _read_json(request: web.Request):
+    """读取JSON请求体，不是合法JSON时返回None（按请求体为空处理）"""
+    if not request.can_read_body:
+        return None
+    try:
+        return await request.json()
+    except ValueError:
+        return None
+
+
+async def get_user_info(request: web.Request) -> web.Response:
+    """获取用户信息接口"""
+    return _respond(handlers.get_user_info(request.app[_store_key], request.query))
+
+
+async def add_user(request: web.Request) -> web.Response:
+    """添加用户接口"""
+    return _respond(handlers.add_user(request.app[_store_key], await _read_json(request)))
+
+
+async def get_message_list(request: web.Request) -> web.Response:
+    """获取消息列表接口"""
+    return _respond(handlers.get_message_list(request.app[_store_key], request.query))
+
+
+async def send_message(request: web.Request) -> web.Response:
+    """发送消息接口"""
+    return _respond(handlers.send_message(request.app[_store_key], await _read_json(request)))
+
+
+async def health_check(request: web.Request) -> web.Response:
+    """健康检查接口"""
+    return _respond(handlers.health_check())
+
+
+async def get_faults(request: web.Request) -> web.Response:
+    """查询故障注入配置"""
+    return _respond(handlers.get_faults(request.app[_faults_key], request.headers.get(FAULT_SCOPE_HEADER)))
+
+
+async def set_faults(request: web.Request) -> web.Response:
+    """替换故障注入配置"""
+    return _respond(handlers.set_faults(request.app[_faults_key], await _read_json(request),
+                                         request.headers.get(FAULT_SCOPE_HEADER)))
+
+
+async def clear_faults(request: web.Request) -> web.Response:
+    """清除故障注入配置"""
+    return _respond(handlers.clear_faults(request.app[_faults_key], request.headers.get(FAULT_SCOPE_HEADER)))
+
+
+def _abort(request: web.Request):
+    """立即关闭连接并发送RST（客户端收到 Connection reset by peer）"""
+    transport = request.transport
+    if transport is None:
+        return
+    sock = transport.get_extra_info('socket')
+    if sock is not None:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+    transport.abort()
+
+
+@web.middleware
+async def fault_middleware(request: web.Request, handler):
+    """故障注入：响应前延迟、按概率返回5xx、限制响应体发送速率、发送一半后断开连接"""
+    plan = request.app[_faults_key].plan(request.path, request.headers.get(FAULT_SCOPE_HEADER))
+    if plan is None:
+        return await handler(request)
+    if plan.delay:
+        await asyncio.sleep(plan.delay)
+    if plan.error_status:
+        response = _respond((error_body(plan.error_status), plan.error_status))
+    else:
+        response = await handler(request)
+    if not (plan.reset or plan.bandwidth):
+        return response
+
+    body = response.body
+    stream = web.StreamResponse(status=response.status, headers=response.headers)
+    stream.content_length = len(body)
+    await stream.prepare(request)
+    if plan.reset:
+        await stream.write(body[:len(body) // 2])
+        _abort(request)
+        return stream
+    for chunk, wait in throttle_chunks(body, plan.bandwidth):
+        await asyncio.sleep(wait)
+        await stream.write(chunk)
+    await stream.write_eof()
+    return stream
+
+
+def create_app(store: MockStore = None, faults: FaultInjector = None) -> web.Application:
+    """
+    创建异步Mock应用
+
+    Args:
+        store: 数据存储（默认新建）
+        faults: 故障注入器（默认不注入故障）
+
+    Returns:
+        aiohttp Application
+    """
+    app = web.Application(middlewares=[fault_middleware])
+    app[_store_key] = store or MockStore()
+    app[_faults_key] = faults or FaultInjector()
+    app.router.add_get('/api/user/info', get_user_info)
+    app.router.add_post('/api/user/add', add_user)
+    app.router.add_get('/api/message/list', get_message_list)
+    app.router.add_post('/api/message/send', send_message)
+    app.router.add_get('/health', health_check)
+    app.router.add_get('/admin/faults', get_faults)
+    app.router.add_put('/admin/faults', set_faults)
+    app.router.add_delete('/admin/faults', clear_faults)
+    return app
+
+
+def _install_uvloop():
+    """安装了 uvloop 时使用其事件循环（吞吐量更高）"""
+    try:
+        import uvloop
+    except ImportError:
+        return False
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='异步Mock服务')
+    parser.add_argument('--host', type=str, help='监听地址（默认读取 mock.host）')
+    parser.add_argument('--port', type=int, help='监听端口（默认读取 mock.port）')
+    args = parser.parse_args()
+
+    settings = load_server_config()
+    host = args.host or settings.get('host', DEFAULT_HOST)
+    port = args.port or settings.get('port', DEFAULT_PORT)
+    try:
+        faults = FaultInjector(settings.get('faults'))
+    except ValueError as e:
+        parser.error(f"mock.faults 配置错误: {e}")
+
+    print("=" * 50)
+    print("异步Mock服务启动中...")
+    print(f"服务地址: http://{host}:{port}")
+    print(f"健康检查: http://{host}:{port}/health")
+    if settings.get('faults'):
+        print(f"故障注入已启用（管理接口: http://{host}:{port}/admin/faults）")
+    if _install_uvloop():
+        print("使用 uvloop 事件循环")
+    print("=" * 50)
+    # 关闭访问日志，避免每个请求一次日志输出拖慢服务
+    web.run_app(create_app(faults=faults), host=host, port=port, backlog=BACKLOG, access_log=None, print=None)
+
+
+if __name__ == '__main__':
+    main()
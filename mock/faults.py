@@ -0,0 +1,261 @@
+"""
+Mock服务故障注入
+按接口路径配置响应延迟（固定/均匀/正态/长尾分布）、带宽限制、随机5xx错误和连接中断，
+用于在可复现的慢速/不稳定后端上验证客户端的超时、重试和连接池行为
+
+配置格式（config.yaml 中的 mock.faults，也可通过 PUT /admin/faults 在运行时修改）:
+    seed: 42                          # 随机种子（可选，固定后每次启动的注入序列相同）
+    default:                          # 对所有接口生效的规则（可选）
+      latency: {distribution: fixed, value: 10}
+    routes:                           # 按路径配置，覆盖 default 中的同名字段
+      /api/user/info:
+        latency: {distribution: normal, mean: 50, stddev: 10}   # 毫秒
+        bandwidth: 102400             # 响应体发送速率上限（字节/秒）
+        error_rate: 0.01              # 返回 error_status 的概率
+        error_status: 503
+        reset_rate: 0.001             # 响应中途断开连接的概率
+
+延迟分布（单位均为毫秒，可选 max 限制最大值）:
+    fixed:      value
+    uniform:    min, max
+    normal:     mean, stddev
+    lognormal:  median, sigma          长尾，sigma 越大尾部越长
+    pareto:     scale, alpha           长尾，最小值为 scale，alpha 越小尾部越长
+
+故障作用域:
+    /admin/faults 请求带 X-Fault-Scope 请求头时，只查询/替换/清除该作用域的规则（DELETE 后作用域被移除）；
+    带同一请求头的业务请求只使用该作用域的规则，不受全局配置和其他作用域影响，
+    不带该请求头的请求只使用全局配置。并行执行的用例各自使用唯一的作用域，互不干扰
+"""
+import math
+import random
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from core.faults import FAULT_SCOPE_HEADER
+
+# 不注入故障的路径前缀（管理接口本身）
+EXEMPT_PREFIX = '/admin/'
+
+# 带宽限制时每次发送的时间片（秒）
+THROTTLE_INTERVAL = 0.05
+
+_DISTRIBUTIONS = {
+    'fixed': ('value',),
+    'uniform': ('min', 'max'),
+    'normal': ('mean', 'stddev'),
+    'lognormal': ('median', 'sigma'),
+    'pareto': ('scale', 'alpha'),
+}
+
+
+def _make_sampler(spec: Dict[str, Any]) -> Callable[[random.Random], float]:
+    """
+    根据延迟分布配置生成采样函数
+
+    Returns:
+        sampler(rng) -> 延迟秒数
+
+    Raises:
+        ValueError: 如果配置无效
+    """
+    distribution = spec.get('distribution', 'fixed')
+    if distribution not in _DISTRIBUTIONS:
+        raise ValueError(f"不支持的延迟分布: {distribution}（可选: {', '.join(_DISTRIBUTIONS)}）")
+    missing = [key for key in _DISTRIBUTIONS[distribution] if key not in spec]
+    if missing:
+        raise ValueError(f"延迟分布 {distribution} 缺少参数: {', '.join(missing)}")
+    p = {key: float(spec[key]) for key in _DISTRIBUTIONS[distribution]}
+    cap = float(spec['max']) if 'max' in spec and distribution != 'uniform' else math.inf
+
+    if distribution == 'fixed':
+        def sample(rng):
+            return p['value']
+    elif distribution == 'uniform':
+        def sample(rng):
+            return rng.uniform(p['min'], p['max'])
+    elif distribution == 'normal':
+        def sample(rng):
+            return rng.gauss(p['mean'], p['stddev'])
+    elif distribution == 'lognormal':
+        def sample(rng):
+            return p['median'] * math.exp(rng.gauss(0, p['sigma']))
+    else:
+        if p['alpha'] <= 0:
+            raise ValueError(f"pareto 分布的 alpha 必须大于0: {p['alpha']}")
+
+        def sample(rng):
+            return p['scale'] * rng.paretovariate(p['alpha'])
+
+    return lambda rng: min(max(sample(rng), 0.0), cap) / 1000
+
+
+def _probability(value: Any, name: str) -> float:
+    value = float(value)
+    if not 0 <= value <= 1:
+        raise ValueError(f"{name} 必须在 0 ~ 1 之间: {value}")
+    return value
+
+
+class FaultRule:
+    """单个接口的故障规则"""
+
+    FIELDS = ('latency', 'bandwidth', 'error_rate', 'error_status', 'reset_rate')
+
+    def __init__(self, spec: Dict[str, Any]):
+        """
+        Args:
+            spec: 规则配置（latency、bandwidth、error_rate、error_status、reset_rate）
+
+        Raises:
+            ValueError: 如果配置无效
+        """
+        unknown = set(spec) - set(self.FIELDS)
+        if unknown:
+            raise ValueError(f"未知的故障配置: {', '.join(sorted(unknown))}")
+        self.latency = _make_sampler(spec['latency']) if spec.get('latency') else None
+        self.bandwidth = float(spec['bandwidth']) if spec.get('bandwidth') else None
+        if self.bandwidth is not None and self.bandwidth <= 0:
+            raise ValueError(f"bandwidth 必须大于0: {self.bandwidth}")
+        self.error_rate = _probability(spec.get('error_rate', 0), 'error_rate')
+        self.error_status = int(spec.get('error_status', 500))
+        if not 500 <= self.error_status <= 599:
+            raise ValueError(f"error_status 必须是5xx状态码: {self.error_status}")
+        self.reset_rate = _probability(spec.get('reset_rate', 0), 'reset_rate')
+
+
+class FaultPlan:
+    """一次请求的故障注入结果"""
+
+    __slots__ = ('delay', 'error_status', 'reset', 'bandwidth')
+
+    def __init__(self, delay: float = 0.0, error_status: Optional[int] = None,
+                 reset: bool = False, bandwidth: Optional[float] = None):
+        self.delay = delay                  # 响应前等待的秒数
+        self.error_status = error_status    # 返回的错误状态码（None表示正常处理）
+        self.reset = reset                  # 是否在响应中途断开连接
+        self.bandwidth = bandwidth          # 响应体发送速率上限（字节/秒）
+
+
+class _RuleSet:
+    """一组故障配置（全局或某个作用域）"""
+
+    __slots__ = ('config', 'rules', 'default', 'rng')
+
+    def __init__(self, config: Dict[str, Any]):
+        """
+        Raises:
+            ValueError: 如果配置无效
+        """
+        if not isinstance(config, dict):
+            raise ValueError("故障配置必须是对象")
+        unknown = set(config) - {'seed', 'default', 'routes'}
+        if unknown:
+            raise ValueError(f"未知的故障配置: {', '.join(sorted(unknown))}")
+        default_spec = config.get('default') or {}
+        route_specs = config.get('routes') or {}
+        self.config = config
+        # 路由规则在 default 的基础上覆盖同名字段
+        self.rules = {path: FaultRule({**default_spec, **(spec or {})}) for path, spec in route_specs.items()}
+        self.default = FaultRule(default_spec) if default_spec else None
+        self.rng = random.Random(config.get('seed'))
+
+
+class FaultInjector:
+    """
+    故障注入器
+
+    Flask（多线程）和异步版本的Mock服务共用，配置替换和随机数生成都在锁内完成
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self._lock = threading.Lock()
+        self._global = _RuleSet({})
+        self._scopes: Dict[str, _RuleSet] = {}
+        self.configure(config or {})
+
+    def configure(self, config: Dict[str, Any], scope: Optional[str] = None):
+        """
+        替换全部故障配置
+
+        Args:
+            config: 故障配置
+            scope: 作用域（None表示全局配置）
+
+        Raises:
+            ValueError: 如果配置无效（此时保持原配置不变）
+        """
+        rule_set = _RuleSet(config)
+        with self._lock:
+            if scope is None:
+                self._global = rule_set
+            else:
+                self._scopes[scope] = rule_set
+
+    def clear(self, scope: Optional[str] = None):
+        """清除故障配置（清除作用域时移除该作用域）"""
+        with self._lock:
+            if scope is None:
+                self._global = _RuleSet({})
+            else:
+                self._scopes.pop(scope, None)
+
+    def to_dict(self, scope: Optional[str] = None) -> Dict[str, Any]:
+        """当前故障配置（作用域不存在时为空）"""
+        with self._lock:
+            rule_set = self._global if scope is None else self._scopes.get(scope)
+            return rule_set.config if rule_set is not None else {}
+
+    def plan(self, path: str, scope: Optional[str] = None) -> Optional[FaultPlan]:
+        """
+        计算本次请求的故障注入
+
+        Args:
+            path: 请求路径
+            scope: 请求所属的作用域（None表示使用全局配置）
+
+        Returns:
+            FaultPlan，不需要注入故障时返回None
+        """
+        if path.startswith(EXEMPT_PREFIX):
+            return None
+        with self._lock:
+            rule_set = self._global if scope is None else self._scopes.get(scope)
+            if rule_set is None:
+                return None
+            rule = rule_set.rules.get(path, rule_set.default)
+            if rule is None:
+                return None
+            rng = rule_set.rng
+            delay = rule.latency(rng) if rule.latency else 0.0
+            error = rule.error_rate and rng.random() < rule.error_rate
+            reset = not error and rule.reset_rate and rng.random() < rule.reset_rate
+        return FaultPlan(
+            delay=delay,
+            error_status=rule.error_status if error else None,
+            reset=bool(reset),
+            bandwidth=rule.bandwidth,
+        )
+
+
+def error_body(status: int) -> Dict[str, Any]:
+    """注入的5xx错误响应体"""
+    return {
+        "code": status,
+        "message": "模拟服务端错误（故障注入）",
+        "data": None
+    }
+
+
+def throttle_chunks(body: bytes, bandwidth: float):
+    """
+    按带宽将响应体切分为若干块
+
+    Returns:
+        [(数据块, 发送前等待的秒数)]
+    """
+    chunk_size = max(1, int(bandwidth * THROTTLE_INTERVAL))
+    return [
+        (body[i:i + chunk_size], len(body[i:i + chunk_size]) / bandwidth)
+        for i in range(0, len(body), chunk_size)
+    ]
@@ -0,0 +1,288 @@
+"""
+Mock接口处理逻辑
+与Web框架无关，Flask版本（mock_server.py）与异步版本（async_mock_server.py）共用，
+保证两个版本的接口行为完全一致
+
+每个处理函数接收数据存储和请求参数，返回 (响应体, 状态码)
+"""
+import random
+from datetime import datetime
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from mock.faults import FaultInjector
+from mock.store import MockStore
+
+Response = Tuple[Dict[str, Any], int]
+
+# 默认服务地址（未配置 mock.host / mock.port 时使用）
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 5000
+
+
+def load_server_config() -> dict:
+    """读取 mock 下的服务配置（配置文件不存在时返回空字典，使用默认值）"""
+    try:
+        from core.config import config
+        return config.get('mock', {}) or {}
+    except FileNotFoundError:
+        return {}
+
+
+def _int_arg(args: Mapping[str, str], key: str, default: Optional[int] = None) -> Optional[int]:
+    """读取整数查询参数，缺失或不是整数时返回默认值"""
+    try:
+        return int(args[key])
+    except (KeyError, TypeError, ValueError):
+        return default
+
+
+def _error(code: int, message: str) -> Response:
+    return {
+        "code": code,
+        "message": message,
+        "data": None
+    }, code
+
+
+def get_user_info(store: MockStore, args: Mapping[str, str]) -> Response:
+    """
+    获取用户信息接口
+
+    请求参数:
+        user_id: 用户ID（与 username、email 三选一）
+        username: 用户名
+        email: 邮箱
+
+    返回:
+        {
+            "code": 200,
+            "message": "success",
+            "data": {
+                "user_id": 1001,
+                "username": "test_user",
+                "email": "test@example.com",
+                "age": 25,
+                "created_at": "2024-01-01 10:00:00"
+            }
+        }
+    """
+    user_id = _int_arg(args, 'user_id')
+    username = args.get('username')
+    email = args.get('email')
+
+    if not user_id and (username or email):
+        # 按用户名/邮箱查询（走索引）
+        user_id = store.find_user_id(username=username or None, email=email or None)
+        if user_id is None:
+            return _error(404, "用户不存在")
+
+    if not user_id:
+        return _error(400, "参数错误: user_id不能为空")
+
+    # 如果用户存在，返回用户信息
+    user = store.get_user(user_id)
+    if user is not None:
+        return {
+            "code": 200,
+            "message": "success",
+            "data": user
+        }, 200
+
+    # 如果用户不存在，返回默认用户信息
+    return {
+        "code": 200,
+        "message": "success",
+        "data": {
+            "user_id": user_id,
+            "username": f"user_{user_id}",
+            "email": f"user_{user_id}@example.com",
+            "age": random.randint(18, 60),
+            "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }
+    }, 200
+
+
+def add_user(store: MockStore, data: Optional[Dict[str, Any]]) -> Response:
+    """
+    添加用户接口
+
+    请求体（JSON）:
+        {
+            "username": "test_user",
+            "email": "test@example.com",
+            "age": 25  // 可选
+        }
+
+    返回:
+        {
+            "code": 200,
+            "message": "用户创建成功",
+            "data": {
+                "user_id": 1001,
+                "username": "test_user",
+                "email": "test@example.com"
+            }
+        }
+    """
+    # 参数校验
+    if not data:
+        return _error(400, "请求体不能为空")
+
+    username = data.get('username')
+    email = data.get('email')
+
+    if not username:
+        return _error(400, "参数错误: username不能为空")
+
+    if not email:
+        return _error(400, "参数错误: email不能为空")
+
+    # 检查邮箱格式（简单验证）
+    if '@' not in email:
+        return _error(400, "参数错误: 邮箱格式不正确")
+
+    # 创建用户（用户名已存在时返回None）
+    user = store.add_user(username, email, data.get('age', 0))
+    if user is None:
+        return _error(409, "用户已存在")
+
+    return {
+        "code": 200,
+        "message": "用户创建成功",
+        "data": {
+            "user_id": user["user_id"],
+            "username": username,
+            "email": email
+        }
+    }, 200
+
+
+def get_message_list(store: MockStore, args: Mapping[str, str]) -> Response:
+    """
+    获取消息列表接口
+
+    请求参数:
+        page: 页码（默认1）
+        page_size: 每页数量（默认10）
+        receiver_id: 只返回该接收者的消息（可选）
+
+    返回:
+        {
+            "code": 200,
+            "message": "success",
+            "data": {
+                "total": 25,
+                "page": 1,
+                "page_size": 10,
+                "messages": [
+                    {
+                        "message_id": 1,
+                        "title": "测试消息",
+                        "content": "这是一条测试消息",
+                        "sender_id": 1001,
+                        "receiver_id": 1002,
+                        "created_at": "2024-01-01 10:00:00"
+                    }
+                ]
+            }
+        }
+    """
+    page = _int_arg(args, 'page', 1)
+    page_size = _int_arg(args, 'page_size', 10)
+    receiver_id = _int_arg(args, 'receiver_id')
+
+    # 分页（直接对消息列表 / 接收者索引切片）
+    total, messages = store.list_messages(page, page_size, receiver_id)
+
+    return {
+        "code": 200,
+        "message": "success",
+        "data": {
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "messages": messages
+        }
+    }, 200
+
+
+def send_message(store: MockStore, data: Optional[Dict[str, Any]]) -> Response:
+    """
+    发送消息接口
+
+    请求体（JSON）:
+        {
+            "receiver_id": 1002,
+            "content": "消息内容",
+            "title": "消息标题"  // 可选
+        }
+
+    返回:
+        {
+            "code": 200,
+            "message": "消息发送成功",
+            "data": {
+                "message_id": 1
+            }
+        }
+    """
+    if not data:
+        return _error(400, "请求体不能为空")
+
+    receiver_id = data.get('receiver_id')
+    content = data.get('content')
+
+    if not receiver_id:
+        return _error(400, "参数错误: receiver_id不能为空")
+
+    if not content:
+        return _error(400, "参数错误: content不能为空")
+
+    # 创建消息（sender_id 固定为模拟发送者1001）
+    message = store.add_message(receiver_id, content, data.get('title', '无标题'))
+
+    return {
+        "code": 200,
+        "message": "消息发送成功",
+        "data": {
+            "message_id": message["message_id"]
+        }
+    }, 200
+
+
+def health_check() -> Response:
+    """健康检查接口"""
+    return {
+        "status": "ok",
+        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    }, 200
+
+
+def get_faults(injector: FaultInjector, scope: Optional[str] = None) -> Response:
+    """查询故障注入配置（GET /admin/faults，scope 为请求头 X-Fault-Scope）"""
+    return {
+        "code": 200,
+        "message": "success",
+        "data": injector.to_dict(scope)
+    }, 200
+
+
+def set_faults(injector: FaultInjector, data: Optional[Dict[str, Any]], scope: Optional[str] = None) -> Response:
+    """
+    替换故障注入配置（PUT /admin/faults，请求体格式同 config.yaml 中的 mock.faults）
+
+    配置无效时返回400，原配置保持不变
+    """
+    if not isinstance(data, dict):
+        return _error(400, "故障配置错误: 请求体必须是JSON对象")
+    try:
+        injector.configure(data, scope)
+    except (TypeError, ValueError) as e:
+        return _error(400, f"故障配置错误: {e}")
+    return get_faults(injector, scope)
+
+
+def clear_faults(injector: FaultInjector, scope: Optional[str] = None) -> Response:
+    """清除故障注入（DELETE /admin/faults，带作用域时移除该作用域）"""
+    injector.clear(scope)
+    return get_faults(injector, scope)
@@ -1,310 +1,175 @@
 """
 Flask Mock服务
-提供模拟的API接口，用于测试
+提供模拟的API接口，用于测试（接口逻辑见 mock/handlers.py）
 """
-from flask import Flask, jsonify, request
-from datetime import datetime
-import random
-import string
+import argparse
+import sys
+import time
+from pathlib import Path
+from flask import Flask, g, jsonify, request
+
+# 直接执行 python mock/mock_server.py 时，保证可以导入项目内的模块
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.faults import FAULT_SCOPE_HEADER
+from mock import handlers
+from mock.faults import FaultInjector, error_body, throttle_chunks
+from mock.handlers import DEFAULT_HOST, DEFAULT_PORT, load_server_config
+from mock.store import MockStore
 
 app = Flask(__name__)
 
-# 模拟数据存储（内存中）
-users_db = {}
-messages_db = []
+# 模拟数据存储（内存中，带用户名/邮箱/接收者索引，读写加锁）
+store = MockStore()
+
+# 故障注入（启动时读取 mock.faults，运行时可通过 /admin/faults 修改）
+faults = FaultInjector()
+
+# --serve 模式默认工作线程数
+DEFAULT_THREADS = 32
+
+# --serve 模式最大并发连接数
+CONNECTION_LIMIT = 1000
+
+
+def _respond(result):
+    body, status = result
+    return jsonify(body), status
 
 
-def generate_id() -> int:
-    """生成随机ID"""
-    return random.randint(1000, 9999)
+@app.before_request
+def inject_faults():
+    """故障注入：响应前延迟，按概率直接返回5xx错误"""
+    plan = faults.plan(request.path, request.headers.get(FAULT_SCOPE_HEADER))
+    if plan is None:
+        return None
+    g.fault_plan = plan
+    if plan.delay:
+        time.sleep(plan.delay)
+    if plan.error_status:
+        return jsonify(error_body(plan.error_status)), plan.error_status
+    return None
+
+
+@app.after_request
+def inject_transport_faults(response):
+    """故障注入：限制响应体发送速率，或发送一半后断开连接"""
+    plan = g.get('fault_plan')
+    if plan is None or not (plan.reset or plan.bandwidth):
+        return response
+    body = response.get_data()
+
+    def stream():
+        if plan.reset:
+            # Content-Length 仍为完整长度，客户端读取到一半时连接被服务器关闭
+            yield body[:len(body) // 2]
+            raise ConnectionAbortedError("模拟连接中断（故障注入）")
+        for chunk, wait in throttle_chunks(body, plan.bandwidth):
+            time.sleep(wait)
+            yield chunk
+
+    response.response = stream()
+    return response
 
 
 @app.route('/api/user/info', methods=['GET'])
 def get_user_info():
-    """
-    获取用户信息接口
-    
-    请求参数:
-        user_id: 用户ID（必填）
-        
-    返回:
-        {
-            "code": 200,
-            "message": "success",
-            "data": {
-                "user_id": 1001,
-                "username": "test_user",
-                "email": "test@example.com",
-                "age": 25,
-                "created_at": "2024-01-01 10:00:00"
-            }
-        }
-    """
-    user_id = request.args.get('user_id', type=int)
-    
-    if not user_id:
-        return jsonify({
-            "code": 400,
-            "message": "参数错误: user_id不能为空",
-            "data": None
-        }), 400
-    
-    # 如果用户存在，返回用户信息
-    if user_id in users_db:
-        return jsonify({
-            "code": 200,
-            "message": "success",
-            "data": users_db[user_id]
-        })
-    
-    # 如果用户不存在，返回默认用户信息
-    return jsonify({
-        "code": 200,
-        "message": "success",
-        "data": {
-            "user_id": user_id,
-            "username": f"user_{user_id}",
-            "email": f"user_{user_id}@example.com",
-            "age": random.randint(18, 60),
-            "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
-    })
+    """获取用户信息接口"""
+    return _respond(handlers.get_user_info(store, request.args))
 
 
 @app.route('/api/user/add', methods=['POST'])
 def add_user():
-    """
-    添加用户接口
-    
-    请求体（JSON）:
-        {
-            "username": "test_user",
-            "email": "test@example.com",
-            "age": 25  // 可选
-        }
-        
-    返回:
-        {
-            "code": 200,
-            "message": "用户创建成功",
-            "data": {
-                "user_id": 1001,
-                "username": "test_user",
-                "email": "test@example.com"
-            }
-        }
-    """
-    data = request.get_json()
-    
-    # 参数校验
-    if not data:
-        return jsonify({
-            "code": 400,
-            "message": "请求体不能为空",
-            "data": None
-        }), 400
-    
-    username = data.get('username')
-    email = data.get('email')
-    
-    if not username:
-        return jsonify({
-            "code": 400,
-            "message": "参数错误: username不能为空",
-            "data": None
-        }), 400
-    
-    if not email:
-        return jsonify({
-            "code": 400,
-            "message": "参数错误: email不能为空",
-            "data": None
-        }), 400
-    
-    # 检查邮箱格式（简单验证）
-    if '@' not in email:
-        return jsonify({
-            "code": 400,
-            "message": "参数错误: 邮箱格式不正确",
-            "data": None
-        }), 400
-    
-    # 检查用户名是否已存在
-    for user in users_db.values():
-        if user.get('username') == username:
-            return jsonify({
-                "code": 409,
-                "message": "用户已存在",
-                "data": None
-            }), 409
-    
-    # 创建用户
-    user_id = generate_id()
-    user_data = {
-        "user_id": user_id,
-        "username": username,
-        "email": email,
-        "age": data.get('age', 0),
-        "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    }
-    users_db[user_id] = user_data
-    
-    return jsonify({
-        "code": 200,
-        "message": "用户创建成功",
-        "data": {
-            "user_id": user_id,
-            "username": username,
-            "email": email
-        }
-    }), 200
+    """添加用户接口"""
+    return _respond(handlers.add_user(store, request.get_json()))
 
 
 @app.route('/api/message/list', methods=['GET'])
 def get_message_list():
-    """
-    获取消息列表接口
-    
-    请求参数:
-        page: 页码（默认1）
-        page_size: 每页数量（默认10）
-        
-    返回:
-        {
-            "code": 200,
-            "message": "success",
-            "data": {
-                "total": 25,
-                "page": 1,
-                "page_size": 10,
-                "messages": [
-                    {
-                        "message_id": 1,
-                        "title": "测试消息",
-                        "content": "这是一条测试消息",
-                        "sender_id": 1001,
-                        "receiver_id": 1002,
-                        "created_at": "2024-01-01 10:00:00"
-                    }
-                ]
-            }
-        }
-    """
-    page = request.args.get('page', 1, type=int)
-    page_size = request.args.get('page_size', 10, type=int)
-    
-    # 如果消息列表为空，生成一些示例消息
-    if not messages_db:
-        for i in range(1, 26):
-            messages_db.append({
-                "message_id": i,
-                "title": f"消息标题 {i}",
-                "content": f"这是第 {i} 条消息的内容",
-                "sender_id": random.randint(1000, 1005),
-                "receiver_id": random.randint(1006, 1010),
-                "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            })
-    
-    # 分页计算
-    total = len(messages_db)
-    start = (page - 1) * page_size
-    end = start + page_size
-    messages = messages_db[start:end]
-    
-    return jsonify({
-        "code": 200,
-        "message": "success",
-        "data": {
-            "total": total,
-            "page": page,
-            "page_size": page_size,
-            "messages": messages
-        }
-    })
+    """获取消息列表接口"""
+    return _respond(handlers.get_message_list(store, request.args))
 
 
 @app.route('/api/message/send', methods=['POST'])
 def send_message():
-    """
-    发送消息接口
-    
-    请求体（JSON）:
-        {
-            "receiver_id": 1002,
-            "content": "消息内容",
-            "title": "消息标题"  // 可选
-        }
-        
-    返回:
-        {
-            "code": 200,
-            "message": "消息发送成功",
-            "data": {
-                "message_id": 1
-            }
-        }
-    """
-    data = request.get_json()
-    
-    if not data:
-        return jsonify({
-            "code": 400,
-            "message": "请求体不能为空",
-            "data": None
-        }), 400
-    
-    receiver_id = data.get('receiver_id')
-    content = data.get('content')
-    
-    if not receiver_id:
-        return jsonify({
-            "code": 400,
-            "message": "参数错误: receiver_id不能为空",
-            "data": None
-        }), 400
-    
-    if not content:
-        return jsonify({
-            "code": 400,
-            "message": "参数错误: content不能为空",
-            "data": None
-        }), 400
-    
-    # 创建消息
-    message_id = len(messages_db) + 1
-    message = {
-        "message_id": message_id,
-        "title": data.get('title', '无标题'),
-        "content": content,
-        "sender_id": 1001,  # 模拟发送者ID
-        "receiver_id": receiver_id,
-        "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    }
-    messages_db.append(message)
-    
-    return jsonify({
-        "code": 200,
-        "message": "消息发送成功",
-        "data": {
-            "message_id": message_id
-        }
-    }), 200
+    """发送消息接口"""
+    return _respond(handlers.send_message(store, request.get_json()))
 
 
 @app.route('/health', methods=['GET'])
 def health_check():
     """健康检查接口"""
-    return jsonify({
-        "status": "ok",
-        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    })
+    return _respond(handlers.health_check())
 
 
-if __name__ == '__main__':
+@app.route('/admin/faults', methods=['GET', 'PUT', 'DELETE'])
+def admin_faults():
+    """故障注入管理接口：GET 查询、PUT 替换、DELETE 清除（带 X-Fault-Scope 请求头时只操作该作用域）"""
+    scope = request.headers.get(FAULT_SCOPE_HEADER)
+    if request.method == 'PUT':
+        return _respond(handlers.set_faults(faults, request.get_json(silent=True), scope))
+    if request.method == 'DELETE':
+        return _respond(handlers.clear_faults(faults, scope))
+    return _respond(handlers.get_faults(faults, scope))
+
+
+def serve(host: str, port: int, threads: int = DEFAULT_THREADS):
+    """
+    生产模式：多线程WSGI服务器（waitress），支持HTTP长连接，
+    未安装waitress时退回到Werkzeug多线程服务器（不支持长连接）
+
+    所有线程共享同一个 MockStore，数据一致性由其内部的锁保证，
+    因此只使用单进程多线程，不启动多个进程
+    """
+    try:
+        from waitress import serve as waitress_serve
+    except ImportError:
+        waitress_serve = None
+
+    if waitress_serve is not None:
+        print(f"使用 waitress 多线程服务器，工作线程 {threads}")
+        waitress_serve(
+            app,
+            host=host,
+            port=port,
+            threads=threads,
+            connection_limit=CONNECTION_LIMIT,
+            asyncore_use_poll=True,  # 连接数超过1024时 select() 不可用
+        )
+    else:
+        from werkzeug.serving import make_server
+        print("未安装 waitress（pip install waitress），使用 Werkzeug 多线程服务器")
+        make_server(host, port, app, threaded=True).serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mock服务')
+    parser.add_argument('--serve', action='store_true', help='生产模式：多线程WSGI服务器（关闭调试和自动重载）')
+    parser.add_argument('--host', type=str, help='监听地址（默认读取 mock.host）')
+    parser.add_argument('--port', type=int, help='监听端口（默认读取 mock.port）')
+    parser.add_argument('--threads', type=int, help=f'--serve 模式工作线程数（默认读取 mock.threads，未配置时为 {DEFAULT_THREADS}）')
+    args = parser.parse_args()
+
+    settings = load_server_config()
+    host = args.host or settings.get('host', DEFAULT_HOST)
+    port = args.port or settings.get('port', DEFAULT_PORT)
+    try:
+        faults.configure(settings.get('faults') or {})
+    except ValueError as e:
+        parser.error(f"mock.faults 配置错误: {e}")
+
     print("=" * 50)
     print("Mock服务启动中...")
-    print("服务地址: http://127.0.0.1:5000")
-    print("健康检查: http://127.0.0.1:5000/health")
+    print(f"服务地址: http://{host}:{port}")
+    print(f"健康检查: http://{host}:{port}/health")
+    if settings.get('faults'):
+        print(f"故障注入已启用（管理接口: http://{host}:{port}/admin/faults）")
     print("=" * 50)
-    app.run(host='127.0.0.1', port=5000, debug=True)
+    if args.serve:
+        serve(host, port, args.threads or settings.get('threads', DEFAULT_THREADS))
+    else:
+        app.run(host=host, port=port, debug=True)
+
 
+if __name__ == '__main__':
+    main()
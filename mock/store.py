@@ -0,0 +1,182 @@
+"""
+Mock服务数据存储
+内存中的用户、消息数据及其索引，所有写操作同时维护索引，查询不需要遍历全部数据
+"""
+import random
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+# 启动时预置的示例消息数量
+SEED_MESSAGE_COUNT = 25
+
+# 新用户ID起始值（避开用例中直接查询的默认用户ID 1001 ~ 1010）
+USER_ID_START = 10001
+
+# 消息ID起始值
+MESSAGE_ID_START = 1
+
+
+class IdAllocator:
+    """
+    线程安全的单调递增ID分配器
+
+    多个进程各自分配ID时可按分片交错取值（shard / shards），
+    第 k 个分片依次分配 start + k、start + k + shards、...，各分片之间互不重复
+    """
+
+    def __init__(self, start: int = 1, shard: int = 0, shards: int = 1):
+        """
+        初始化ID分配器
+
+        Args:
+            start: 起始ID
+            shard: 分片序号（从0开始）
+            shards: 分片总数
+        """
+        if shards < 1 or not 0 <= shard < shards:
+            raise ValueError(f"分片参数无效: shard={shard}, shards={shards}")
+        self._next = start + shard
+        self._step = shards
+        self._lock = threading.Lock()
+
+    def next(self) -> int:
+        """分配下一个ID"""
+        with self._lock:
+            value = self._next
+            self._next += self._step
+            return value
+
+
+def now() -> str:
+    """当前时间字符串"""
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+class MockStore:
+    """
+    Mock数据存储
+
+    多线程服务时所有读写都在同一把锁内完成，"检查用户名是否存在 + 写入"等组合操作是原子的
+
+    数据与索引:
+        users: {user_id: 用户}
+        username_index: {username: user_id}
+        email_index: {email: user_id}（同一邮箱对应多个用户时指向最早注册的用户）
+        messages: 全部消息，按追加顺序排列（只追加）
+        receiver_index: {receiver_id: 该接收者的消息列表}，与 messages 共享消息对象
+    """
+
+    def __init__(self, seed_messages: int = SEED_MESSAGE_COUNT, shard: int = 0, shards: int = 1):
+        """
+        初始化数据存储
+
+        Args:
+            seed_messages: 预置的示例消息数量
+            shard: 分片序号（多个进程各自维护数据时用于分配互不重复的ID）
+            shards: 分片总数
+        """
+        self._lock = threading.RLock()
+        self.user_ids = IdAllocator(USER_ID_START, shard, shards)
+        self.message_ids = IdAllocator(MESSAGE_ID_START, shard, shards)
+        self.users: Dict[int, Dict] = {}
+        self.username_index: Dict[str, int] = {}
+        self.email_index: Dict[str, int] = {}
+        self.messages: List[Dict] = []
+        self.receiver_index: Dict[int, List[Dict]] = {}
+        for i in range(1, seed_messages + 1):
+            self._append_message({
+                "message_id": self.message_ids.next(),
+                "title": f"消息标题 {i}",
+                "content": f"这是第 {i} 条消息的内容",
+                "sender_id": random.randint(1000, 1005),
+                "receiver_id": random.randint(1006, 1010),
+                "created_at": now()
+            })
+
+    # ------------------------------------------------------------------
+    # 用户
+    # ------------------------------------------------------------------
+
+    def get_user(self, user_id: int) -> Optional[Dict]:
+        """按ID获取用户，不存在时返回None"""
+        with self._lock:
+            return self.users.get(user_id)
+
+    def find_user_id(self, username: Optional[str] = None, email: Optional[str] = None) -> Optional[int]:
+        """按用户名或邮箱查找用户ID，不存在时返回None"""
+        with self._lock:
+            if username is not None:
+                return self.username_index.get(username)
+            if email is not None:
+                return self.email_index.get(email)
+            return None
+
+    def add_user(self, username: str, email: str, age: int = 0) -> Optional[Dict]:
+        """
+        添加用户
+
+        Returns:
+            新用户数据，用户名已存在时返回None
+        """
+        with self._lock:
+            if username in self.username_index:
+                return None
+            user_id = self.user_ids.next()
+            user = {
+                "user_id": user_id,
+                "username": username,
+                "email": email,
+                "age": age,
+                "created_at": now()
+            }
+            self.users[user_id] = user
+            self.username_index[username] = user_id
+            self.email_index.setdefault(email, user_id)
+            return user
+
+    # ------------------------------------------------------------------
+    # 消息
+    # ------------------------------------------------------------------
+
+    def _append_message(self, message: Dict):
+        with self._lock:
+            self.messages.append(message)
+            self.receiver_index.setdefault(message["receiver_id"], []).append(message)
+
+    def add_message(self, receiver_id: int, content: str, title: str = '无标题', sender_id: int = 1001) -> Dict:
+        """
+        添加消息
+
+        Returns:
+            新消息数据
+        """
+        with self._lock:
+            message = {
+                "message_id": self.message_ids.next(),
+                "title": title,
+                "content": content,
+                "sender_id": sender_id,
+                "receiver_id": receiver_id,
+                "created_at": now()
+            }
+            self._append_message(message)
+            return message
+
+    def list_messages(self, page: int = 1, page_size: int = 10,
+                      receiver_id: Optional[int] = None) -> Tuple[int, List[Dict]]:
+        """
+        分页获取消息
+
+        Args:
+            page: 页码（从1开始）
+            page_size: 每页数量
+            receiver_id: 只返回该接收者的消息（None表示全部）
+
+        Returns:
+            (总数, 当前页消息列表)
+        """
+        start = max((page - 1) * page_size, 0)
+        with self._lock:
+            messages = self.messages if receiver_id is None else self.receiver_index.get(receiver_id, [])
+            return len(messages), messages[start:start + max(page_size, 0)]
@@ -9,8 +9,15 @@ import subprocess
 import pytest
 from pathlib import Path
 from dotenv import load_dotenv
+from core.cassette import CASSETTE_MODE_ENV, CASSETTE_PATH_ENV, RECORD, REPLAY
 from core.config import config
+from core.events import run_event_summary
 from core.logger import get_logger
+from core.history import HistoryStore, get_history_path, order_tests
+from core.load import run_load
+from core.parallel import (
+    TEST_LIST_ENV, collect_test_ids, estimate_durations, parse_shard, run_parallel, write_test_list,
+)
 import shutil
 
 # 加载环境变量
@@ -19,15 +26,83 @@ load_dotenv()
 logger = get_logger(__name__)
 
 
+def log_slowest_tests(report_dir: Path, limit: int = 5):
+    """输出历史平均耗时最长的用例，便于定位慢用例"""
+    history_path = get_history_path(report_dir)
+    if not history_path.exists():
+        return
+    try:
+        with HistoryStore(history_path) as store:
+            slowest = store.get_slowest(limit)
+    except Exception as e:
+        logger.warning(f"读取执行历史失败: {e}")
+        return
+    if slowest:
+        logger.info(f"历史平均耗时最长的 {len(slowest)} 个用例:")
+        for item in slowest:
+            latency = f", 平均响应 {item['latency_avg'] * 1000:.0f}ms" if item['latency_avg'] is not None else ''
+            logger.info(f"  {item['duration']:.2f}s{latency}  {item['nodeid']}")
+
+
 def main():
     parser = argparse.ArgumentParser(description='接口自动化测试框架')
     parser.add_argument('-t', '--test', type=str, help='指定测试文件')
     parser.add_argument('-m', '--mark', type=str, help='运行指定标记用例')
     parser.add_argument('-v', '--verbose', action='store_true', help='详细输出')
     parser.add_argument('-k', '--keyword', type=str, help='按关键字过滤')
+    parser.add_argument('-w', '--workers', type=int, default=1, help='并行工作进程数（按历史耗时均衡分配用例）')
+    parser.add_argument('--shard', type=str, help='只执行指定分片，格式 i/n（如 1/4），用于CI多节点拆分')
+    parser.add_argument('--fail-fast-order', action='store_true', help='最近失败的用例优先执行（其余按历史耗时从长到短）')
+    cassette_group = parser.add_mutually_exclusive_group()
+    cassette_group.add_argument('--record', nargs='?', const='', metavar='PATH',
+                                help='录制请求和响应到录像文件（默认读取 api.cassette.path）')
+    cassette_group.add_argument('--replay', nargs='?', const='', metavar='PATH',
+                                help='从录像文件回放响应，不发送网络请求（默认读取 api.cassette.path）')
+
+    subparsers = parser.add_subparsers(dest='command', metavar='command')
+    load_parser = subparsers.add_parser('load', help='压测模式（按 config/load.yaml 中的场景和阈值执行）')
+    load_parser.add_argument('-f', '--file', type=str, help='压测场景文件（默认 config/load.yaml）')
+    load_parser.add_argument('-d', '--duration', type=float, help='持续时间（秒）')
+    load_parser.add_argument('-c', '--concurrency', type=int, help='并发线程数')
+    load_parser.add_argument('--rps', type=float, help='目标每秒请求数（0表示不限速）')
+    load_parser.add_argument('-s', '--scenario', action='append', help='只执行指定场景（可重复指定）')
+    events_parser = subparsers.add_parser('events', help='汇总结构化请求事件日志（最慢接口、错误聚类）')
+    events_parser.add_argument('files', nargs='*', help='事件文件，支持 .gz（默认 logs/ 下全部 events_*.jsonl）')
+    events_parser.add_argument('-n', '--top', type=int, default=10, help='最慢接口和错误聚类各输出多少条')
+    events_parser.add_argument('--json', action='store_true', help='以JSON输出到标准输出')
 
     args = parser.parse_args()
 
+    if args.command == 'events':
+        return run_event_summary(args.files, top=args.top, as_json=args.json)
+
+    if args.command == 'load':
+        try:
+            return run_load(
+                Path(config.get_report_dir()),
+                load_file=args.file,
+                duration=args.duration,
+                concurrency=args.concurrency,
+                rps=args.rps,
+                scenario_names=args.scenario,
+            )
+        except (FileNotFoundError, ValueError) as e:
+            logger.error(f"压测启动失败: {e}")
+            return 2
+
+    try:
+        shard = parse_shard(args.shard) if args.shard else None
+    except ValueError as e:
+        parser.error(str(e))
+
+    # 录制/回放通过环境变量传递给 pytest 及并行工作进程
+    for mode, path in ((RECORD, args.record), (REPLAY, args.replay)):
+        if path is not None:
+            os.environ[CASSETTE_MODE_ENV] = mode
+            if path:
+                # 命令行中的相对路径相对于当前目录（工作进程在项目根目录执行）
+                os.environ[CASSETTE_PATH_ENV] = os.path.abspath(path)
+
     # pytest 参数
     pytest_args = []
 
@@ -59,20 +134,47 @@ def main():
     # Allure 报告目录
     allure_report_dir = report_dir / "allure_report"
 
-    pytest_args.extend([
-        '--html', f'{report_dir}/report.html',
-        '--self-contained-html',
-        '--junit-xml', f'{report_dir}/junit.xml',
-        '--alluredir', str(allure_results_dir)
-    ])
-
     logger.info("=" * 60)
     logger.info("开始执行自动化测试")
     logger.info(f"测试目录: {test_dir}")
     logger.info(f"报告目录: {report_dir}")
+    if os.getenv(CASSETTE_MODE_ENV):
+        cassette_path = os.getenv(CASSETTE_PATH_ENV) or config.get_api_cassette_config().get('path')
+        logger.info(f"录像模式: {os.environ[CASSETTE_MODE_ENV]}" + (f", 文件 {cassette_path}" if cassette_path else ""))
+    if args.workers > 1 or shard:
+        logger.info(f"并行执行: 工作进程 {args.workers}" + (f", 分片 {args.shard}" if shard else ""))
     logger.info("=" * 60)
 
-    exit_code = pytest.main(pytest_args)
+    if args.workers > 1 or shard:
+        # 多进程 / 分片执行，各进程报告合并到 report/ 下相同位置
+        exit_code = run_parallel(
+            pytest_args,
+            report_dir,
+            allure_results_dir,
+            workers=args.workers,
+            shard=shard,
+            failed_first=args.fail_fast_order,
+        )
+    else:
+        if args.fail_fast_order:
+            # 单进程执行时通过用例清单文件指定执行顺序（由 conftest 排序）
+            test_ids = collect_test_ids([arg for arg in pytest_args if arg not in ('-q', '-v')])
+            with HistoryStore(get_history_path(report_dir)) as store:
+                durations = estimate_durations(test_ids, report_dir / 'junit.xml', store.get_durations(test_ids))
+                ordered = order_tests(test_ids, durations, store.get_recent_failures())
+            order_file = report_dir / 'test_order.txt'
+            write_test_list(ordered, order_file)
+            os.environ[TEST_LIST_ENV] = str(order_file)
+            logger.info(f"按最近失败优先顺序执行 {len(ordered)} 个用例（清单: {order_file}）")
+        pytest_args.extend([
+            '--html', f'{report_dir}/report.html',
+            '--self-contained-html',
+            '--junit-xml', f'{report_dir}/junit.xml',
+            '--alluredir', str(allure_results_dir)
+        ])
+        exit_code = pytest.main(pytest_args)
+
+    log_slowest_tests(report_dir)
 
     # 生成 Allure 报告（依赖本地已安装 Allure 命令行）
     logger.info("正在生成 Allure 报告...")
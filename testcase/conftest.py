@@ -2,11 +2,46 @@
 Pytest配置文件
 定义全局的Fixture和Hook函数
 """
+import asyncio
+import inspect
+import json
+import os
+import uuid
 import pytest
+import yaml
+from pathlib import Path
+from core import metrics
+from core.cassette import REPLAY, cassette_scope, close_cassettes, get_cassette
+from core.config import config
+from core.deadline import time_budget
+from core.events import disable_event_log, enable_event_log
+from core.faults import FAULT_SCOPE_HEADER
+from core.http_client import HttpClient
+from core.history import HistoryStore, ResultCollector, get_history_path
 from core.logger import get_logger
+from core.parallel import TEST_LIST_ENV, WORKER_ID_ENV, read_test_list
+from core.perf import (
+    PERF_SUMMARY_NAME, PerfStats, baseline_failures, build_perf_summary, load_baselines, load_perf_summary,
+    log_perf_summary, perf_summary_html,
+)
+from core.pool import close_shared_adapters, get_pool_stats
+from core.response_cache import get_cache_stats
+from api.user_api import AsyncUserApi
+from api.message_api import AsyncMessageApi
 
 logger = get_logger(__name__)
 
+# 本次执行的用例结果（会话结束时写入历史数据库）
+result_collector = ResultCollector()
+
+# 用例各阶段（setup/call/teardown）的测试报告
+_phase_reports_key = pytest.StashKey[list]()
+
+# 本次执行按接口统计的请求耗时，以及会话结束时生成的性能汇总（显示在 HTML 报告中）
+perf_settings = config.get_report_perf_config()
+perf_stats = PerfStats(perf_settings['routes'])
+perf_summary = None
+
 
 @pytest.fixture(scope="session", autouse=True)
 def setup_session():
@@ -17,19 +52,257 @@ def setup_session():
     logger.info("=" * 60)
     logger.info("测试会话开始")
     logger.info("=" * 60)
+    enable_event_log()
+    perf_enabled = perf_stats_enabled()
+    if perf_enabled:
+        metrics.add_listener(perf_stats.on_request)
     yield
+    disable_event_log()
+    if perf_enabled:
+        metrics.remove_listener(perf_stats.on_request)
+    close_shared_adapters()
+    close_cassettes()
+    report_pool_stats()
+    report_cache_stats()
+    report_perf_summary()
     logger.info("=" * 60)
     logger.info("测试会话结束")
     logger.info("=" * 60)
 
 
+def write_stats_file(name: str, stats: dict):
+    """将统计写入报告目录 {name}.json（并行执行时写入各工作进程的文件 workers/{name}_{worker_id}.json）"""
+    report_dir = Path(config.get_report_dir())
+    worker_id = os.getenv(WORKER_ID_ENV)
+    if worker_id is not None:
+        stats_file = report_dir / 'workers' / f'{name}_{worker_id}.json'
+    else:
+        stats_file = report_dir / f'{name}.json'
+    stats_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(stats_file, 'w', encoding='utf-8') as f:
+        json.dump(stats, f, ensure_ascii=False, indent=2)
+
+
+def report_pool_stats():
+    """输出本次运行的连接池统计，并写入报告目录 pool_stats.json"""
+    stats = get_pool_stats()
+    logger.info(
+        f"连接池统计: 新建 {stats['opened']}, 复用 {stats['reused']}, "
+        f"丢弃 {stats['discarded']}, 复用率 {stats['reuse_rate']:.1%}"
+    )
+    try:
+        write_stats_file('pool_stats', stats)
+    except OSError as e:
+        logger.warning(f"连接池统计写入失败: {e}")
+
+
+def format_cache_stats(stats: dict) -> str:
+    return (
+        f"命中 {stats['hits']}, 未命中 {stats['misses']}, 命中率 {stats['hit_rate']:.1%}, "
+        f"淘汰 {stats['evictions']}, 过期 {stats['expirations']}, 失效 {stats['invalidations']}"
+    )
+
+
+def report_cache_stats():
+    """输出本次运行的GET响应缓存统计（未使用缓存时不输出），并写入报告目录 cache_stats.json"""
+    stats = get_cache_stats()
+    if not stats['hits'] + stats['misses']:
+        return
+    logger.info(f"响应缓存统计: {format_cache_stats(stats)}")
+    try:
+        write_stats_file('cache_stats', stats)
+    except OSError as e:
+        logger.warning(f"响应缓存统计写入失败: {e}")
+
+
+def perf_stats_enabled() -> bool:
+    """是否统计接口性能（回放录像时的耗时没有参考意义，不统计）"""
+    cassette = get_cassette()
+    return perf_settings['enabled'] and not (cassette is not None and cassette.mode == REPLAY)
+
+
+def report_perf_summary():
+    """
+    输出本次运行的接口性能汇总，并写入报告目录 perf_summary.json（没有请求时不输出）
+
+    单进程执行时与上一次运行的 perf_summary.json 对比 p95 并检查性能基线；
+    并行执行时由 run.py 合并各工作进程的结果后对比和检查
+    """
+    global perf_summary
+    if not perf_stats.requests:
+        return
+    previous, baselines = None, []
+    if os.getenv(WORKER_ID_ENV) is None:
+        previous = load_perf_summary(Path(config.get_report_dir()) / f'{PERF_SUMMARY_NAME}.json')
+        try:
+            baselines = load_baselines(perf_settings['baselines'])
+        except (OSError, ValueError, yaml.YAMLError) as e:
+            logger.error(f"性能基线读取失败，跳过检查: {e}")
+    perf_summary = build_perf_summary(perf_stats, previous, perf_settings, baselines)
+    log_perf_summary(perf_summary)
+    try:
+        write_stats_file(PERF_SUMMARY_NAME, perf_summary)
+    except OSError as e:
+        logger.warning(f"接口性能汇总写入失败: {e}")
+
+
 @pytest.fixture(scope="function", autouse=True)
-def setup_test():
+def setup_test(request):
     """
     测试函数级别的Fixture
-    在每个测试用例执行前后执行
+    在每个测试用例执行前后执行，并设置:
+    1. 用例时间预算（api.test_time_budget，可用 @pytest.mark.time_budget(秒) 覆盖），用例及其Fixture中的所有请求共同消耗
+    2. 录像作用域（用例 nodeid），录制/回放时按用例匹配请求
+    3. 当前用例（用例 nodeid），请求指标和结构化事件带上 test_id
     """
+    marker = request.node.get_closest_marker("time_budget")
+    seconds = marker.args[0] if marker and marker.args else config.get_test_time_budget()
     logger.info("-" * 60)
-    yield
+    with time_budget(seconds), cassette_scope(request.node.nodeid), metrics.test_scope(request.node.nodeid):
+        yield
     logger.info("-" * 60)
 
+
+@pytest.fixture(scope="session")
+def event_loop():
+    """
+    会话级别的事件循环
+    所有 async def 用例共享同一个事件循环，连接可跨用例复用
+    """
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.run_until_complete(loop.shutdown_asyncgens())
+    loop.close()
+
+
+def pytest_collection_modifyitems(config, items):
+    """
+    收集完成后处理用例:
+    1. 指定了用例清单（LIQUID_TEST_LIST，由 run.py 并行/分片执行时生成）时，只保留清单中的用例并按清单顺序执行
+    2. 为 async def 用例自动注入会话事件循环
+    3. 回放模式下跳过依赖真实网络时序的用例（live 标记）
+    """
+    list_file = os.getenv(TEST_LIST_ENV)
+    if list_file:
+        order = {nodeid: index for index, nodeid in enumerate(read_test_list(list_file))}
+        selected = [item for item in items if item.nodeid in order]
+        deselected = [item for item in items if item.nodeid not in order]
+        selected.sort(key=lambda item: order[item.nodeid])
+        if deselected:
+            config.hook.pytest_deselected(items=deselected)
+        items[:] = selected
+    
+    for item in items:
+        if isinstance(item, pytest.Function) and inspect.iscoroutinefunction(item.obj):
+            if "event_loop" not in item.fixturenames:
+                item.fixturenames.append("event_loop")
+    
+    cassette = get_cassette()
+    if cassette is not None and cassette.mode == REPLAY:
+        skip_live = pytest.mark.skip(reason="回放模式下跳过必须访问真实后端的用例")
+        for item in items:
+            if item.get_closest_marker("live"):
+                item.add_marker(skip_live)
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_pyfunc_call(pyfuncitem):
+    """在会话事件循环上执行 async def 用例"""
+    if not inspect.iscoroutinefunction(pyfuncitem.obj):
+        return None
+    loop = pyfuncitem.funcargs["event_loop"]
+    params = inspect.signature(pyfuncitem.obj).parameters
+    kwargs = {name: pyfuncitem.funcargs[name] for name in params if name in pyfuncitem.funcargs}
+    loop.run_until_complete(pyfuncitem.obj(**kwargs))
+    return True
+
+
+@pytest.fixture(scope="session")
+def async_user_api(event_loop):
+    """提供AsyncUserApi实例的Fixture（会话内共享连接），会话结束后关闭"""
+    api = AsyncUserApi()
+    yield api
+    event_loop.run_until_complete(api.client.close())
+
+
+@pytest.fixture(scope="session")
+def async_message_api(event_loop):
+    """提供AsyncMessageApi实例的Fixture（会话内共享连接），会话结束后关闭"""
+    api = AsyncMessageApi()
+    yield api
+    event_loop.run_until_complete(api.client.close())
+
+
+@pytest.fixture
+def fault_headers():
+    """
+    Mock故障注入作用域请求头（每个用例唯一）
+    带该请求头的请求只使用本用例通过 /admin/faults 设置的故障规则，并行执行时不影响其他用例；用例结束后清除该作用域
+    """
+    headers = {FAULT_SCOPE_HEADER: uuid.uuid4().hex}
+    yield headers
+    client = HttpClient(base_url=config.get_api_base_url(), timeout=config.get_api_timeout())
+    client.delete("/admin/faults", headers=headers)
+    client.close()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    """记录每个用例的耗时、结果以及发出的请求耗时"""
+    result_collector.start_test()
+    metrics.add_listener(result_collector.on_request)
+    item.stash[_phase_reports_key] = []
+    try:
+        yield
+    finally:
+        metrics.remove_listener(result_collector.on_request)
+    
+    reports = item.stash.get(_phase_reports_key, [])
+    if not reports:
+        return
+    outcome = 'passed'
+    for report in reports:
+        if report.failed:
+            outcome = 'failed' if report.when == 'call' else 'error'
+            break
+        if report.skipped:
+            outcome = 'skipped'
+    duration = sum(report.duration for report in reports)
+    result_collector.finish_test(item.nodeid, outcome, duration)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """
+    收集用例各阶段（setup/call/teardown）的结果
+
+    生成 teardown 报告前将用例所有请求的阶段耗时合计写入 user_properties（JUnit 报告中的 properties）
+    """
+    if call.when == 'teardown':
+        for name, value in result_collector.request_timing().items():
+            item.user_properties.append((f'request_{name}', value))
+    outcome = yield
+    item.stash.setdefault(_phase_reports_key, []).append(outcome.get_result())
+
+
+def pytest_sessionfinish(session, exitstatus):
+    """性能基线未通过时以失败退出，并将本次执行结果写入 report/history.db"""
+    if baseline_failures(perf_summary) and session.exitstatus == pytest.ExitCode.OK:
+        session.exitstatus = pytest.ExitCode.TESTS_FAILED
+    if not config.get('report.history', True) or not result_collector.results:
+        return
+    try:
+        with HistoryStore(get_history_path(config.get_report_dir())) as store:
+            store.save_run(result_collector.results, worker=os.getenv(WORKER_ID_ENV))
+    except Exception as e:
+        logger.warning(f"执行历史写入失败: {e}")
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_html_results_summary(prefix, summary, postfix):
+    """在 pytest-html 报告摘要中显示响应缓存统计和接口性能表格"""
+    stats = get_cache_stats()
+    if stats['hits'] + stats['misses']:
+        prefix.append(f"<p>响应缓存: {format_cache_stats(stats)}</p>")
+    if perf_summary:
+        postfix.append(perf_summary_html(perf_summary))
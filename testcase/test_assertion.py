@@ -0,0 +1,80 @@
+"""
+断言工具测试用例
+使用本地构造的响应验证列表类断言的比较规则与错误收集
+"""
+import json
+import pytest
+import requests
+from core.assertion import Assertion
+from core.json_path import compile_path
+from core.logger import get_logger
+from core.response import parse_json
+
+logger = get_logger(__name__)
+
+
+def make_response(data) -> requests.Response:
+    """构造响应体为 data 的JSON响应"""
+    response = requests.Response()
+    response.status_code = 200
+    response._content = json.dumps(data).encode('utf-8')
+    return response
+
+
+class TestAssertion:
+    """断言工具测试类"""
+
+    def test_assert_unique_json_equality(self):
+        """
+        测试用例1: 唯一性断言按JSON语义比较
+        验证: 布尔值与数值不视为重复，1 与 1.0、键顺序不同的相同对象视为重复
+        """
+        Assertion.assert_unique(make_response({"values": [1, True, 0, False, None, "1"]}), "values[*]")
+
+        with pytest.raises(AssertionError, match=r"存在重复值 \[1\.0\]"):
+            Assertion.assert_unique(make_response({"values": [1, 1.0]}), "values[*]")
+        with pytest.raises(AssertionError, match="存在重复值"):
+            Assertion.assert_unique(make_response({"values": [{"a": 1, "b": 2}, {"b": 2, "a": 1}]}), "values[*]")
+
+    def test_assert_all_predicate_exception(self):
+        """
+        测试用例2: 批量断言中判断条件抛出异常
+        验证: 异常按该值不满足记录（带异常类型与信息），其余值和其余断言继续检查
+        """
+        response = make_response({"items": [{"n": 1}, {"n": None}, {"n": -1}], "code": 1})
+
+        with pytest.raises(AssertionError) as exc_info:
+            with Assertion.batch(response) as check:
+                check.assert_all("items[*].n", lambda n: n > 0, "n为正数")
+                check.assert_json_equal({"code": 0})
+        message = str(exc_info.value)
+        assert "[1]=None (TypeError: " in message
+        assert "[2]=-1" in message
+        assert "2 个不满足「n为正数」" in message
+        assert "字段 code 不匹配" in message
+
+    def test_json_equality_in_filter_and_assert_all(self):
+        """
+        测试用例3: 过滤器与条件断言的相等比较按JSON语义
+        验证: == / != 过滤时 True 与 1 不相等、1 与 1.0 相等；assert_all 的值比较规则相同
+        """
+        data = {"items": [{"flag": 1}, {"flag": True}, {"flag": 1.0}, {"flag": "1"}]}
+        assert compile_path("items[?(@.flag == 1)]").find(data) == [{"flag": 1}, {"flag": 1.0}]
+        assert compile_path("items[?(@.flag != 1)]").find(data) == [{"flag": True}, {"flag": "1"}]
+        assert compile_path("items[?(@.flag == true)]").find(data) == [{"flag": True}]
+
+        Assertion.assert_all(make_response({"ids": [1, 1.0]}), "ids[*]", 1)
+        Assertion.assert_all(make_response({"tags": [[1, 2], [1.0, 2]]}), "tags[*]", [1, 2])
+        with pytest.raises(AssertionError, match=r"1 个不满足「等于 1」: \[1\]=True"):
+            Assertion.assert_all(make_response({"ids": [1, True]}), "ids[*]", 1)
+
+    def test_parse_json_beyond_orjson(self):
+        """
+        测试用例4: orjson 不支持的JSON内容
+        验证: 超出64位的整数与 NaN 回退到标准库解析，断言正常执行
+        """
+        response = make_response({"id": 2 ** 70, "score": float("nan")})
+        data = parse_json(response)
+        assert data["id"] == 2 ** 70
+        assert data["score"] != data["score"]
+        Assertion.assert_json_equal(response, {"id": 2 ** 70})
@@ -0,0 +1,53 @@
+"""
+异步接口测试用例
+使用AsyncUserApi / AsyncMessageApi 在共享事件循环上并发执行请求
+"""
+import asyncio
+import pytest
+import requests
+from core.assertion import Assertion
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class TestAsyncApi:
+    """异步API测试类"""
+    
+    async def test_async_get_user_info(self, async_user_api):
+        """
+        测试用例1: 异步获取用户信息
+        验证: 状态码200，返回用户信息，可直接复用同步断言
+        """
+        response = await async_user_api.client.get("/api/user/info", params={"user_id": 1001})
+        
+        Assertion.assert_status_code(response, 200)
+        Assertion.assert_json_contains(response, "code", 200)
+        Assertion.assert_json_contains(response, "data.user_id", 1001)
+        Assertion.assert_response_time(response, 1.0)
+    
+    async def test_async_concurrent_send_message(self, async_message_api):
+        """
+        测试用例2: 并发发送消息
+        验证: 多个请求同时在途，全部发送成功且消息ID互不重复
+        """
+        results = await asyncio.gather(*[
+            async_message_api.send_message(receiver_id=1002, content=f"并发消息 {i}")
+            for i in range(20)
+        ])
+        
+        assert len(results) == 20
+        assert all(result["code"] == 200 for result in results)
+        # 并发发送时消息ID不重复
+        assert len({result["data"]["message_id"] for result in results}) == 20
+    
+    async def test_async_get_user_info_missing_param(self, async_user_api):
+        """
+        测试用例3: 异步获取用户信息 - 缺少参数
+        验证: raise_for_status 与同步客户端一致，抛出 HTTPError
+        """
+        response = await async_user_api.client.get("/api/user/info")
+        Assertion.assert_status_code(response, 400)
+        
+        with pytest.raises(requests.exceptions.HTTPError):
+            response.raise_for_status()
@@ -0,0 +1,109 @@
+"""
+请求录制与回放测试用例
+先以录制模式请求Mock服务写入临时录像文件，再以回放模式验证响应来自录像、不发送网络请求
+"""
+import pytest
+import requests
+from core.assertion import Assertion
+from core.async_http_client import AsyncHttpClient
+from core.cassette import CassetteMissError
+from core.config import config
+from core.http_client import HttpClient
+from core.logger import get_logger
+from core.resilience import RetryPolicy
+
+logger = get_logger(__name__)
+
+
+def _no_network(*args, **kwargs):
+    raise AssertionError("回放模式下不应发送网络请求")
+
+
+class TestCassette:
+    """请求录制与回放测试类"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        """每个用例使用独立的录像文件"""
+        self.path = str(tmp_path / "cassette.jsonl")
+        self.clients = []
+        yield
+        for client in self.clients:
+            if client.cassette is not None:
+                client.cassette.close()
+            if isinstance(client, HttpClient):
+                client.close()
+
+    def make_client(self, mode, base_url=None, client_class=HttpClient):
+        """创建指定录像模式的客户端（不重试、不熔断）"""
+        client = client_class(
+            base_url=base_url or config.get_api_base_url(),
+            timeout=config.get_api_timeout(),
+            retry_policy=RetryPolicy(max_retries=0),
+            circuit_breaker={'enabled': False},
+            cassette={'mode': mode, 'path': self.path}
+        )
+        self.clients.append(client)
+        return client
+
+    @pytest.mark.live
+    def test_record_and_replay(self, monkeypatch):
+        """
+        测试用例1: 录制后回放
+        验证: 回放不发送网络请求，响应与录制时一致；参数顺序和JSON字段顺序不影响匹配
+        """
+        recorder = self.make_client('record')
+        recorded_user = recorder.get("/api/user/info", params={"user_id": 1001, "username": ""})
+        recorded_send = recorder.post("/api/message/send", json_data={"receiver_id": 1002, "content": "录像"})
+        Assertion.assert_status_code(recorded_send, 200)
+
+        player = self.make_client('replay')
+        monkeypatch.setattr(player.session, "request", _no_network)
+
+        response = player.get("/api/user/info", params={"username": "", "user_id": 1001})
+        Assertion.assert_status_code(response, 200)
+        assert response.json() == recorded_user.json()
+
+        response = player.post("/api/message/send", json_data={"content": "录像", "receiver_id": 1002})
+        Assertion.assert_json_contains(response, "data.message_id", recorded_send.json()["data"]["message_id"])
+
+    def test_replay_recorded_error(self):
+        """
+        测试用例2: 录制请求异常
+        验证: 回放时抛出与录制时相同类型的异常
+        """
+        recorder = self.make_client('record', base_url="http://127.0.0.1:1")
+        with pytest.raises(requests.exceptions.ConnectionError):
+            recorder.get("/health")
+
+        player = self.make_client('replay', base_url="http://127.0.0.1:1")
+        with pytest.raises(requests.exceptions.ConnectionError):
+            player.get("/health")
+
+    @pytest.mark.live
+    def test_replay_miss(self):
+        """
+        测试用例3: 回放未录制的请求
+        验证: 抛出CassetteMissError
+        """
+        recorder = self.make_client('record')
+        recorder.get("/health")
+
+        player = self.make_client('replay')
+        with pytest.raises(CassetteMissError):
+            player.get("/api/user/info", params={"user_id": 1001})
+
+    @pytest.mark.live
+    async def test_async_replay_sync_recording(self):
+        """
+        测试用例4: 异步客户端回放同步客户端的录像
+        验证: 相同请求的匹配键一致，回放结果与录制时一致
+        """
+        recorder = self.make_client('record')
+        recorded = recorder.get("/api/message/list", params={"page": 1, "page_size": 5})
+
+        player = self.make_client('replay', client_class=AsyncHttpClient)
+        response = await player.get("/api/message/list", params={"page_size": 5, "page": 1})
+        await player.close()
+        Assertion.assert_status_code(response, 200)
+        assert response.json() == recorded.json()
@@ -0,0 +1,134 @@
+"""
+结构化请求事件测试用例
+验证请求事件的字段（用例ID、请求ID、字节数）以及事件文件的流式汇总
+"""
+import gzip
+import io
+import json
+import pytest
+from core import metrics
+from core.config import config
+from core.events import disable_event_log, enable_event_log, record_event, summarize_events
+from core.http_client import HttpClient
+from core.logger import BufferedFileHandler, JsonFormatter, get_event_logger, get_logger
+from core.perf import PerfStats
+
+logger = get_logger(__name__)
+
+
+class TestEvents:
+    """结构化请求事件测试类"""
+
+    @pytest.fixture
+    def event_file(self, tmp_path):
+        """将事件直接写入临时文件（不经过后台写日志线程）"""
+        path = tmp_path / "events.jsonl"
+        handler = BufferedFileHandler(path, buffer_size=0)
+        handler.setFormatter(JsonFormatter())
+        event_logger = get_event_logger()
+        event_logger.addHandler(handler)
+        # 开启 log.json_events 时会话级监听器已注册，用例结束后按配置恢复
+        metrics.add_listener(record_event)
+        yield path
+        disable_event_log()
+        enable_event_log()
+        event_logger.removeHandler(handler)
+        handler.close()
+
+    @pytest.mark.live
+    def test_request_events(self, request, event_file):
+        """
+        测试用例1: 每次请求写一行紧凑JSON
+        验证: 事件带有当前用例、请求ID、状态码以及请求/响应体字节数
+        """
+        client = HttpClient(base_url=config.get_api_base_url(), timeout=config.get_api_timeout())
+        payload = {"receiver_id": 1002, "content": "结构化日志"}
+        sent = client.post("/api/message/send", json_data=payload)
+        info = client.get("/api/user/info", params={"user_id": 1001})
+        client.close()
+
+        lines = event_file.read_text(encoding='utf-8').splitlines()
+        assert len(lines) == 2
+        assert all(line.startswith('{"ts":') and '": ' not in line for line in lines)
+        send_event, info_event = map(json.loads, lines)
+
+        assert send_event["method"] == "POST"
+        assert send_event["url"].endswith("/api/message/send")
+        assert send_event["status_code"] == 200
+        assert send_event["test_id"] == request.node.nodeid
+        assert send_event["attempt"] == 0
+        assert send_event["request_bytes"] == len(json.dumps(payload).encode('utf-8'))
+        assert send_event["response_bytes"] == len(sent.content)
+        assert info_event["response_bytes"] == len(info.content)
+        assert info_event["request_bytes"] == 0
+        assert send_event["request_id"] != info_event["request_id"]
+
+    @pytest.mark.live
+    def test_stream_body_events(self, event_file):
+        """
+        测试用例2: 文件、迭代器作为请求体
+        验证: 请求正常发出（服务端按 Content-Type 返回415），无法确定大小的请求体字节数记为null
+        """
+        client = HttpClient(base_url=config.get_api_base_url(), timeout=config.get_api_timeout())
+        file_response = client.post("/api/user/add", data=io.BytesIO(b"abc"))
+        iter_response = client.post("/api/user/add", data=iter([b"a", b"b"]))
+        client.close()
+
+        assert file_response.status_code == 415
+        assert iter_response.status_code == 415
+        events = [json.loads(line) for line in event_file.read_text(encoding='utf-8').splitlines()]
+        assert [event["request_bytes"] for event in events] == [None, None]
+
+    def test_summarize_events(self, tmp_path):
+        """
+        测试用例3: 流式汇总事件文件
+        验证: 按 p95 排列最慢接口；错误按 接口 + 异常类型/状态码 聚类；支持 .gz 文件并跳过无法解析的行
+        """
+        def event(method, url, elapsed, status_code=200, error=None, test_id="t1"):
+            return json.dumps({"method": method, "url": url, "elapsed": elapsed, "status_code": status_code,
+                               "error": error, "test_id": test_id})
+
+        plain = tmp_path / "events_20250101.jsonl"
+        plain.write_text("\n".join([
+            event("GET", "/fast", 0.01),
+            event("GET", "/slow", 0.5),
+            event("GET", "/slow", 0.1, status_code=503, test_id="t2"),
+            '{"method": "GET", "url": "/fa',
+        ]) + "\n", encoding='utf-8')
+        compressed = tmp_path / "events_20250101.1.jsonl.gz"
+        with gzip.open(compressed, 'wt', encoding='utf-8') as f:
+            f.write(event("GET", "/fast", 0.02) + "\n")
+            f.write(event("POST", "/fast", 0.03, status_code=None, error="ReadTimeout") + "\n")
+            f.write(event("GET", "/slow", 0.2, status_code=503, test_id="t3") + "\n")
+
+        summary = summarize_events([plain, compressed]).to_dict(top=2)
+        assert summary["events"] == 6
+        assert summary["malformed"] == 1
+        assert summary["endpoints"] == 3
+        assert [row["endpoint"] for row in summary["slowest"]] == ["GET /slow", "POST /fast"]
+        slow = summary["slowest"][0]
+        assert slow["count"] == 3
+        assert slow["errors"] == 2
+        assert slow["max"] == pytest.approx(500, rel=0.01)
+
+        assert summary["errors"][0] == {"endpoint": "GET /slow", "error": "HTTP 503", "count": 2, "tests": ["t2", "t3"]}
+        assert summary["errors"][1]["error"] == "ReadTimeout"
+
+    def test_summarize_events_by_route(self, tmp_path):
+        """
+        测试用例4: 按路由模板汇总事件
+        验证: 接口名称与 perf_summary.json 相同，路径中的ID段归并为 {id}，也可按配置的路由模板归并
+        """
+        events_file = tmp_path / "events_20250101.jsonl"
+        events_file.write_text("\n".join(json.dumps({"method": "GET", "url": url, "elapsed": 0.01, "status_code": 200})
+                                          for url in ("http://127.0.0.1:5000/api/order/1",
+                                                      "http://127.0.0.1:5000/api/order/2",
+                                                      "http://127.0.0.1:5000/api/user/alice")) + "\n",
+                               encoding='utf-8')
+
+        summary = summarize_events([events_file]).to_dict()
+        assert sorted(row["endpoint"] for row in summary["slowest"]) == ["GET /api/order/{id}", "GET /api/user/alice"]
+        assert PerfStats().endpoint("GET", "http://127.0.0.1:5000/api/order/1") == "GET /api/order/{id}"
+
+        summary = summarize_events([events_file], routes=["/api/user/{username}"]).to_dict()
+        assert "GET /api/user/{username}" in [row["endpoint"] for row in summary["slowest"]]
@@ -0,0 +1,78 @@
+"""
+压测冒烟用例
+在功能测试流水线中执行短时间压测，发现明显的延迟退化
+"""
+import pytest
+from api.message_api import MessageApi
+from api.user_api import UserApi
+from core.histogram import LatencyHistogram
+from core.load import LoadRunner, Scenario, check_thresholds
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class TestLoad:
+    """压测冒烟测试类"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        """每个测试前的准备工作"""
+        self.user_api = UserApi()
+        self.message_api = MessageApi()
+        yield
+        self.user_api.client.close()
+        self.message_api.client.close()
+
+    @pytest.mark.live
+    def test_load_smoke(self):
+        """
+        测试用例1: 短时间并发压测
+        验证: 没有错误，吞吐量和延迟分位数在阈值内，各场景请求数符合权重比例
+        """
+        scenarios = [
+            Scenario('user_info', self.user_api.get_user_info, {'user_id': 1001}, weight=2),
+            Scenario('message_list', self.message_api.get_message_list, {'page': 1, 'page_size': 10}),
+        ]
+        result = LoadRunner(scenarios, duration=1.0, concurrency=4).run()
+        summary = result.to_dict()
+        logger.info(f"压测结果: {summary['total']}")
+
+        violations = check_thresholds(summary, {'max_error_rate': 0, 'min_throughput': 10, 'p99': 1000})
+        assert not violations, violations
+
+        counts = {name: stats['requests'] for name, stats in summary['scenarios'].items()}
+        assert sum(counts.values()) == summary['total']['requests']
+        assert abs(counts['user_info'] - 2 * counts['message_list']) <= 4
+
+    @pytest.mark.live
+    def test_load_target_rps(self):
+        """
+        测试用例2: 按目标RPS压测
+        验证: 实际请求数接近 RPS * 持续时间
+        """
+        scenarios = [Scenario('user_info', self.user_api.get_user_info, {'user_id': 1001})]
+        result = LoadRunner(scenarios, duration=1.0, concurrency=4, rps=50).run()
+
+        assert 45 <= result.histogram.count <= 50
+        assert not result.errors
+
+    def test_histogram_merge(self):
+        """
+        测试用例3: 延迟直方图合并
+        验证: 分别记录后合并与记入同一个直方图结果一致，分位数相对误差在精度内
+        """
+        values = [i / 1000 for i in range(1, 1001)]  # 1ms ~ 1000ms
+        whole = LatencyHistogram()
+        parts = [LatencyHistogram(), LatencyHistogram()]
+        for i, value in enumerate(values):
+            whole.record(value)
+            parts[i % 2].record(value)
+        merged = LatencyHistogram.merged(parts)
+
+        restored = LatencyHistogram.from_dict(whole.to_dict())
+        assert merged.buckets == restored.buckets
+        assert (merged.count, merged.min, merged.max) == (restored.count, restored.min, restored.max)
+        assert merged.mean == pytest.approx(restored.mean)
+        for percent, expected in ((50, 0.5), (99, 0.99), (99.9, 0.999)):
+            assert merged.percentile(percent) == pytest.approx(expected, rel=0.01)
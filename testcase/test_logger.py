@@ -0,0 +1,122 @@
+"""
+日志写入测试用例
+验证日志记录器只挂 QueueHandler、日志文件的写缓冲、后台线程空闲时写入缓冲内容，以及日志切分、压缩和清理
+"""
+import gzip
+import logging
+import os
+import queue
+import time
+from logging.handlers import QueueHandler
+from core.config import config
+from core.logger import (
+    BufferedFileHandler, FlushingQueueListener, RotatingLogHandler, compress_file, flush_logs, get_log_file, get_logger
+)
+
+logger = get_logger(__name__)
+
+
+class TestLogger:
+    """日志写入测试类"""
+
+    def make_record(self, message, level=logging.INFO):
+        return logging.LogRecord("test_logger", level, __file__, 0, message, None, None)
+
+    def test_queue_handler(self):
+        """
+        测试用例1: 用例线程只将日志放入队列
+        验证: 开启 log.queue 时记录器只挂 QueueHandler；flush_logs 后日志已写入文件
+        """
+        if config.get_log_queue_enabled():
+            assert [type(handler) for handler in logger.handlers] == [QueueHandler]
+
+        logger.info("日志队列测试")
+        flush_logs()
+        assert "日志队列测试" in get_log_file().read_text(encoding='utf-8')
+
+    def test_buffered_file_handler(self, tmp_path):
+        """
+        测试用例2: 日志文件写缓冲
+        验证: INFO 日志先留在缓冲区；WARNING 及以上级别立即写入；关闭时写入剩余内容
+        """
+        path = tmp_path / "buffered.log"
+        handler = BufferedFileHandler(path, flush_interval=60)
+        handler.handle(self.make_record("第一条"))
+        assert not path.exists()
+
+        handler.handle(self.make_record("第二条", logging.WARNING))
+        assert path.read_text(encoding='utf-8').splitlines() == ["第一条", "第二条"]
+
+        handler.handle(self.make_record("第三条"))
+        handler.close()
+        assert path.read_text(encoding='utf-8').splitlines() == ["第一条", "第二条", "第三条"]
+
+    def test_listener_flushes_when_idle(self, tmp_path):
+        """
+        测试用例3: 后台线程空闲时写入缓冲内容
+        验证: 没有新日志时缓冲内容在 flush_interval 后写入文件
+        """
+        path = tmp_path / "listener.log"
+        log_queue = queue.SimpleQueue()
+        handler = BufferedFileHandler(path, flush_interval=60)
+        listener = FlushingQueueListener(log_queue, handler, flush_interval=0.05)
+        listener.start()
+        try:
+            QueueHandler(log_queue).handle(self.make_record("空闲写入"))
+            deadline = time.monotonic() + 2
+            while not (path.exists() and "空闲写入" in path.read_text(encoding='utf-8')):
+                assert time.monotonic() < deadline, "缓冲中的日志未写入文件"
+                time.sleep(0.02)
+        finally:
+            listener.stop()
+            handler.close()
+
+    def test_rotate_by_size_and_day(self, tmp_path):
+        """
+        测试用例4: 按大小和日期切分
+        验证: 超过 max_bytes 或日期变化时切分为 test_YYYYMMDD.N.log 并压缩，之后写入新文件
+        """
+        handler = RotatingLogHandler(tmp_path, max_bytes=100, buffer_size=0)
+        today = handler._date
+        line = "x" * 59
+        handler.handle(self.make_record(line))
+        handler.handle(self.make_record(line))
+        handler.handle(self.make_record(line))
+
+        handler._today = lambda: "20991231"
+        handler.handle(self.make_record("新的一天"))
+        handler.close()
+
+        assert sorted(path.name for path in tmp_path.iterdir()) == [
+            f"test_{today}.1.log.gz", f"test_{today}.2.log.gz", "test_20991231.log"
+        ]
+        with gzip.open(tmp_path / f"test_{today}.1.log.gz", 'rt', encoding='utf-8') as f:
+            assert f.read() == f"{line}\n{line}\n"
+        with gzip.open(tmp_path / f"test_{today}.2.log.gz", 'rt', encoding='utf-8') as f:
+            assert f.read() == f"{line}\n"
+        assert (tmp_path / "test_20991231.log").read_text(encoding='utf-8') == "新的一天\n"
+
+    def test_retention(self, tmp_path):
+        """
+        测试用例5: 旧日志清理
+        验证: 之前运行留下的日志被压缩；超过 retention_days 或 max_backups 的旧日志被删除
+        """
+        now = time.time()
+        files = {
+            "test_20200101.log": now - 10 * 86400,
+            "test_20261010.1.log.gz": now - 3 * 3600,
+            "test_20261010.2.log.gz": now - 2 * 3600,
+            "test_20261010.3.log": now - 3600,
+            "other.log": now - 10 * 86400,
+        }
+        for name, mtime in files.items():
+            (tmp_path / name).write_text(name, encoding='utf-8')
+            os.utime(tmp_path / name, (mtime, mtime))
+
+        handler = RotatingLogHandler(tmp_path, retention_days=1, max_backups=2)
+        handler.close()
+
+        assert sorted(path.name for path in tmp_path.iterdir()) == [
+            "other.log", "test_20261010.2.log.gz", "test_20261010.3.log.gz"
+        ]
+        assert compress_file(tmp_path / "test_20200101.log") is None
@@ -7,7 +7,7 @@ from pathlib import Path
 from api.message_api import MessageApi
 from core.assertion import Assertion
 from core.logger import get_logger
-from utils.common import load_yaml
+from utils.common import get_timestamp_ms, load_yaml
 
 logger = get_logger(__name__)
 
@@ -230,3 +230,80 @@ class TestMessageApi:
         assert message_id is not None, "消息ID不应为空"
         assert isinstance(message_id, int), "消息ID应为整数"
 
+    
+    def test_get_message_list_fields_by_path(self):
+        """
+        测试用例12: 获取消息列表 - JSON路径批量断言
+        验证: 使用通配符/过滤器一次检查列表中所有消息
+        """
+        response = self.message_api.client.get(
+            "/api/message/list",
+            params={"page": 1, "page_size": 20}
+        )
+        
+        Assertion.assert_status_code(response, 200)
+        Assertion.assert_json_contains(response, "data.messages[0].message_id")
+        Assertion.assert_count(response, "data.messages[*]", min_count=1, max_count=20)
+        Assertion.assert_all(response, "data.messages[*].message_id", int)
+        Assertion.assert_all(response, "data.messages[*].content", lambda c: len(c) > 0, "内容非空")
+        Assertion.assert_count(response, "data.messages[?(@.message_id > 0)]", min_count=1)
+        Assertion.assert_unique(response, "data.messages[*].message_id")
+    
+    def test_get_message_list_schema(self):
+        """
+        测试用例13: 获取消息列表 - Schema校验
+        验证: 响应结构符合 config/schemas/message_list.yaml
+        """
+        response = self.message_api.client.get(
+            "/api/message/list",
+            params={"page": 1, "page_size": 20}
+        )
+        
+        Assertion.assert_status_code(response, 200)
+        Assertion.assert_schema(response, "message_list")
+    
+    def test_get_message_list_by_receiver(self):
+        """
+        测试用例14: 按接收者获取消息列表
+        验证: 只返回该接收者的消息，总数和分页正确
+        """
+        # 每次执行使用新的接收者，重复执行时不受之前发送的消息影响
+        receiver_id = get_timestamp_ms()
+        sent_ids = [
+            self.message_api.send_message(receiver_id=receiver_id, content=f"接收者过滤 {i}")["data"]["message_id"]
+            for i in range(3)
+        ]
+        
+        response = self.message_api.client.get(
+            "/api/message/list",
+            params={"page": 1, "page_size": 2, "receiver_id": receiver_id}
+        )
+        Assertion.assert_status_code(response, 200)
+        Assertion.assert_json_contains(response, "data.total", 3)
+        Assertion.assert_count(response, "data.messages[*]", 2)
+        Assertion.assert_all(response, "data.messages[*].receiver_id", receiver_id)
+        
+        page2 = self.message_api.get_message_list(page=2, page_size=2, receiver_id=receiver_id)
+        message_ids = [msg["message_id"] for msg in response.json()["data"]["messages"] + page2["data"]["messages"]]
+        assert message_ids == sent_ids
+    
+    def test_get_message_list_batch_assertion_failures(self):
+        """
+        测试用例15: 获取消息列表 - 列表类批量断言多项失败
+        验证: 只抛出一个AssertionError，汇总列出数量、条件和字段值的全部不通过项
+        """
+        response = self.message_api.client.get("/api/message/list", params={"page": 1, "page_size": 2})
+        
+        with pytest.raises(AssertionError) as exc_info:
+            with Assertion.batch(response) as check:
+                check.assert_status_code(200)
+                check.assert_count("data.messages[*]", 3)
+                check.assert_all("data.messages[*].message_id", lambda value: value < 0, "ID为负数")
+                check.assert_json_equal({"data.page": 2, "data.page_size": 2})
+        
+        message = str(exc_info.value)
+        assert message.startswith("批量断言失败: 3/5 项不通过\n")
+        assert "  1. 数量断言失败: data.messages[*] 期望 3, 实际 2" in message
+        assert "  2. 条件断言失败: data.messages[*].message_id 共 2 个值, 2 个不满足「ID为负数」" in message
+        assert "  3. 字段 data.page 不匹配: 期望 2, 实际 1" in message
+        assert len(message.splitlines()) == 4
@@ -0,0 +1,110 @@
+"""
+Mock服务故障注入测试用例
+通过 /admin/faults 在运行时为 /health 配置延迟、错误和连接中断
+故障规则设置在每个用例独立的作用域（X-Fault-Scope 请求头）中，只影响本用例带该请求头的请求
+"""
+import time
+import pytest
+import requests
+from core.assertion import Assertion
+from core.config import config
+from core.http_client import HttpClient
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class TestMockFaults:
+    """Mock故障注入测试类"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, fault_headers):
+        """创建带故障作用域请求头的客户端（作用域由 fault_headers 在用例结束后清除）"""
+        self.fault_headers = fault_headers
+        self.client = self.make_client(timeout=config.get_api_timeout())
+        yield
+        self.client.close()
+
+    def make_client(self, **kwargs):
+        """创建带故障作用域请求头的客户端"""
+        client = HttpClient(base_url=config.get_api_base_url(), **kwargs)
+        client.session.headers.update(self.fault_headers)
+        return client
+
+    def set_faults(self, rule):
+        """为本用例作用域内的 /health 设置故障规则"""
+        response = self.client.put("/admin/faults", json_data={"seed": 1, "routes": {"/health": rule}})
+        Assertion.assert_status_code(response, 200)
+
+    def test_inject_error(self):
+        """
+        测试用例1: 注入5xx错误
+        验证: 返回配置的状态码，业务接口以及不带作用域请求头的请求不受影响
+        """
+        self.set_faults({"error_rate": 1, "error_status": 503})
+
+        response = self.client.get("/health")
+        Assertion.assert_status_code(response, 503)
+        Assertion.assert_json_contains(response, "code", 503)
+
+        response = self.client.get("/api/user/info", params={"user_id": 1001})
+        Assertion.assert_status_code(response, 200)
+
+        unscoped = HttpClient(base_url=config.get_api_base_url(), timeout=config.get_api_timeout())
+        response = unscoped.get("/health")
+        unscoped.close()
+        Assertion.assert_status_code(response, 200)
+
+    def test_inject_latency(self):
+        """
+        测试用例2: 注入固定延迟
+        验证: 响应时间不小于配置的延迟，超过客户端超时时间时抛出Timeout
+        """
+        self.set_faults({"latency": {"distribution": "fixed", "value": 300}})
+
+        response = self.client.get("/health")
+        Assertion.assert_status_code(response, 200)
+        assert response.elapsed.total_seconds() >= 0.3
+
+        slow_client = self.make_client(timeout=0.1)
+        with pytest.raises(requests.exceptions.Timeout):
+            slow_client.get("/health")
+        slow_client.close()
+
+    @pytest.mark.live
+    def test_inject_bandwidth(self):
+        """
+        测试用例3: 限制响应带宽
+        验证: 下载响应体的时间符合 响应体大小 / 带宽
+        """
+        self.set_faults({"bandwidth": 200})
+
+        start = time.perf_counter()
+        response = self.client.get("/health")
+        duration = time.perf_counter() - start
+        Assertion.assert_status_code(response, 200)
+        assert response.json()["status"] == "ok"
+        assert duration >= len(response.content) / 200 * 0.8
+
+    def test_inject_connection_reset(self):
+        """
+        测试用例4: 响应中途断开连接
+        验证: 客户端收到连接异常
+        """
+        self.set_faults({"reset_rate": 1})
+
+        with pytest.raises(requests.exceptions.RequestException):
+            self.client.get("/health")
+
+    def test_invalid_fault_config(self):
+        """
+        测试用例5: 无效的故障配置
+        验证: 返回400，原配置保持不变
+        """
+        self.set_faults({"error_rate": 1})
+
+        response = self.client.put("/admin/faults", json_data={"routes": {"/health": {"error_rate": 2}}})
+        Assertion.assert_status_code(response, 400)
+
+        response = self.client.get("/admin/faults")
+        Assertion.assert_json_contains(response, "data.routes./health.error_rate", 1)
@@ -0,0 +1,36 @@
+"""
+并行执行测试用例
+验证CI分片与历史耗时无关、各分片互不重叠，以及分片内按耗时均衡分配工作进程
+"""
+from core.logger import get_logger
+from core.parallel import partition, shard_tests
+
+logger = get_logger(__name__)
+
+
+class TestParallel:
+    """并行执行测试类"""
+
+    def test_shard_tests(self):
+        """
+        测试用例1: CI分片
+        验证: 各分片互不重叠且合起来覆盖全部用例；只取决于nodeid，与收集顺序无关
+        """
+        test_ids = [f"testcase/test_demo.py::TestDemo::test_case_{i}" for i in range(50)]
+        shards = [shard_tests(test_ids, index, 3) for index in range(3)]
+
+        assert sorted(nodeid for shard in shards for nodeid in shard) == sorted(test_ids)
+        assert all(shards)
+        assert shard_tests(list(reversed(test_ids)), 1, 3) == list(reversed(shards[1]))
+        assert shard_tests(test_ids, 0, 1) == test_ids
+
+    def test_partition_workers(self):
+        """
+        测试用例2: 分片内按耗时分配工作进程
+        验证: 最长处理时间优先，各组总耗时均衡
+        """
+        durations = {"a": 5.0, "b": 4.0, "c": 3.0, "d": 2.0, "e": 2.0}
+        groups = partition(list(durations), durations, 2)
+
+        assert groups == [["a", "d", "e"], ["b", "c"]]
+        assert [sum(durations[nodeid] for nodeid in group) for group in groups] == [9.0, 7.0]
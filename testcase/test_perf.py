@@ -0,0 +1,161 @@
+"""
+接口性能汇总测试用例
+验证按 方法 + 路由模板 统计请求耗时、与上一次运行对比 p95、并行执行时合并各工作进程的统计，以及性能基线检查
+"""
+import pytest
+from core.logger import get_logger
+from core.parallel import merge_perf_summary
+from core.perf import (
+    PerfStats, baseline_failures, build_perf_summary, load_baselines, load_perf_summary, perf_summary_html,
+    route_template, write_perf_summary,
+)
+
+logger = get_logger(__name__)
+
+
+def record(method, url, elapsed, status_code=200, error=None):
+    """构造请求指标"""
+    return {"method": method, "url": url, "elapsed": elapsed, "status_code": status_code, "error": error}
+
+
+class TestPerf:
+    """接口性能汇总测试类"""
+
+    def test_route_template(self):
+        """
+        测试用例1: 路由模板
+        验证: 优先匹配配置的模板；未匹配时数字、UUID、长十六进制路径段替换为 {id}，查询参数和主机不影响接口名称
+        """
+        assert route_template("/api/order/123/items") == "/api/order/{id}/items"
+        assert route_template("/api/file/3f2a9c0d-1e4b-5a67-8c9d-0e1f2a3b4c5d") == "/api/file/{id}"
+        assert route_template("/api/doc/507f1f77bcf86cd799439011") == "/api/doc/{id}"
+        assert route_template("/api/user/info") == "/api/user/info"
+
+        stats = PerfStats(routes=["/api/user/{name}"])
+        assert stats.endpoint("get", "http://127.0.0.1:5000/api/user/alice") == "GET /api/user/{name}"
+        assert stats.endpoint("GET", "http://10.0.0.1/api/order/42") == "GET /api/order/{id}"
+
+    def test_summary_and_regression(self):
+        """
+        测试用例2: 接口统计与 p95 退化
+        验证: 按 p95 从高到低排列；异常和 >= 400 的响应计入错误率；p95 增幅超过阈值（且样本足够）时标记退化
+        """
+        previous_stats = PerfStats()
+        for i in range(20):
+            previous_stats.on_request(record("GET", f"http://host/api/order/{i}", 0.010))
+            previous_stats.on_request(record("POST", "http://host/api/order/create", 0.050))
+        previous = build_perf_summary(previous_stats)
+
+        stats = PerfStats()
+        for i in range(20):
+            stats.on_request(record("GET", f"http://host/api/order/{i}", 0.030))
+            stats.on_request(record("POST", "http://host/api/order/create", 0.052,
+                                    status_code=503 if i < 2 else 200))
+        stats.on_request(record("DELETE", "http://host/api/order/1", 0.1, status_code=None, error="ReadTimeout"))
+        summary = build_perf_summary(stats, previous, {"regression_threshold": 0.2, "min_samples": 10,
+                                                       "min_delta_ms": 5})
+
+        assert summary["requests"] == 41
+        assert [row["endpoint"] for row in summary["endpoints"]] == [
+            "DELETE /api/order/{id}", "POST /api/order/create", "GET /api/order/{id}"
+        ]
+        rows = {row["endpoint"]: row for row in summary["endpoints"]}
+        order = rows["GET /api/order/{id}"]
+        assert order["count"] == 20
+        assert order["p95"] == pytest.approx(30, rel=0.01)
+        assert order["previous_p95"] == pytest.approx(10, rel=0.01)
+        assert order["regressed"] is True
+        assert rows["POST /api/order/create"]["error_rate"] == 0.1
+        assert "regressed" not in rows["POST /api/order/create"]
+        # 上一次运行中不存在的接口不对比
+        assert "previous_p95" not in rows["DELETE /api/order/{id}"]
+        assert rows["DELETE /api/order/{id}"]["errors"] == 1
+
+        assert [item["endpoint"] for item in summary["regressions"]] == ["GET /api/order/{id}"]
+        assert summary["regressions"][0]["change"] == pytest.approx(2, rel=0.05)
+        assert "background" in perf_summary_html(summary)
+
+    def test_merge_worker_summaries(self, tmp_path):
+        """
+        测试用例3: 合并各工作进程的统计
+        验证: 合并结果与所有请求记入同一个统计相同；与输出文件中的上一次结果对比；样本不足时不标记退化
+        """
+        output_file = tmp_path / "perf_summary.json"
+        previous_stats = PerfStats()
+        previous_stats.on_request(record("GET", "http://host/api/user/info", 0.001))
+        write_perf_summary(build_perf_summary(previous_stats), output_file)
+
+        combined = PerfStats()
+        worker_files = []
+        for worker_id in range(2):
+            stats = PerfStats()
+            for i in range(5):
+                for target in (stats, combined):
+                    target.on_request(record("GET", "http://host/api/user/info", 0.01 * (worker_id + 1) + i / 1000,
+                                             status_code=400 if i == 0 else 200))
+            worker_files.append(tmp_path / f"perf_summary_{worker_id}.json")
+            write_perf_summary(build_perf_summary(stats), worker_files[-1])
+
+        summary = merge_perf_summary([*worker_files, tmp_path / "missing.json"], output_file,
+                                     {"regression_threshold": 0.2, "min_samples": 2})
+        assert summary == load_perf_summary(output_file)
+        merged, = summary["endpoints"]
+        expected, = combined.rows()
+        for key in ("count", "mean", "p50", "p95", "p99", "max", "errors", "error_rate"):
+            assert merged[key] == expected[key]
+        assert merged["previous_p95"] == pytest.approx(1, rel=0.01)
+        assert summary["regressions"] == []
+
+        assert merge_perf_summary([tmp_path / "missing.json"], tmp_path / "empty.json") is None
+        assert not (tmp_path / "empty.json").exists()
+
+    def test_baselines(self, tmp_path):
+        """
+        测试用例4: 性能基线
+        验证: defaults 合并到每条基线；样本不足或没有请求的接口跳过；超过延迟上限或错误率时未通过
+        """
+        baseline_file = tmp_path / "perf_baselines.yaml"
+        baseline_file.write_text("""
+defaults:
+  min_samples: 50
+baselines:
+  - endpoint: get /api/user/info
+    p95: 150
+  - endpoint: GET /api/order/{id}
+    p95: 20
+    max_error_rate: 0.01
+  - endpoint: POST /api/order/create
+    p95: 150
+  - endpoint: GET /api/missing
+    p95: 150
+    min_samples: 1
+""", encoding='utf-8')
+        baselines = load_baselines(baseline_file)
+        assert baselines[0] == {"endpoint": "GET /api/user/info", "min_samples": 50, "p95": 150}
+
+        stats = PerfStats()
+        for i in range(60):
+            stats.on_request(record("GET", "http://host/api/user/info", 0.010))
+            stats.on_request(record("GET", f"http://host/api/order/{i}", 0.030, status_code=500 if i < 3 else 200))
+        for _ in range(10):
+            stats.on_request(record("POST", "http://host/api/order/create", 1.0))
+        summary = build_perf_summary(stats, baselines=baselines)
+
+        results = {result["endpoint"]: result for result in summary["baselines"]}
+        assert results["GET /api/user/info"]["status"] == "passed"
+        assert results["GET /api/order/{id}"]["status"] == "failed"
+        assert results["GET /api/order/{id}"]["violations"] == [
+            "p95 延迟 30.0ms 超过基线 20ms", "错误率 5.00% 超过基线 1.00%"
+        ]
+        # 样本不足时单次慢请求不导致失败
+        assert results["POST /api/order/create"] == {
+            "endpoint": "POST /api/order/create", "count": 10, "status": "skipped", "violations": []
+        }
+        assert results["GET /api/missing"]["status"] == "skipped"
+        assert [result["endpoint"] for result in baseline_failures(summary)] == ["GET /api/order/{id}"]
+        assert "性能基线" in perf_summary_html(summary)
+
+        assert load_baselines(tmp_path / "missing.yaml") == []
+        baseline_file.write_text("baselines:\n  - endpoint: /api/user/info\n    p95: 150\n", encoding='utf-8')
+        with pytest.raises(ValueError):
+            load_baselines(baseline_file)
@@ -0,0 +1,114 @@
+"""
+连接池测试用例
+在独立启动的 mock_server.py --serve（waitress，支持HTTP长连接）上验证连接复用与 pool_maxsize
+（默认的Werkzeug开发服务器每次响应后关闭连接，无法验证复用）
+"""
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import pytest
+import requests
+from core.assertion import Assertion
+from core.http_client import HttpClient
+from core.logger import get_logger
+from core.pool import get_pool_stats
+
+logger = get_logger(__name__)
+
+BASE_DIR = Path(__file__).parent.parent
+
+
+def free_port() -> int:
+    """获取一个空闲端口"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture(scope="module")
+def serve_url():
+    """启动本模块专用的 --serve 模式Mock服务，模块结束后关闭"""
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, 'mock/mock_server.py', '--serve', '--port', str(port)],
+        cwd=BASE_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    url = f"http://127.0.0.1:{port}"
+    try:
+        for _ in range(100):
+            try:
+                requests.get(f"{url}/health", timeout=1)
+                break
+            except requests.exceptions.ConnectionError:
+                time.sleep(0.1)
+        else:
+            pytest.fail("--serve 模式Mock服务启动超时")
+        yield url
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def stats_delta(before):
+    """与 before 相比的连接池统计增量"""
+    after = get_pool_stats()
+    return {key: after[key] - before[key] for key in ('opened', 'reused', 'discarded')}
+
+
+@pytest.mark.live
+class TestPool:
+    """连接池测试类"""
+
+    def make_client(self, url, **pool_config):
+        """创建使用独立连接池的客户端"""
+        config = {'pool_connections': 1, 'pool_maxsize': 2, 'pool_block': False, 'keepalive_timeout': None}
+        config.update(pool_config)
+        return HttpClient(base_url=url, pool_config=config, share_pool=False, cache={'enabled': False})
+
+    def test_connection_reuse(self, serve_url):
+        """
+        测试用例1: 顺序请求复用连接
+        验证: 只建立1个连接，其余请求全部复用
+        """
+        client = self.make_client(serve_url)
+        before = get_pool_stats()
+        for _ in range(5):
+            Assertion.assert_status_code(client.get("/health"), 200)
+        delta = stats_delta(before)
+        client.close()
+
+        assert delta == {'opened': 1, 'reused': 4, 'discarded': 0}
+
+    def test_pool_maxsize(self, serve_url):
+        """
+        测试用例2: 并发请求超过 pool_maxsize
+        验证: 不阻塞时超出的连接用完后丢弃，池中只保留 pool_maxsize 个连接；阻塞时最多建立 pool_maxsize 个连接
+        """
+        slow = requests.put(f"{serve_url}/admin/faults",
+                            json={"routes": {"/health": {"latency": {"distribution": "fixed", "value": 200}}}})
+        Assertion.assert_status_code(slow, 200)
+
+        client = self.make_client(serve_url)
+        pool = client.session.get_adapter(serve_url).poolmanager.connection_from_url(serve_url)
+        assert pool.pool.maxsize == 2
+        before = get_pool_stats()
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            responses = list(executor.map(lambda _: client.get("/health"), range(4)))
+        assert all(response.status_code == 200 for response in responses)
+        assert stats_delta(before) == {'opened': 4, 'reused': 0, 'discarded': 2}
+
+        before = get_pool_stats()
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            list(executor.map(lambda _: client.get("/health"), range(2)))
+        assert stats_delta(before) == {'opened': 0, 'reused': 2, 'discarded': 0}
+        client.close()
+
+        blocking = self.make_client(serve_url, pool_block=True)
+        before = get_pool_stats()
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(lambda _: blocking.get("/health"), range(4)))
+        assert stats_delta(before) == {'opened': 2, 'reused': 2, 'discarded': 0}
+        blocking.close()
@@ -0,0 +1,131 @@
+"""
+GET响应缓存测试用例
+通过 metrics 监听器统计实际发出的请求数，验证缓存命中、修改请求失效、TTL / LRU 淘汰以及同步与异步客户端的缓存隔离
+"""
+import asyncio
+import time
+import pytest
+import requests
+from core import metrics
+from core.assertion import Assertion
+from core.async_http_client import AsyncHttpClient, AsyncResponse
+from core.config import config
+from core.http_client import HttpClient
+from core.logger import get_logger
+from core.response_cache import clear_response_caches
+
+logger = get_logger(__name__)
+
+
+class TestResponseCache:
+    """GET响应缓存测试类"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        """清空缓存并统计实际发出的请求"""
+        clear_response_caches()
+        self.sent = []
+        listener = self.sent.append
+        metrics.add_listener(listener)
+        self.clients = []
+        yield
+        metrics.remove_listener(listener)
+        for client in self.clients:
+            client.close()
+        clear_response_caches()
+
+    def make_client(self, **cache_settings):
+        """创建开启缓存的客户端"""
+        client = HttpClient(
+            base_url=config.get_api_base_url(),
+            timeout=config.get_api_timeout(),
+            cache={'enabled': True, **cache_settings}
+        )
+        self.clients.append(client)
+        return client
+
+    def count(self, path):
+        """统计发往 path 的请求次数"""
+        return sum(1 for record in self.sent if record["url"].endswith(path))
+
+    def test_cache_hit(self):
+        """
+        测试用例1: 重复的GET请求命中缓存
+        验证: 只发出一次请求；修改返回的数据不影响缓存；不同参数不命中
+        """
+        client = self.make_client()
+        first = client.get("/api/user/info", params={"user_id": 1001})
+        expected = dict(first.json()["data"])
+        first.json()["data"]["username"] = "changed"
+
+        # 缓存由相同配置的客户端共享（未注册用户的 age 每次随机生成，相同说明来自缓存）
+        second = self.make_client().get("/api/user/info", params={"user_id": 1001})
+        Assertion.assert_status_code(second, 200)
+        assert second.json()["data"] == expected
+        assert self.count("/api/user/info") == 1
+
+        client.get("/api/user/info", params={"user_id": 1002})
+        assert self.count("/api/user/info") == 2
+
+    def test_invalidate_on_mutation(self):
+        """
+        测试用例2: 修改请求使同一资源前缀下的缓存失效
+        验证: 发送消息后再查询消息列表会重新请求，并返回最新数据
+        """
+        client = self.make_client()
+        params = {"page": 1, "page_size": 1}
+        total = client.get("/api/message/list", params=params).json()["data"]["total"]
+        client.get("/api/message/list", params=params)
+        assert self.count("/api/message/list") == 1
+
+        client.post("/api/message/send", json_data={"receiver_id": 1002, "content": "缓存失效"})
+        response = client.get("/api/message/list", params=params)
+        assert self.count("/api/message/list") == 2
+        Assertion.assert_json_contains(response, "data.total", total + 1)
+
+        client.get("/api/user/info", params={"user_id": 1001})
+        client.post("/api/message/send", json_data={"receiver_id": 1002, "content": "缓存失效"})
+        client.get("/api/user/info", params={"user_id": 1001})
+        assert self.count("/api/user/info") == 1
+
+    def test_ttl_and_lru(self):
+        """
+        测试用例3: 过期和容量淘汰
+        验证: 超过 ttl 后重新请求；超过 max_entries 时淘汰最久未使用的缓存
+        """
+        client = self.make_client(ttl=0.05)
+        client.get("/health")
+        time.sleep(0.1)
+        client.get("/health")
+        assert self.count("/health") == 2
+
+        client = self.make_client(max_entries=1)
+        client.get("/api/user/info", params={"user_id": 1001})
+        client.get("/api/user/info", params={"user_id": 1002})
+        client.get("/api/user/info", params={"user_id": 1001})
+        assert self.count("/api/user/info") == 3
+
+    def test_sync_and_async_clients(self):
+        """
+        测试用例4: 同步与异步客户端共用缓存
+        验证: 相同请求不会命中另一种客户端缓存的响应，各自返回本类型的响应对象；修改请求对两者都生效
+        """
+        client = self.make_client()
+        Assertion.assert_status_code(client.get("/api/user/info", params={"user_id": 1001}), 200)
+
+        async def async_get(times):
+            async_client = AsyncHttpClient(base_url=config.get_api_base_url(), cache={'enabled': True})
+            try:
+                return [await async_client.get("/api/user/info", params={"user_id": 1001}) for _ in range(times)]
+            finally:
+                await async_client.close()
+
+        responses = asyncio.run(async_get(2))
+        assert all(isinstance(response, AsyncResponse) for response in responses)
+        assert self.count("/api/user/info") == 2
+        assert isinstance(client.get("/api/user/info", params={"user_id": 1001}), requests.Response)
+        assert self.count("/api/user/info") == 2
+
+        client.post("/api/user/add", json={})
+        asyncio.run(async_get(1))
+        assert self.count("/api/user/info") == 3
@@ -0,0 +1,135 @@
+"""
+请求重试与熔断测试用例
+通过 /admin/faults 为不存在的路径注入5xx错误（规则设置在本用例的故障作用域中，不影响其他用例），验证HttpClient的重试与熔断行为
+"""
+import time
+import pytest
+import requests
+from core import metrics
+from core.assertion import Assertion
+from core.config import config
+from core.deadline import DeadlineExceeded
+from core.http_client import HttpClient
+from core.logger import get_logger
+from core.resilience import CircuitOpenError, RetryPolicy, reset_circuit_breakers
+
+logger = get_logger(__name__)
+
+FAULT_PATH = "/fault/retry"
+
+
+class TestRetry:
+    """请求重试与熔断测试类"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, fault_headers):
+        """为 FAULT_PATH 注入503错误并统计实际发送的请求（故障作用域由 fault_headers 在用例结束后清除）"""
+        self.fault_headers = fault_headers
+        self.client = HttpClient(base_url=config.get_api_base_url(), timeout=config.get_api_timeout())
+        response = self.client.put("/admin/faults", headers=fault_headers, json_data={
+            "routes": {FAULT_PATH: {"error_rate": 1, "error_status": 503}}
+        })
+        Assertion.assert_status_code(response, 200)
+
+        self.attempts = []
+        listener = self.attempts.append
+        metrics.add_listener(listener)
+        yield
+        metrics.remove_listener(listener)
+        self.client.close()
+        reset_circuit_breakers()
+
+    def make_client(self, **kwargs):
+        """创建关闭熔断、带故障作用域请求头的客户端（只验证重试）"""
+        client = HttpClient(
+            base_url=config.get_api_base_url(),
+            timeout=config.get_api_timeout(),
+            circuit_breaker={'enabled': False},
+            **kwargs
+        )
+        client.session.headers.update(self.fault_headers)
+        return client
+
+    def count(self, path):
+        """统计发往 path 的请求次数"""
+        return sum(1 for record in self.attempts if record["url"].endswith(path))
+
+    def test_retry_idempotent_request(self):
+        """
+        测试用例1: 幂等请求遇到503时重试
+        验证: 共发送 max_retries + 1 次请求，返回最后一次的响应
+        """
+        client = self.make_client(retry_policy=RetryPolicy(max_retries=2, backoff_base=0.01))
+        response = client.get(FAULT_PATH)
+        client.close()
+
+        Assertion.assert_status_code(response, 503)
+        assert self.count(FAULT_PATH) == 3
+
+    def test_no_retry_non_idempotent_request(self):
+        """
+        测试用例2: 非幂等请求（POST）不重试
+        验证: 只发送1次请求
+        """
+        client = self.make_client(retry_policy=RetryPolicy(max_retries=2, backoff_base=0.01))
+        response = client.post(FAULT_PATH, json_data={"content": "retry"})
+        client.close()
+
+        Assertion.assert_status_code(response, 503)
+        assert self.count(FAULT_PATH) == 1
+
+    def test_circuit_breaker_open(self):
+        """
+        测试用例3: 连续连接失败后熔断
+        验证: 达到失败阈值后请求不再发送，直接抛出CircuitOpenError
+        """
+        client = HttpClient(
+            base_url="http://127.0.0.1:1",
+            timeout=1,
+            retry_policy=RetryPolicy(max_retries=0),
+            circuit_breaker={'failure_threshold': 2, 'recovery_timeout': 60}
+        )
+        for _ in range(2):
+            with pytest.raises(requests.exceptions.ConnectionError) as exc_info:
+                client.get("/health")
+            assert not isinstance(exc_info.value, CircuitOpenError)
+
+        start = time.perf_counter()
+        with pytest.raises(CircuitOpenError):
+            client.get("/health")
+        assert time.perf_counter() - start < 0.1
+        client.close()
+
+    @pytest.mark.live
+    def test_half_open_probe_deadline(self):
+        """
+        测试用例4: 半开状态的探测请求因截止时间到期中止
+        验证: 探测请求不计入成功/失败，但熔断器允许下一个请求探测，探测成功后关闭
+        """
+        response = self.client.put("/admin/faults", headers=self.fault_headers, json_data={"routes": {
+            FAULT_PATH: {"error_rate": 1, "error_status": 503},
+            "/health": {"bandwidth": 40},
+        }})
+        Assertion.assert_status_code(response, 200)
+        client = HttpClient(
+            base_url=config.get_api_base_url(),
+            timeout=5,
+            deadline=0.3,
+            retry_policy=RetryPolicy(max_retries=0),
+            circuit_breaker={'failure_threshold': 1, 'recovery_timeout': 0.2}
+        )
+        client.session.headers.update(self.fault_headers)
+        breaker = client._get_breaker(client._build_url(FAULT_PATH))
+
+        Assertion.assert_status_code(client.get(FAULT_PATH), 503)
+        assert breaker.state == breaker.OPEN
+        time.sleep(0.25)
+
+        with pytest.raises(DeadlineExceeded):
+            client.get("/health")
+        assert breaker.state == breaker.HALF_OPEN
+
+        response = client.get("/api/user/info", params={"user_id": 1001})
+        Assertion.assert_status_code(response, 200)
+        assert breaker.state == breaker.CLOSED
+        client.close()
@@ -0,0 +1,100 @@
+"""
+JSON Schema校验测试用例
+验证编译后的校验器对不符合Schema的数据给出错误，enum / const / uniqueItems 按JSON语义比较值，以及不支持的关键字在编译时报错
+"""
+import pytest
+from core.logger import get_logger
+from core.schema import SchemaError, SchemaValidator
+
+logger = get_logger(__name__)
+
+
+def validate(schema, data):
+    """用内联Schema校验数据，返回错误信息列表"""
+    return SchemaValidator("inline", schema).validate(data)
+
+
+class TestSchema:
+    """JSON Schema校验测试类"""
+
+    def test_type_mismatch(self):
+        """
+        测试用例1: 类型不匹配
+        验证: 错误信息带字段路径和实际类型；布尔值不是 integer，整数是 number
+        """
+        schema = {"type": "object", "properties": {
+            "id": {"type": "integer"},
+            "tags": {"type": "array", "items": {"type": "string"}},
+            "score": {"type": "number"},
+        }}
+        errors = validate(schema, {"id": True, "tags": ["a", 2], "score": 3})
+        assert errors == [
+            "$.id: 期望类型 integer, 实际 boolean",
+            "$.tags[1]: 期望类型 string, 实际 integer",
+        ]
+        assert validate({"type": "object"}, []) == ["$: 期望类型 object, 实际 array"]
+
+    def test_enum_and_const(self):
+        """
+        测试用例2: enum / const 按JSON语义比较
+        验证: 布尔值与数值不相等（True 不匹配 1、[1]），整数与等值浮点数相等
+        """
+        assert validate({"enum": [1, 2]}, True) == ["$: 值 True 不在可选范围 [1, 2]"]
+        assert validate({"enum": [True]}, 1) == ["$: 值 1 不在可选范围 [True]"]
+        assert validate({"enum": [[1], {"a": 0}]}, [True]) == ["$: 值 [True] 不在可选范围 [[1], {'a': 0}]"]
+        assert validate({"enum": [[1], {"a": 0}]}, {"a": False}) != []
+        assert validate({"enum": [[1], {"a": 0}]}, {"a": 0.0}) == []
+        assert validate({"enum": [1, 2]}, 1.0) == []
+
+        assert validate({"const": 1}, True) == ["$: 期望 1, 实际 True"]
+        assert validate({"const": False}, 0) == ["$: 期望 False, 实际 0"]
+        assert validate({"const": {"ids": [1, 2]}}, {"ids": [1.0, 2]}) == []
+
+    def test_unique_items(self):
+        """
+        测试用例3: uniqueItems 按JSON语义判断重复
+        验证: 1 与 1.0 重复（对象内的数值同样），1 与 True 不重复
+        """
+        schema = {"type": "array", "uniqueItems": True}
+        assert validate(schema, [1, 1.0]) == ["$: 存在重复元素 1.0"]
+        assert validate(schema, [{"n": 1}, {"n": 1.0}]) == ["$: 存在重复元素 {'n': 1.0}"]
+        assert validate(schema, [1, True, 0, False, "1"]) == []
+
+    def test_required_and_additional_properties(self):
+        """
+        测试用例4: 必填字段与多余字段
+        验证: 缺少的每个必填字段和每个不允许的字段都给出错误，嵌套对象带完整路径
+        """
+        schema = {"type": "object", "properties": {
+            "data": {
+                "type": "object",
+                "required": ["id", "name"],
+                "properties": {"id": {"type": "integer"}, "name": {"type": "string"}},
+                "additionalProperties": False,
+            },
+        }, "required": ["code", "data"]}
+        errors = validate(schema, {"data": {"name": "alice", "age": 20, "email": "a@example.com"}})
+        assert errors == [
+            "$: 缺少必填字段 'code'",
+            "$.data: 缺少必填字段 'id'",
+            "$.data: 不允许的字段 'age'",
+            "$.data: 不允许的字段 'email'",
+        ]
+
+    def test_unsupported_keyword(self):
+        """
+        测试用例5: 不支持的关键字
+        验证: 未实现的关键字与拼写错误的关键字（含嵌套Schema中的）在编译时抛出 SchemaError，注解关键字不报错
+        """
+        with pytest.raises(SchemaError, match="minProperties"):
+            validate({"type": "object", "minProperties": 1}, {})
+        with pytest.raises(SchemaError, match="patternProperties"):
+            validate({"properties": {"data": {"patternProperties": {"^x": {"type": "string"}}}}}, {})
+        with pytest.raises(SchemaError, match="requried"):
+            validate({"type": "object", "requried": ["id"]}, {})
+        with pytest.raises(SchemaError, match="contains"):
+            validate({"type": "array", "items": {"anyOf": [{"contains": {"type": "integer"}}]}}, [])
+
+        schema = {"$schema": "http://json-schema.org/draft-07/schema#", "title": "用户", "description": "用户信息",
+                  "type": "object", "properties": {"id": {"type": "integer", "examples": [1]}}}
+        assert validate(schema, {"id": 1}) == []
@@ -0,0 +1,92 @@
+"""
+请求超时与时间预算测试用例
+通过 /admin/faults 为 /health 注入延迟和带宽限制（规则设置在本用例的故障作用域中），验证请求截止时间与用例时间预算
+"""
+import time
+import pytest
+import requests
+from core.assertion import Assertion
+from core.config import config
+from core.deadline import DeadlineExceeded, current_budget, time_budget
+from core.http_client import HttpClient
+from core.logger import get_logger
+from core.resilience import RetryPolicy
+
+logger = get_logger(__name__)
+
+
+class TestTimeout:
+    """请求超时与时间预算测试类"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, fault_headers):
+        """故障作用域请求头（作用域由 fault_headers 在用例结束后清除）"""
+        self.fault_headers = fault_headers
+        self.client = HttpClient(base_url=config.get_api_base_url(), timeout=config.get_api_timeout())
+        yield
+        self.client.close()
+
+    def set_faults(self, rule):
+        """为本用例作用域内的 /health 设置故障规则"""
+        response = self.client.put("/admin/faults", headers=self.fault_headers, json_data={"routes": {"/health": rule}})
+        Assertion.assert_status_code(response, 200)
+
+    def make_client(self, **kwargs):
+        """创建不重试、带故障作用域请求头的客户端"""
+        client = HttpClient(
+            base_url=config.get_api_base_url(),
+            retry_policy=RetryPolicy(max_retries=0),
+            circuit_breaker={'enabled': False},
+            **kwargs
+        )
+        client.session.headers.update(self.fault_headers)
+        return client
+
+    @pytest.mark.live
+    def test_deadline_cuts_off_slow_body(self):
+        """
+        测试用例1: 响应体持续缓慢发送
+        验证: 每次读取都未超过读取超时，但总时长到达截止时间后中止请求
+        """
+        self.set_faults({"bandwidth": 40})
+        client = self.make_client(timeout=5, deadline=0.3)
+
+        start = time.perf_counter()
+        with pytest.raises(DeadlineExceeded):
+            client.get("/health")
+        assert time.perf_counter() - start < 1
+        client.close()
+
+    @pytest.mark.live
+    def test_time_budget_shared_by_requests(self):
+        """
+        测试用例2: 用例时间预算
+        验证: 预算在多个请求间共同消耗，用尽后请求不再发送
+        """
+        self.set_faults({"latency": {"distribution": "fixed", "value": 300}})
+        client = self.make_client(timeout=5)
+
+        with time_budget(0.5):
+            response = client.get("/health")
+            Assertion.assert_status_code(response, 200)
+
+            # 剩余预算不足一次请求的延迟，读取超时被收紧为剩余时间
+            start = time.perf_counter()
+            with pytest.raises(requests.exceptions.Timeout):
+                client.get("/health")
+            assert time.perf_counter() - start < 0.5
+
+            with pytest.raises(DeadlineExceeded):
+                client.get("/health")
+        client.close()
+
+    @pytest.mark.time_budget(120)
+    def test_time_budget_marker(self):
+        """
+        测试用例3: 通过标记设置用例时间预算
+        验证: 标记中的预算覆盖配置文件
+        """
+        budget = current_budget()
+        assert budget is not None
+        assert budget.seconds == 120
+        assert 0 < budget.remaining() <= 120
@@ -0,0 +1,111 @@
+"""
+请求阶段耗时测试用例
+验证同步/异步客户端记录的阶段耗时、收发字节数以及连接复用
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from core import metrics
+from core.async_http_client import AsyncHttpClient
+from core.config import config
+from core.http_client import HttpClient
+from core.logger import get_logger
+from core.timing import PHASES
+
+logger = get_logger(__name__)
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    """保持连接的最小HTTP服务（Mock服务每次响应后关闭连接，无法验证复用）"""
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b'{"code": 200}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.mark.live
+class TestTiming:
+    """请求阶段耗时测试类"""
+
+    @pytest.fixture
+    def records(self):
+        """收集请求指标"""
+        records = []
+        metrics.add_listener(records.append)
+        yield records
+        metrics.remove_listener(records.append)
+
+    @pytest.fixture
+    def keepalive_url(self):
+        """启动保持连接的本地HTTP服务"""
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield f"http://127.0.0.1:{server.server_port}"
+        server.shutdown()
+        server.server_close()
+
+    def test_sync_timing(self, records):
+        """
+        测试用例1: 同步请求的阶段耗时
+        验证: response.timing 与请求指标的 timing 一致；请求体计入发送字节数，响应体计入接收字节数
+        """
+        client = HttpClient(base_url=config.get_api_base_url(), timeout=config.get_api_timeout())
+        payload = {"receiver_id": 1002, "content": "阶段耗时"}
+        response = client.post("/api/message/send", json_data=payload)
+        client.close()
+
+        timing = response.timing.to_dict()
+        assert list(timing) == [*PHASES, "bytes_sent", "bytes_received", "reused"]
+        assert all(timing[phase] >= 0 for phase in PHASES)
+        assert timing["connect"] > 0 and timing["server"] > 0
+        assert timing["bytes_sent"] > len(json.dumps(payload).encode('utf-8'))
+        assert timing["bytes_received"] > len(response.content)
+        assert sum(timing[phase] for phase in PHASES) <= response.elapsed.total_seconds() + 0.1
+        assert records[-1]["timing"] == timing
+
+    def test_connection_reuse(self, keepalive_url, records):
+        """
+        测试用例2: 复用连接
+        验证: 第一次请求新建连接；第二次请求复用连接，dns/connect/tls 为0
+        """
+        client = HttpClient(base_url=keepalive_url, timeout=config.get_api_timeout())
+        first = client.get("/reuse")
+        second = client.get("/reuse")
+        client.close()
+
+        assert first.timing.reused is False
+        assert first.timing.connect > 0
+        assert second.timing.reused is True
+        assert second.timing.dns == second.timing.connect == second.timing.tls == 0
+        assert second.timing.server > 0
+        assert [record["timing"]["reused"] for record in records[-2:]] == [False, True]
+
+    async def test_async_timing(self, keepalive_url, records):
+        """
+        测试用例3: 异步请求的阶段耗时
+        验证: 通过 aiohttp TraceConfig 记录阶段耗时、收发字节数和连接复用
+        """
+        client = AsyncHttpClient(base_url=keepalive_url, timeout=config.get_api_timeout())
+        try:
+            first = await client.get("/reuse")
+            second = await client.get("/reuse")
+        finally:
+            await client.close()
+
+        assert first.timing.reused is False
+        assert first.timing.connect > 0
+        assert first.timing.bytes_sent > 0
+        assert first.timing.bytes_received > len(first.content)
+        assert second.timing.reused is True
+        assert second.timing.connect == 0
+        assert records[-1]["timing"] == second.timing.to_dict()
@@ -6,6 +6,7 @@ import pytest
 from api.user_api import UserApi
 from core.assertion import Assertion
 from core.logger import get_logger
+from utils.common import generate_random_email, generate_random_string
 
 logger = get_logger(__name__)
 
@@ -207,3 +208,75 @@ class TestUserApi:
         Assertion.assert_status_code(response, 200)
         Assertion.assert_response_time(response, 1.0)  # 响应时间应小于1秒
 
+    
+    def test_get_user_info_batch_assertion(self):
+        """
+        测试用例11: 获取用户信息 - 批量断言
+        验证: 多个字段断言一次检查，失败时汇总列出全部不通过项
+        """
+        response = self.user_api.client.get("/api/user/info", params={"user_id": 1001})
+        
+        with Assertion.batch(response) as check:
+            check.assert_status_code(200)
+            check.assert_json_contains("code", 200)
+            check.assert_json_contains("message", "success")
+            check.assert_json_contains("data.user_id", 1001)
+            check.assert_json_contains("data.username")
+            check.assert_json_contains("data.email")
+            check.assert_all("data.user_id", int)
+            check.assert_response_time(1.0)
+    
+    def test_get_user_info_batch_assertion_failures(self):
+        """
+        测试用例12: 获取用户信息 - 批量断言多项失败
+        验证: 所有断言都会执行，只抛出一个AssertionError，其中按登记顺序列出每个不通过项
+        """
+        response = self.user_api.client.get("/api/user/info", params={"user_id": 1001})
+        
+        with pytest.raises(AssertionError) as exc_info:
+            with Assertion.batch(response) as check:
+                check.assert_status_code(200)
+                check.assert_json_contains("code", 201)
+                check.assert_json_contains("data.user_id", 1002)
+                check.assert_json_contains("data.nickname")
+                check.assert_all("data.user_id", str)
+                check.assert_status_code(404)
+        
+        lines = str(exc_info.value).splitlines()
+        assert lines[0] == "批量断言失败: 5/6 项不通过"
+        assert lines[1:] == [
+            "  1. 字段 code 不匹配: 期望 201, 实际 200",
+            "  2. 字段 data.user_id 不匹配: 期望 1002, 实际 1001",
+            "  3. 字段不存在: data.nickname",
+            "  4. 条件断言失败: data.user_id 共 1 个值, 1 个不满足「类型为 <class 'str'>」: [0]=1001",
+            "  5. 状态码断言失败: 期望 404, 实际 200",
+        ]
+    
+    def test_get_user_info_schema(self):
+        """
+        测试用例13: 获取用户信息 - Schema校验
+        验证: 响应结构符合 config/schemas/user_info.yaml
+        """
+        response = self.user_api.client.get("/api/user/info", params={"user_id": 1001})
+        
+        Assertion.assert_status_code(response, 200)
+        Assertion.assert_schema(response, "user_info")
+    
+    def test_get_user_info_by_username(self):
+        """
+        测试用例14: 按用户名 / 邮箱获取用户信息
+        验证: 返回新添加的用户，不存在的用户名返回404
+        """
+        # 每次执行使用新的用户名和邮箱，重复执行时不会因用户已存在返回409
+        username = f"lookup_{generate_random_string(8)}"
+        email = generate_random_email()
+        user_id = self.user_api.add_user(username, email)["data"]["user_id"]
+        
+        for params in ({"username": username}, {"email": email}):
+            response = self.user_api.client.get("/api/user/info", params=params)
+            Assertion.assert_status_code(response, 200)
+            Assertion.assert_json_contains(response, "data.user_id", user_id)
+            Assertion.assert_json_contains(response, "data.username", username)
+        
+        response = self.user_api.client.get("/api/user/info", params={"username": "no_such_user"})
+        Assertion.assert_status_code(response, 404)